@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class AppConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "app"
+
+    def ready(self):
+        # Registra las señales que invalidan el cache de paginas publicas, las que
+        # publican la disponibilidad de entradas en vivo, las que mantienen el indice
+        # de busqueda, las que invalidan los metadatos de categorias y las que descuentan
+        # los borrados fisicos del resumen diario
+        from . import borrados, busqueda, cache, categorias, disponibilidad  # noqa: F401
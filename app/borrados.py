@@ -0,0 +1,156 @@
+'''
+Borrados fisicos (tambien en cascada, desde el admin o con QuerySet.delete()): delete() no
+pasa por save(), asi que lo que aportaban las filas borradas al resumen diario
+(EventDailyStat), a las entradas vendidas y a los agregados de calificaciones del evento
+se descuenta aca.
+
+- Si el borrado empieza por un evento o una ubicacion, el resumen y los contadores se
+  borran con el evento: no hay nada que descontar.
+- Si empieza por usuarios o tickets, antes de borrar se calcula todo lo que se va a ir
+  con consultas agrupadas (como rebuild_event_stats) y se descuenta una vez al final,
+  un UPDATE por contador en lugar de uno por fila.
+- Si no, cada fila borrada descuenta lo suyo.
+'''
+from collections import Counter
+
+from django.db.models import Count, Q, QuerySet, Sum
+from django.db.models.signals import post_delete, pre_delete
+from django.dispatch import receiver
+
+from .models import (
+    Event,
+    EventDailyStat,
+    Rating,
+    RefundRequest,
+    SatisfactionSurvey,
+    Ticket,
+    User,
+    Venue,
+)
+
+# Descuentos calculados antes de un borrado agrupado: {id(origin): (origin, descuento)}
+_planificados = {}
+
+
+def borrado_desde(origin, *modelos):
+    '''Si el borrado en curso empezo por una instancia o un QuerySet de `modelos` (origin de las señales).'''
+    if isinstance(origin, QuerySet):
+        return issubclass(origin.model, modelos)
+    return isinstance(origin, modelos)
+
+
+def sin_descuento_por_fila(origin):
+    return borrado_desde(origin, Event, Venue, User, Ticket)
+
+
+class Descuento:
+    def __init__(self, resumen=None, vendidas=None, calificaciones=None):
+        # {(event_id, day, metric, key): valor}
+        self.resumen = resumen or Counter()
+        # {event_id: entradas activas}
+        self.vendidas = vendidas or {}
+        # {event_id: (suma, cantidad)}
+        self.calificaciones = calificaciones or {}
+
+    def aplicar(self):
+        EventDailyStat.descontar(self.resumen)
+        for event_id, cantidad in self.vendidas.items():
+            Event.liberar_cupos_de(event_id, cantidad)
+        for event_id, (suma, cantidad) in self.calificaciones.items():
+            Event.ajustar_calificaciones(event_id, -suma, -cantidad)
+
+
+def vendidas(tickets):
+    return dict(
+        tickets.filter(bl_baja=False).values_list("event_id").annotate(total=Sum("quantity")).order_by()
+    )
+
+
+def descuento_de_usuarios(user_ids):
+    # Lo de los eventos que organizan se borra con los eventos
+    ajenos = ~Q(event__organizer__in=user_ids)
+    ajenos_por_ticket = ~Q(ticket__event__organizer__in=user_ids)
+    tickets = Ticket.objects.filter(ajenos, user__in=user_ids)
+    calificaciones = Rating.objects.filter(ajenos, user__in=user_ids)
+    return Descuento(
+        EventDailyStat.totales(
+            tickets=tickets,
+            # Las de sus tickets quedan sin ticket (SET_NULL) y dejan de contar
+            reembolsos=RefundRequest.objects.filter(
+                Q(requester__in=user_ids) | Q(ticket__user__in=user_ids), ajenos_por_ticket
+            ),
+            calificaciones=calificaciones,
+            encuestas=SatisfactionSurvey.objects.filter(
+                Q(user__in=user_ids) | Q(ticket__user__in=user_ids), ajenos_por_ticket
+            ),
+        ),
+        vendidas(tickets),
+        {
+            event_id: (suma, cantidad)
+            for event_id, suma, cantidad in calificaciones.filter(bl_baja=False, is_current=True)
+            .values_list("event_id")
+            .annotate(suma=Sum("rating"), cantidad=Count("id"))
+            .order_by()
+        },
+    )
+
+
+def descuento_de_tickets(ticket_ids):
+    tickets = Ticket.objects.filter(pk__in=ticket_ids)
+    return Descuento(
+        EventDailyStat.totales(
+            tickets=tickets,
+            reembolsos=RefundRequest.objects.filter(ticket__in=ticket_ids),
+            encuestas=SatisfactionSurvey.objects.filter(ticket__in=ticket_ids),
+        ),
+        vendidas(tickets),
+    )
+
+
+@receiver(pre_delete, sender=User)
+@receiver(pre_delete, sender=Ticket)
+def planificar_descuento(sender, instance, origin=None, **kwargs):
+    # pre_delete llega para todas las filas antes de borrar ninguna: se planifica una vez
+    # por borrado, con la primera fila del modelo que lo empezo
+    if not borrado_desde(origin, sender):
+        return
+    planificado = _planificados.get(id(origin))
+    if planificado is not None and planificado[0] is origin:
+        return
+    ids = [instance.pk] if origin is instance else list(origin.values_list("pk", flat=True))
+    descuento = descuento_de_usuarios(ids) if sender is User else descuento_de_tickets(ids)
+    _planificados[id(origin)] = (origin, descuento)
+
+
+@receiver(post_delete, sender=User)
+@receiver(post_delete, sender=Ticket)
+def aplicar_descuento_planificado(sender, instance, origin=None, **kwargs):
+    # Las filas que dependen del origen se borran antes que el: con la primera fila del
+    # origen ya se borro todo lo demas
+    if not borrado_desde(origin, sender):
+        return
+    planificado = _planificados.get(id(origin))
+    if planificado is not None and planificado[0] is origin:
+        del _planificados[id(origin)]
+        planificado[1].aplicar()
+
+
+@receiver(post_delete, sender=Rating)
+def descontar_calificacion(sender, instance, origin=None, **kwargs):
+    if sin_descuento_por_fila(origin):
+        return
+    if instance._aporte_guardado is not None:
+        Event.ajustar_calificaciones(instance._event_guardado, -instance._aporte_guardado, -1)
+    EventDailyStat.descontar(instance._aporte_diario_guardado or {})
+
+
+@receiver(post_delete, sender=SatisfactionSurvey)
+def descontar_encuesta(sender, instance, origin=None, **kwargs):
+    if not sin_descuento_por_fila(origin):
+        EventDailyStat.descontar(instance.aporte_diario(instance._rating_guardado))
+
+
+@receiver(post_delete, sender=RefundRequest)
+def descontar_reembolso(sender, instance, origin=None, **kwargs):
+    if not sin_descuento_por_fila(origin):
+        EventDailyStat.descontar(instance.aporte_diario(instance._estado_diario_guardado))
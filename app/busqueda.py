@@ -0,0 +1,185 @@
+'''
+Indice de busqueda de eventos por titulo, descripcion, ubicacion (nombre y ciudad) y
+categorias. En SQLite es una tabla virtual FTS5 y en PostgreSQL una tabla con un tsvector
+y un indice GIN (ver la migracion 0027); las dos ignoran los acentos. Con otros motores
+se busca con icontains sobre las tablas, sin indice.
+
+Las señales de abajo mantienen el indice al dia en la misma transaccion que el cambio;
+rebuild_search_index lo arma de cero.
+'''
+import re
+
+from django.db import connection, connections, router, transaction
+from django.db.models import Q
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .models import Category, Event, Venue
+
+TABLA = "app_event_search"
+# Configuracion de texto de PostgreSQL: diccionario español sin acentos
+CONFIGURACION_PG = "es_unaccent"
+# Peso de cada columna en el ranking: el titulo pesa mas que las categorias,
+# la ubicacion y la descripcion
+PESOS = {"title": 10.0, "description": 1.0, "venue": 2.0, "categories": 4.0}
+PESOS_PG = {"title": "A", "categories": "B", "venue": "C", "description": "D"}
+MAX_TERMINOS = 10
+LOTE_INDEXADO = 2000
+
+
+def indexa():
+    return connection.vendor in ("sqlite", "postgresql")
+
+
+def terminos(texto):
+    # Solo letras y numeros: el resto podria ser sintaxis de MATCH o de to_tsquery
+    return re.findall(r"[^\W_]+", texto.lower())[:MAX_TERMINOS]
+
+
+def documentos(event_ids):
+    '''{event_id: {columna: texto}} de los eventos que siguen existiendo.'''
+    docs = {
+        pk: {"title": title, "description": description, "venue": f"{venue} {city}", "categories": ""}
+        for pk, title, description, venue, city in Event.objects.filter(pk__in=event_ids).values_list(
+            "pk", "title", "description", "venue__name", "venue__city"
+        )
+    }
+    categorias = Event.categories.through.objects.filter(event_id__in=docs).values_list("event_id", "category__name")
+    for event_id, nombre in categorias:
+        docs[event_id]["categories"] += f" {nombre}"
+    return docs
+
+
+def indexar_eventos(event_ids):
+    '''Vuelve a calcular la fila del indice de cada evento; los que ya no existen se quitan.'''
+    event_ids = list(event_ids)
+    if not event_ids or not indexa():
+        return
+    docs = documentos(event_ids)
+    columnas = list(PESOS)
+    filas = [[pk] + [doc[columna] for columna in columnas] for pk, doc in docs.items()]
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            marcadores = ", ".join(["%s"] * len(event_ids))
+            cursor.execute(f"DELETE FROM {TABLA} WHERE rowid IN ({marcadores})", event_ids)
+            insert = f"INSERT INTO {TABLA} (rowid, {', '.join(columnas)}) VALUES (%s, {', '.join(['%s'] * len(columnas))})"
+        else:
+            cursor.execute(f"DELETE FROM {TABLA} WHERE event_id = ANY(%s)", [event_ids])
+            vector = " || ".join(
+                f"setweight(to_tsvector('{CONFIGURACION_PG}', %s), '{PESOS_PG[columna]}')" for columna in columnas
+            )
+            insert = f"INSERT INTO {TABLA} (event_id, document) VALUES (%s, {vector})"
+        if filas:
+            cursor.executemany(insert, filas)
+
+
+def reconstruir_indice():
+    '''
+    Vacia el indice y lo vuelve a llenar de a LOTE_INDEXADO eventos, en una transaccion
+    (las busquedas siguen viendo el indice viejo hasta el final). Devuelve cuantos indexo.
+    '''
+    if not indexa():
+        return 0
+    event_ids = list(Event.objects.order_by("pk").values_list("pk", flat=True))
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {TABLA}")
+        for i in range(0, len(event_ids), LOTE_INDEXADO):
+            indexar_eventos(event_ids[i:i + LOTE_INDEXADO])
+    return len(event_ids)
+
+
+def ids_por_relevancia(palabras, desde, cantidad):
+    # Como cualquier lectura del ORM: puede ir a una replica (ver db_router)
+    conexion = connections[router.db_for_read(Event)]
+    with conexion.cursor() as cursor:
+        if conexion.vendor == "sqlite":
+            # Cada palabra como prefijo ("mus"* encuentra "música"); bm25 es menor cuanto mas relevante
+            consulta = " AND ".join(f'"{palabra}"*' for palabra in palabras)
+            pesos = ", ".join(str(peso) for peso in PESOS.values())
+            cursor.execute(
+                f"SELECT rowid FROM {TABLA} WHERE {TABLA} MATCH %s "
+                f"ORDER BY bm25({TABLA}, {pesos}), rowid LIMIT %s OFFSET %s",
+                [consulta, cantidad, desde],
+            )
+        else:
+            consulta = " & ".join(f"{palabra}:*" for palabra in palabras)
+            cursor.execute(
+                f"SELECT event_id FROM {TABLA}, to_tsquery('{CONFIGURACION_PG}', %s) AS consulta "
+                f"WHERE document @@ consulta ORDER BY ts_rank(document, consulta) DESC, event_id LIMIT %s OFFSET %s",
+                [consulta, cantidad, desde],
+            )
+        return [fila[0] for fila in cursor.fetchall()]
+
+
+def ids_sin_indice(palabras, desde, cantidad):
+    filtro = Q()
+    for palabra in palabras:
+        filtro &= (
+            Q(title__icontains=palabra)
+            | Q(description__icontains=palabra)
+            | Q(venue__name__icontains=palabra)
+            | Q(venue__city__icontains=palabra)
+            | Q(categories__name__icontains=palabra)
+        )
+    queryset = Event.objects.filter(filtro).values_list("pk", flat=True).distinct().order_by("scheduled_at", "pk")
+    return list(queryset[desde:desde + cantidad])
+
+
+def buscar_eventos(texto, pagina=1, por_pagina=20):
+    '''
+    Eventos que contienen todas las palabras de `texto` (como prefijo), del mas relevante
+    al menos relevante. Devuelve (eventos de la pagina, hay_mas).
+    '''
+    palabras = terminos(texto)
+    if not palabras:
+        return [], False
+    desde = (pagina - 1) * por_pagina
+    buscar = ids_por_relevancia if indexa() else ids_sin_indice
+    ids = buscar(palabras, desde, por_pagina + 1)
+    hay_mas = len(ids) > por_pagina
+    ids = ids[:por_pagina]
+    eventos = Event.objects.select_related("venue").prefetch_related("categories").in_bulk(ids)
+    return [eventos[pk] for pk in ids if pk in eventos], hay_mas
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def indexar_evento(sender, instance, **kwargs):
+    indexar_eventos([instance.pk])
+
+
+@receiver(post_save, sender=Venue)
+def indexar_eventos_de_ubicacion(sender, instance, created, **kwargs):
+    if not created:
+        indexar_eventos(Event.objects.filter(venue=instance).values_list("pk", flat=True))
+
+
+@receiver(pre_delete, sender=Category)
+def recordar_eventos_de_categoria(sender, instance, **kwargs):
+    # Al borrar la categoria sus filas de la relacion se borran sin m2m_changed
+    instance._eventos_a_indexar = list(instance.events.values_list("pk", flat=True))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def indexar_eventos_de_categoria(sender, instance, created=False, **kwargs):
+    if created:
+        return
+    event_ids = instance.__dict__.pop("_eventos_a_indexar", None)
+    if event_ids is None:
+        event_ids = instance.events.values_list("pk", flat=True)
+    indexar_eventos(event_ids)
+
+
+@receiver(m2m_changed, sender=Event.categories.through)
+def indexar_al_cambiar_categorias(sender, instance, action, reverse, pk_set, **kwargs):
+    if isinstance(instance, Event):
+        if action.startswith("post_"):
+            indexar_eventos([instance.pk])
+    elif action == "pre_clear":
+        instance._eventos_a_indexar = list(instance.events.values_list("pk", flat=True))
+    elif action == "post_clear":
+        indexar_eventos(instance.__dict__.pop("_eventos_a_indexar", []))
+    elif action in ("post_add", "post_remove") and pk_set:
+        indexar_eventos(pk_set)
@@ -0,0 +1,149 @@
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Category, Comment, Event, Venue
+
+GENERACION_KEY = "paginas_publicas:generacion"
+HITS_KEY = "paginas_publicas:hits"
+MISSES_KEY = "paginas_publicas:misses"
+
+# Cada modelo tiene su propia generacion: guardar un comentario solo descarta lo que
+# depende de comentarios, no las paginas de eventos o ubicaciones
+ALCANCES = ("event", "category", "venue", "comment")
+ALCANCE_DE_MODELO = {Event: "event", Category: "category", Venue: "venue", Comment: "comment"}
+
+
+def clave_generacion(alcance):
+    return f"{GENERACION_KEY}:{alcance}"
+
+
+def generaciones(alcances):
+    claves = [clave_generacion(alcance) for alcance in alcances]
+    actuales = cache.get_many(claves)
+    return [actuales.get(clave) or cache.get_or_set(clave, time.time_ns, None) for clave in claves]
+
+
+def invalidar_paginas_publicas(*alcances):
+    '''
+    Invalida lo cacheado que depende de `alcances` (por defecto, de todos) cambiando la
+    generacion que forma parte de cada clave. Las entradas viejas dejan de leerse y expiran solas.
+    '''
+    ahora = time.time_ns()
+    cache.set_many({clave_generacion(alcance): ahora for alcance in alcances or ALCANCES}, None)
+
+
+def clave_publica(nombre, alcances=ALCANCES):
+    version = "-".join(str(generacion) for generacion in generaciones(sorted(alcances)))
+    return f"paginas_publicas:{version}:{nombre}"
+
+
+def registrar_acceso(hit):
+    key = HITS_KEY if hit else MISSES_KEY
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # La clave expiro entre el add y el incr
+        cache.set(key, 1, None)
+
+
+def estadisticas():
+    hits = cache.get(HITS_KEY, 0)
+    misses = cache.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        "backend": settings.CACHES["default"]["BACKEND"],
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": hits / total if total else 0.0,
+    }
+
+
+def get_or_set_publico(nombre, default, alcances=ALCANCES):
+    '''
+    Igual que cache.get_or_set pero bajo las generaciones de paginas publicas, para que
+    el valor se descarte cuando cambia alguno de los modelos de `alcances`.
+    '''
+    key = clave_publica(nombre, alcances)
+    value = cache.get(key)
+    registrar_acceso(value is not None)
+    if value is None:
+        value = default()
+        if value is not None:
+            cache.set(key, value, settings.PUBLIC_PAGE_CACHE_TIMEOUT)
+    return value
+
+
+def cache_public_page(*alcances):
+    '''
+    Cachea la respuesta completa de la vista solo para visitantes anonimos que hacen GET
+    y no tienen mensajes pendientes; el resto de los pedidos se renderiza normalmente.
+    `alcances` son los modelos que muestra la pagina: se descarta cuando cambia alguno.
+    '''
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if (
+                request.method != "GET"
+                or request.user.is_authenticated
+                or len(get_messages(request))
+            ):
+                return view(request, *args, **kwargs)
+
+            key = clave_publica(f"vista:{request.get_full_path()}", alcances)
+            response = cache.get(key)
+            registrar_acceso(response is not None)
+            if response is not None:
+                return response
+
+            response = view(request, *args, **kwargs)
+            # No se cachean respuestas que setean cookies (sesion, csrf) ni errores/redirecciones
+            if response.status_code == 200 and not response.cookies:
+                cache.set(key, response, settings.PUBLIC_PAGE_CACHE_TIMEOUT)
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Venue)
+@receiver(post_delete, sender=Venue)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+@receiver(m2m_changed, sender=Event.categories.through)
+def invalidar_al_modificar(sender, **kwargs):
+    # m2m_changed avisa antes y despues de cada cambio, alcanza con invalidar despues
+    if kwargs.get("action", "").startswith("pre_"):
+        return
+    if sender is Event.categories.through:
+        invalidar_paginas_publicas("event", "category")
+    else:
+        invalidar_paginas_publicas(ALCANCE_DE_MODELO[sender])
+
+
+@receiver(m2m_changed, sender=Event.categories.through)
+def versionar_filas_de_eventos(sender, instance, action, reverse, pk_set, **kwargs):
+    '''
+    La fila de cada evento en el listado se cachea por updated_at; si cambian sus
+    categorias hay que mover esa version aunque el evento no se haya guardado.
+    '''
+    if isinstance(instance, Event):
+        if action.startswith("post_"):
+            Event.objects.filter(pk=instance.pk).update(updated_at=timezone.now())
+    elif action == "pre_clear":
+        # Desde la categoria, el clear no informa que eventos pierden la relacion
+        instance.invalidar_eventos()
+    elif action in ("post_add", "post_remove") and pk_set:
+        Event.objects.filter(pk__in=pk_set).update(updated_at=timezone.now())
@@ -0,0 +1,327 @@
+'''
+Prueba de carga: datos de prueba con el formato de fixtures/ y usuarios virtuales que
+repiten por HTTP una mezcla de pedidos contra un servidor ya levantado (runserver,
+gunicorn o uvicorn). Lo usan los comandos seed_load_test y load_test.
+'''
+import random
+import threading
+import time
+from collections import Counter, defaultdict
+from urllib.parse import urlsplit
+
+import requests
+from django.contrib.auth.hashers import make_password
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import Ticket
+
+PREFIJO = "carga"
+PASSWORD = "carga12345"
+PRIMER_PK = 900_000
+CIUDADES = ["La Plata", "Córdoba", "Rosario", "Mendoza", "Tucumán"]
+CATEGORIAS = ["Música", "Teatro", "Deportes", "Cine", "Gastronomía"]
+
+# Peso de cada pedido en la mezcla por defecto: sobre todo lecturas, como el trafico real
+MEZCLA = {
+    "events": 30,
+    "event_detail": 30,
+    "countdown_json": 20,
+    "ticket_buy": 8,
+    "add_comment": 7,
+    "create_rating": 5,
+}
+PERCENTILES = (50, 95, 99)
+
+
+def generar_fixture(usuarios, eventos, primer_pk=PRIMER_PK):
+    '''
+    Registros para loaddata: un organizador, `usuarios` asistentes y `eventos` eventos
+    futuros repartidos en algunas ubicaciones y categorias. Los pk empiezan en `primer_pk`
+    para no pisar datos existentes.
+    '''
+    ahora = timezone.now().replace(microsecond=0)
+    creado = ahora.isoformat()
+    # El hash es caro a proposito: se calcula una vez y lo comparten todos los usuarios
+    password = make_password(PASSWORD)
+
+    def usuario(pk, nombre, is_organizer):
+        return {
+            "model": "app.user",
+            "pk": pk,
+            "fields": {
+                "username": nombre, "password": password, "email": f"{nombre}@example.com",
+                "is_organizer": is_organizer, "date_joined": creado,
+            },
+        }
+
+    registros = [usuario(primer_pk, f"{PREFIJO}_organizador", True)]
+    registros += [usuario(primer_pk + 1 + i, f"{PREFIJO}_{i}", False) for i in range(usuarios)]
+    registros += [
+        {
+            "model": "app.venue",
+            "pk": primer_pk + i,
+            "fields": {
+                # Capacidad de sobra: la prueba mide la compra, no el evento agotado
+                "name": f"Sala {ciudad}", "address": "-", "city": ciudad, "capacity": 1_000_000,
+                "contact": "-", "created_at": creado, "updated_at": creado,
+            },
+        }
+        for i, ciudad in enumerate(CIUDADES)
+    ]
+    registros += [
+        {"model": "app.category", "pk": primer_pk + i, "fields": {"name": f"{nombre} ({PREFIJO})", "description": nombre}}
+        for i, nombre in enumerate(CATEGORIAS)
+    ]
+    registros += [
+        {
+            "model": "app.event",
+            "pk": primer_pk + i,
+            "fields": {
+                "title": f"Evento de carga {i}",
+                "description": "Evento generado para la prueba de carga",
+                "scheduled_at": (ahora + timezone.timedelta(days=30, hours=i)).isoformat(),
+                "organizer": primer_pk,
+                "venue": primer_pk + i % len(CIUDADES),
+                "categories": [primer_pk + i % len(CATEGORIAS)],
+                "created_at": creado,
+                "updated_at": creado,
+            },
+        }
+        for i in range(eventos)
+    ]
+    return registros
+
+
+def datos_de_fixture(registros):
+    '''(usernames de los asistentes, ids de eventos) de un fixture de generar_fixture.'''
+    asistentes = [r["fields"]["username"] for r in registros if r["model"] == "app.user" and not r["fields"]["is_organizer"]]
+    eventos = [r["pk"] for r in registros if r["model"] == "app.event"]
+    return asistentes, eventos
+
+
+def leer_mezcla(texto):
+    '''"events=50,ticket_buy=10" -> {"events": 50, "ticket_buy": 10}; ValueError si no es valida.'''
+    mezcla = {}
+    for parte in texto.split(","):
+        nombre, _, peso = parte.partition("=")
+        nombre = nombre.strip()
+        if nombre not in MEZCLA:
+            raise ValueError(f"Pedido desconocido: {nombre!r} (opciones: {', '.join(MEZCLA)})")
+        mezcla[nombre] = int(peso)
+        if mezcla[nombre] < 0:
+            raise ValueError(f"El peso de {nombre} no puede ser negativo")
+    if not any(mezcla.values()):
+        raise ValueError("La mezcla no tiene ningun pedido")
+    return mezcla
+
+
+def percentil(ordenados, p):
+    # Por rango mas cercano: siempre es una de las mediciones
+    indice = max(0, -(-p * len(ordenados) // 100) - 1)
+    return ordenados[indice]
+
+
+class UsuarioVirtual:
+    '''Una sesion HTTP logueada que hace pedidos de la mezcla y mide cada uno.'''
+
+    def __init__(self, url, username, timeout=30):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.username = username
+
+    def login(self):
+        # El GET deja la cookie csrftoken; Django la rota al loguear y Session guarda la nueva
+        self.session.get(self.url + reverse("login"), timeout=self.timeout)
+        respuesta = self.session.post(
+            self.url + reverse("login"),
+            data={"username": self.username, "password": PASSWORD, "csrfmiddlewaretoken": self.session.cookies.get("csrftoken", "")},
+            allow_redirects=False,
+            timeout=self.timeout,
+        )
+        if respuesta.status_code != 302:
+            raise RuntimeError(f"No se pudo loguear a {self.username} (HTTP {respuesta.status_code})")
+
+    def pedido(self, nombre, event_id):
+        if nombre == "events":
+            return "GET", reverse("events"), None
+        if nombre == "event_detail":
+            return "GET", reverse("event_detail", args=[event_id]), None
+        if nombre == "countdown_json":
+            return "GET", reverse("countdown_json", args=[event_id]), None
+        if nombre == "ticket_buy":
+            return "POST", reverse("ticket_buy", args=[event_id]), {"quantity": 1, "type": "GENERAL"}
+        if nombre == "add_comment":
+            return "POST", reverse("add_comment", args=[event_id]), {"title": "Carga", "text": "Comentario de prueba"}
+        return "POST", reverse("create_rating", args=[event_id]), {"title": "Carga", "text": "Prueba", "rating": 4}
+
+    def medir(self, nombre, event_id):
+        '''
+        ("ok", "rechazo" o "error", milisegundos). Las vistas rechazan un POST (p. ej. la
+        quinta entrada de un usuario) redirigiendo al formulario con un mensaje, no con un 4xx.
+        '''
+        metodo, ruta, datos = self.pedido(nombre, event_id)
+        headers = {"X-CSRFToken": self.session.cookies.get("csrftoken", "")} if metodo == "POST" else {}
+        inicio = time.perf_counter()
+        try:
+            # Sin seguir redirecciones: se mide solo la vista pedida
+            respuesta = self.session.request(
+                metodo, self.url + ruta, data=datos, headers=headers, allow_redirects=False, timeout=self.timeout
+            )
+        except requests.RequestException:
+            return "error", (time.perf_counter() - inicio) * 1000
+        ms = (time.perf_counter() - inicio) * 1000
+        if respuesta.status_code >= 400:
+            return "error", ms
+        destino = urlsplit(respuesta.headers.get("Location", "")).path
+        if nombre == "ticket_buy" and destino == reverse("ticket_form", args=[event_id]):
+            return "rechazo", ms
+        return "ok", ms
+
+
+class Limites:
+    '''
+    Entradas compradas y eventos calificados por cada asistente en la corrida, compartidos
+    entre hilos, para elegir eventos en los que el pedido no choque con un limite (4 entradas
+    por evento, una calificacion). create_rating redirige igual si rechaza, asi que solo asi
+    se distingue.
+    '''
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.compradas = defaultdict(Counter)
+        self.calificados = defaultdict(set)
+
+    def tomar(self, nombre, username, event_ids, azar):
+        '''(event_id, si el pedido ya se sabe rechazado porque no queda evento libre).'''
+        with self.lock:
+            if nombre == "ticket_buy":
+                compradas = self.compradas[username]
+                libres = [e for e in event_ids if compradas[e] < Ticket.LIMITE_POR_USUARIO]
+            elif nombre == "create_rating":
+                libres = [e for e in event_ids if e not in self.calificados[username]]
+            else:
+                return azar.choice(event_ids), False
+            if not libres:
+                return azar.choice(event_ids), True
+            # Se reserva antes de pedir: otro hilo con el mismo asistente elige otro evento
+            event_id = azar.choice(libres)
+            if nombre == "ticket_buy":
+                self.compradas[username][event_id] += 1
+            else:
+                self.calificados[username].add(event_id)
+            return event_id, False
+
+    def devolver(self, nombre, username, event_id):
+        with self.lock:
+            if nombre == "ticket_buy":
+                self.compradas[username][event_id] -= 1
+            elif nombre == "create_rating":
+                self.calificados[username].discard(event_id)
+
+
+class Turnos:
+    '''Reparte pedidos entre hilos hasta agotar la cantidad o el tiempo.'''
+
+    def __init__(self, pedidos=None, segundos=None):
+        self.restantes = pedidos
+        self.fin = time.perf_counter() + segundos if segundos else None
+        self.lock = threading.Lock()
+
+    def otro(self):
+        if self.fin is not None and time.perf_counter() >= self.fin:
+            return False
+        with self.lock:
+            if self.restantes is None:
+                return True
+            if self.restantes <= 0:
+                return False
+            self.restantes -= 1
+            return True
+
+
+def correr(url, usuarios, event_ids, mezcla=None, hilos=10, pedidos=None, segundos=None, semilla=None):
+    '''
+    Corre `hilos` usuarios virtuales en paralelo hasta hacer `pedidos` pedidos o pasar
+    `segundos`, y devuelve el resumen de resumir(). Cada hilo se loguea con uno de
+    `usuarios` antes de empezar a medir.
+    '''
+    mezcla = mezcla or MEZCLA
+    nombres = [nombre for nombre, peso in mezcla.items() if peso]
+    pesos = [mezcla[nombre] for nombre in nombres]
+    virtuales = [UsuarioVirtual(url, usuarios[i % len(usuarios)]) for i in range(hilos)]
+    for virtual in virtuales:
+        virtual.login()
+
+    mediciones = defaultdict(list)
+    errores = defaultdict(int)
+    rechazos = defaultdict(int)
+    lock = threading.Lock()
+    turnos = Turnos(pedidos=pedidos, segundos=segundos)
+    limites = Limites()
+
+    def trabajar(numero):
+        azar = random.Random(None if semilla is None else semilla + numero)
+        virtual = virtuales[numero]
+        propias = []
+        while turnos.otro():
+            nombre = azar.choices(nombres, pesos)[0]
+            event_id, rechazado = limites.tomar(nombre, virtual.username, event_ids, azar)
+            resultado, ms = virtual.medir(nombre, event_id)
+            if rechazado and resultado == "ok":
+                resultado = "rechazo"
+            elif not rechazado and resultado != "ok":
+                limites.devolver(nombre, virtual.username, event_id)
+            propias.append((nombre, resultado, ms))
+        with lock:
+            for nombre, resultado, ms in propias:
+                if resultado == "error":
+                    errores[nombre] += 1
+                elif resultado == "rechazo":
+                    rechazos[nombre] += 1
+                else:
+                    mediciones[nombre].append(ms)
+
+    inicio = time.perf_counter()
+    trabajadores = [threading.Thread(target=trabajar, args=(i,)) for i in range(hilos)]
+    for trabajador in trabajadores:
+        trabajador.start()
+    for trabajador in trabajadores:
+        trabajador.join()
+    total = time.perf_counter() - inicio
+
+    resumen = resumir(mediciones, errores, total, rechazos)
+    resumen.update({"url": url, "hilos": hilos, "mezcla": mezcla})
+    return resumen
+
+
+def resumir(mediciones, errores, segundos, rechazos=None):
+    '''
+    {"segundos", "pedidos", "errores", "rechazos", "pedidos_por_segundo", "endpoints": {nombre: {...}}};
+    los percentiles son de los pedidos que la vista acepto, sin errores ni rechazos, en milisegundos.
+    '''
+    rechazos = rechazos or {}
+    endpoints = {}
+    for nombre in sorted(set(mediciones) | set(errores) | set(rechazos)):
+        ordenados = sorted(mediciones.get(nombre, []))
+        cantidad = len(ordenados) + errores.get(nombre, 0) + rechazos.get(nombre, 0)
+        datos = {
+            "pedidos": cantidad,
+            "errores": errores.get(nombre, 0),
+            "rechazos": rechazos.get(nombre, 0),
+            "pedidos_por_segundo": round(cantidad / segundos, 2),
+        }
+        for p in PERCENTILES:
+            datos[f"p{p}_ms"] = round(percentil(ordenados, p), 2) if ordenados else None
+        datos["max_ms"] = round(ordenados[-1], 2) if ordenados else None
+        endpoints[nombre] = datos
+    pedidos = sum(datos["pedidos"] for datos in endpoints.values())
+    return {
+        "segundos": round(segundos, 2),
+        "pedidos": pedidos,
+        "errores": sum(datos["errores"] for datos in endpoints.values()),
+        "rechazos": sum(datos["rechazos"] for datos in endpoints.values()),
+        "pedidos_por_segundo": round(pedidos / segundos, 2) if segundos else 0.0,
+        "endpoints": endpoints,
+    }
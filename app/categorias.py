@@ -0,0 +1,68 @@
+'''
+Metadatos de las categorias (nombre, descripcion, si esta activa y cuantos eventos tiene)
+guardados en la memoria de cada proceso, para que el listado de categorias y el formulario
+de eventos no consulten la base ni la tabla intermedia en cada pedido.
+
+Cada proceso guarda la lista junto con una version que vive en el cache compartido; las
+señales de abajo cambian esa version al modificar categorias o las categorias de un evento,
+y cada proceso vuelve a leer la lista la proxima vez que la pide.
+'''
+import threading
+import time
+
+from django.apps import apps
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Count
+from django.db.models.signals import m2m_changed, post_delete, post_migrate, post_save
+from django.dispatch import receiver
+
+from .models import Category, Event
+
+VERSION_KEY = "categorias:version"
+
+_guardado = {"version": None, "categorias": []}
+_lock = threading.Lock()
+
+
+def version_actual():
+    return cache.get_or_set(VERSION_KEY, time.time_ns, None)
+
+
+def invalidar_categorias():
+    cache.set(VERSION_KEY, time.time_ns(), None)
+
+
+def cargar_categorias():
+    # Siempre de la primaria: una replica atrasada dejaria guardada la lista vieja
+    # bajo la version nueva hasta el proximo cambio
+    return list(Category.objects.using(DEFAULT_DB_ALIAS).annotate(event_count=Count("events")).order_by("pk"))
+
+
+def categorias():
+    '''Todas las categorias con `event_count`. Las instancias se comparten entre pedidos: no modificarlas.'''
+    version = version_actual()
+    with _lock:
+        if _guardado["version"] != version:
+            _guardado["categorias"] = cargar_categorias()
+            _guardado["version"] = version
+        return _guardado["categorias"]
+
+
+def categorias_activas():
+    return [category for category in categorias() if category.is_active]
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+# Al borrar un evento sus filas de la relacion se borran sin m2m_changed
+@receiver(post_delete, sender=Event)
+@receiver(m2m_changed, sender=Event.categories.through)
+# flush (p. ej. entre tests con TransactionTestCase) vacia las tablas sin otras señales
+@receiver(post_migrate, sender=apps.get_app_config("app"))
+def invalidar_al_modificar(sender, **kwargs):
+    if kwargs.get("action", "").startswith("pre_"):
+        return
+    # Recien al confirmar: antes otro proceso leeria la lista sin el cambio y la guardaria
+    # bajo la version nueva, y si la transaccion se deshace no hay nada que invalidar
+    transaction.on_commit(invalidar_categorias)
@@ -0,0 +1,115 @@
+import random
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+# Cookie que mantiene las lecturas en la primaria durante unos segundos despues de una
+# escritura, para que el pedido siguiente (p. ej. la redireccion de ticket_buy a la
+# encuesta) vea lo que se acaba de guardar aunque la replica venga atrasada
+COOKIE_PRIMARIA = "leer_primaria"
+
+# Estado del pedido en curso: {"replica": bool, "primaria": bool, "escribio": bool}
+_estado = ContextVar("estado_replicas", default=None)
+
+
+def lectura_en_replica(view):
+    '''
+    Permite que las lecturas de la vista vayan a una replica, salvo que el pedido
+    ya este fijado a la primaria (escritura previa, metodo no seguro o cookie).
+    '''
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        estado = _estado.get()
+        if estado is None:
+            return view(request, *args, **kwargs)
+        estado["replica"] = True
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            estado["replica"] = False
+
+    return wrapper
+
+
+class ReplicaMiddleware:
+    # Hibrido: bajo ASGI no obliga a pasar toda la cadena (y las vistas asincronas) por el
+    # unico hilo sincronico
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def iniciar(self, request):
+        return _estado.set({
+            "replica": False,
+            "primaria": request.method not in ("GET", "HEAD") or COOKIE_PRIMARIA in request.COOKIES,
+            "escribio": False,
+        })
+
+    def terminar(self, response):
+        if _estado.get()["escribio"]:
+            response.set_cookie(
+                COOKIE_PRIMARIA, "1", max_age=settings.REPLICA_STICKY_SECONDS, httponly=True, samesite="Lax"
+            )
+        return response
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = self.iniciar(request)
+        try:
+            return self.terminar(self.get_response(request))
+        finally:
+            _estado.reset(token)
+
+    async def __acall__(self, request):
+        # Las vistas sincronicas corren con una copia del contexto, pero el dict es el
+        # mismo: lo que marca db_for_write se ve aca
+        token = self.iniciar(request)
+        try:
+            return self.terminar(await self.get_response(request))
+        finally:
+            _estado.reset(token)
+
+
+class ReplicaRouter:
+    '''
+    Las escrituras van siempre a default. Las lecturas van a una de REPLICA_DATABASES solo
+    dentro de vistas marcadas con @lectura_en_replica y mientras el pedido no haya escrito
+    nada; fuera de un pedido (comandos, tests) usa default. select_for_update pasa por
+    db_for_write, asi que las lecturas que bloquean filas tambien van a la primaria.
+    '''
+
+    def db_for_read(self, model, **hints):
+        estado = _estado.get()
+        if (
+            not settings.REPLICA_DATABASES
+            or estado is None
+            or not estado["replica"]
+            or estado["primaria"]
+        ):
+            return "default"
+        return random.choice(settings.REPLICA_DATABASES)
+
+    def db_for_write(self, model, **hints):
+        estado = _estado.get()
+        if estado is not None:
+            # A partir de aca el pedido lee de la primaria (read-after-write)
+            estado["escribio"] = True
+            estado["primaria"] = True
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        bases = {"default", *settings.REPLICA_DATABASES}
+        if obj1._state.db in bases and obj2._state.db in bases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Las replicas se migran desde la primaria por replicacion
+        return db not in settings.REPLICA_DATABASES
@@ -0,0 +1,162 @@
+import asyncio
+import json
+import threading
+from collections import defaultdict
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+from .models import Event, disponibilidad_cambiada
+
+# Avisos pendientes por suscriptor; si un cliente lento acumula mas, se descartan los viejos
+MAX_PENDIENTES = 100
+
+
+def canal_evento(event_id):
+    return f"evento:{event_id}"
+
+
+def clave_estado(event_id):
+    return f"disponibilidad:{event_id}"
+
+
+class SuscripcionEnMemoria:
+    def __init__(self, broker, canal):
+        self.broker = broker
+        self.canal = canal
+        self.loop = asyncio.get_running_loop()
+        self.cola = asyncio.Queue(maxsize=MAX_PENDIENTES)
+
+    async def __aenter__(self):
+        self.broker.registrar(self)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.broker.desregistrar(self)
+
+    def entregar(self, mensaje):
+        # Corre dentro del loop del suscriptor
+        if self.cola.full():
+            self.cola.get_nowait()
+        self.cola.put_nowait(mensaje)
+
+    async def recibir(self, timeout):
+        '''Devuelve el proximo aviso, o None si no llego ninguno en `timeout` segundos.'''
+        try:
+            return await asyncio.wait_for(self.cola.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class BrokerEnMemoria:
+    '''
+    Pub/sub dentro del proceso. publicar() se puede llamar desde codigo sincronico
+    (cualquier hilo); cada suscriptor recibe el aviso en su propio event loop.
+    '''
+
+    def __init__(self, location=""):
+        self.suscripciones = defaultdict(set)
+        self.lock = threading.Lock()
+
+    def registrar(self, suscripcion):
+        with self.lock:
+            self.suscripciones[suscripcion.canal].add(suscripcion)
+
+    def desregistrar(self, suscripcion):
+        with self.lock:
+            self.suscripciones[suscripcion.canal].discard(suscripcion)
+            if not self.suscripciones[suscripcion.canal]:
+                del self.suscripciones[suscripcion.canal]
+
+    def suscribir(self, canal):
+        return SuscripcionEnMemoria(self, canal)
+
+    def publicar(self, canal, mensaje):
+        with self.lock:
+            suscripciones = list(self.suscripciones.get(canal, ()))
+        for suscripcion in suscripciones:
+            try:
+                suscripcion.loop.call_soon_threadsafe(suscripcion.entregar, mensaje)
+            except RuntimeError:
+                # El loop del suscriptor ya se cerro
+                self.desregistrar(suscripcion)
+
+
+class SuscripcionRedis:
+    def __init__(self, cliente, canal):
+        self.pubsub = cliente.pubsub(ignore_subscribe_messages=True)
+        self.canal = canal
+
+    async def __aenter__(self):
+        await self.pubsub.subscribe(self.canal)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.pubsub.unsubscribe(self.canal)
+        await self.pubsub.aclose()
+
+    async def recibir(self, timeout):
+        mensaje = await self.pubsub.get_message(timeout=timeout)
+        return json.loads(mensaje["data"]) if mensaje else None
+
+
+class BrokerRedis:
+    '''Mismo contrato que BrokerEnMemoria, repartiendo los avisos entre procesos via Redis.'''
+
+    def __init__(self, location):
+        import redis
+        import redis.asyncio
+
+        self.location = location
+        self.cliente = redis.Redis.from_url(location)
+        self.redis_async = redis.asyncio
+
+    def suscribir(self, canal):
+        # Cliente async por suscripcion: queda atado al event loop que lo usa
+        return SuscripcionRedis(self.redis_async.Redis.from_url(self.location), canal)
+
+    def publicar(self, canal, mensaje):
+        self.cliente.publish(canal, json.dumps(mensaje))
+
+
+@lru_cache(maxsize=None)
+def obtener_broker():
+    config = settings.EVENT_BROKER
+    return import_string(config["BACKEND"])(config["LOCATION"])
+
+
+def publicar_disponibilidad(event_id):
+    '''
+    Lee el estado actual del evento, lo deja en la cache para quien se conecte despues
+    y lo publica a las paginas abiertas.
+    '''
+    estado = (
+        Event.objects.filter(pk=event_id)
+        .values("tickets_sold", "status", "venue__capacity")
+        .first()
+    )
+    if estado is None:
+        return
+    mensaje = {
+        "remaining_capacity": max(estado["venue__capacity"] - estado["tickets_sold"], 0),
+        "status": estado["status"],
+    }
+    cache.set(clave_estado(event_id), mensaje, None)
+    obtener_broker().publicar(canal_evento(event_id), mensaje)
+
+
+@receiver(disponibilidad_cambiada)
+def avisar_cambio_de_entradas(sender, event_id, **kwargs):
+    publicar_disponibilidad(event_id)
+
+
+@receiver(post_save, sender=Event)
+def avisar_cambio_de_evento(sender, instance, created, **kwargs):
+    # Cambios de estado (Agotado, Cancelado, Reprogramado) o de ubicacion
+    if not created:
+        transaction.on_commit(lambda: publicar_disponibilidad(instance.pk), robust=True)
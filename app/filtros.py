@@ -0,0 +1,132 @@
+'''
+Filtros del listado de eventos (categorias, ciudad, rango de fechas y estado) y los
+contadores de cada opcion que se muestran al lado ("facetas").
+
+Cada faceta se cuenta con todos los filtros aplicados menos el suyo, asi elegir una
+categoria no hace desaparecer las demas: las tres se cuentan en una sola consulta (un
+UNION ALL de un GROUP BY por faceta), no un COUNT por opcion, y se cachean por
+combinacion de filtros bajo las generaciones de eventos, categorias y ubicaciones (ver
+cache.py).
+'''
+import datetime
+import hashlib
+from urllib.parse import urlencode
+
+from django.db.models import CharField, Count, F, Value
+from django.db.models.functions import Cast
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from .cache import get_or_set_publico
+from .models import Event
+
+FACETAS = ("category", "city", "status")
+
+
+def leer_fecha(valor):
+    try:
+        return parse_date(valor or "")
+    except ValueError:
+        # Bien formada pero inexistente, como 2025-02-30
+        return None
+
+
+def leer_filtros(params):
+    '''Normaliza los filtros de request.GET; los valores invalidos se ignoran.'''
+    status = params.get("status")
+    return {
+        "category": sorted({int(valor) for valor in params.getlist("category") if valor.isdigit()}),
+        "city": params.get("city", "").strip() or None,
+        "from": leer_fecha(params.get("from")),
+        "to": leer_fecha(params.get("to")),
+        "status": status if status in Event.Status.values else None,
+    }
+
+
+def parametros(filtros):
+    '''Los filtros activos como pares (nombre, valor) ordenados, listos para urlencode.'''
+    pares = [("category", pk) for pk in filtros["category"]]
+    for nombre in ("city", "from", "to", "status"):
+        if filtros[nombre]:
+            pares.append((nombre, str(filtros[nombre])))
+    return pares
+
+
+def querystring(filtros):
+    return urlencode(parametros(filtros))
+
+
+def firma(filtros):
+    # La ciudad es texto libre: el hash deja la clave corta y sin espacios para memcached
+    return hashlib.sha1(querystring(filtros).encode()).hexdigest()
+
+
+def inicio_del_dia(fecha):
+    return timezone.make_aware(datetime.datetime.combine(fecha, datetime.time.min))
+
+
+def aplicar(queryset, filtros, excepto=None):
+    '''Filtra `queryset` de eventos con `filtros`, salvo la faceta `excepto`.'''
+    if filtros["category"] and excepto != "category":
+        # Subconsulta sobre la tabla intermedia: un evento con dos de las categorias
+        # elegidas sale una sola vez sin necesidad de distinct
+        queryset = queryset.filter(
+            pk__in=Event.categories.through.objects.filter(category_id__in=filtros["category"]).values("event_id")
+        )
+    if filtros["city"] and excepto != "city":
+        queryset = queryset.filter(venue__city=filtros["city"])
+    if filtros["status"] and excepto != "status":
+        queryset = queryset.filter(status=filtros["status"])
+    # Las fechas son dias completos en la zona horaria del sitio; "to" incluye ese dia
+    if filtros["from"]:
+        queryset = queryset.filter(scheduled_at__gte=inicio_del_dia(filtros["from"]))
+    if filtros["to"]:
+        queryset = queryset.filter(scheduled_at__lt=inicio_del_dia(filtros["to"] + datetime.timedelta(days=1)))
+    return queryset
+
+
+def por_faceta(queryset, faceta, clave, nombre, contar):
+    # Mismas columnas en cada parte del UNION: (faceta, clave, nombre, total)
+    return (
+        queryset.annotate(faceta=Value(faceta), clave=Cast(clave, CharField()), nombre=F(nombre))
+        .values_list("faceta", "clave", "nombre")
+        .annotate(total=Count(contar))
+    )
+
+
+def contar_facetas(filtros):
+    eventos = Event.objects.order_by()
+    categorias = por_faceta(
+        Event.categories.through.objects.filter(event__in=aplicar(eventos, filtros, excepto="category")),
+        "category", "category_id", "category__name", "event_id",
+    )
+    ciudades = por_faceta(aplicar(eventos, filtros, excepto="city"), "city", "venue__city", "venue__city", "id")
+    estados = por_faceta(aplicar(eventos, filtros, excepto="status"), "status", "status", "status", "id")
+
+    resultado = {"category": [], "city": [], "status": {}}
+    for faceta, clave, nombre, total in categorias.union(ciudades, estados, all=True):
+        if faceta == "category":
+            resultado["category"].append((int(clave), nombre, total))
+        elif faceta == "city":
+            resultado["city"].append((clave, total))
+        else:
+            resultado["status"][clave] = total
+    # Las partes de un UNION no se pueden ordenar por separado
+    resultado["category"].sort(key=lambda fila: fila[1])
+    resultado["city"].sort()
+    # Todos los estados, aunque no tengan eventos, en el orden de Event.Status
+    resultado["status"] = [
+        (value, label, resultado["status"].get(value, 0)) for value, label in Event.Status.choices
+    ]
+    return resultado
+
+
+def facetas(filtros):
+    '''
+    {"category": [(id, nombre, total)], "city": [(ciudad, total)], "status": [(valor, etiqueta, total)]}
+    para los filtros dados. Se calcula en una consulta y se guarda en cache hasta que cambian
+    eventos, categorias o ubicaciones.
+    '''
+    return get_or_set_publico(
+        f"facetas:{firma(filtros)}", lambda: contar_facetas(filtros), alcances=("event", "category", "venue")
+    )
@@ -0,0 +1,55 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from app.models import Event, Ticket, User, Venue
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide entradas por segundo emitiendo un lote con Ticket.new (una por una) y con "
+        "Ticket.new_masivo. Corre en una transaccion que se deshace al final."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tickets", type=int, default=1000, help="Entradas por lote")
+
+    def handle(self, *args, **options):
+        cantidad = options["tickets"]
+        try:
+            with transaction.atomic():
+                organizer = User.objects.create(username="benchmark_boleteria", is_organizer=True)
+                venue = Venue.objects.create(
+                    name="Benchmark", address="-", city="-", capacity=cantidad * 2, contact="-"
+                )
+                usuarios = User.objects.bulk_create(
+                    [User(username=f"benchmark_grupo_{i}", password="!") for i in range(cantidad)]
+                )
+
+                for nombre, emitir in (("Ticket.new", self.una_por_una), ("Ticket.new_masivo", self.masivo)):
+                    event = Event.objects.create(
+                        title=f"Benchmark {nombre}", description="-", organizer=organizer, venue=venue,
+                        scheduled_at=timezone.now() + timezone.timedelta(days=30),
+                    )
+                    inicio = time.perf_counter()
+                    emitir(event, usuarios)
+                    segundos = time.perf_counter() - inicio
+                    self.stdout.write(f"{nombre}: {cantidad / segundos:.0f} entradas/s ({segundos:.2f}s)")
+                raise Rollback
+        except Rollback:
+            self.stdout.write(self.style.SUCCESS("Transaccion deshecha, la base quedo como estaba."))
+
+    def una_por_una(self, event, usuarios):
+        for user in usuarios:
+            Ticket.new(buy_date=timezone.now(), quantity=1, type=Ticket.Type.GENERAL, event=event, user=user)
+
+    def masivo(self, event, usuarios):
+        Ticket.new_masivo(
+            event, [{"user_id": user.pk, "quantity": 1, "type": Ticket.Type.GENERAL} for user in usuarios]
+        )
@@ -0,0 +1,188 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from app.models import Event, Rating, RefundRequest, Ticket, User, Venue
+
+BATCH_SIZE = 5000
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Carga datos de prueba y compara los planes de consulta de los caminos mas usados "
+        "sin y con los indices de Meta.indexes. Todo corre en una transaccion que se "
+        "deshace al final; conviene usarlo sobre una base descartable."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tickets", type=int, default=1_000_000, help="Entradas a generar")
+        parser.add_argument("--usuarios", type=int, default=20_000, help="Usuarios a generar")
+        parser.add_argument("--eventos", type=int, default=2_000, help="Eventos a generar")
+        parser.add_argument("--repeticiones", type=int, default=20, help="Ejecuciones por consulta para medir")
+        parser.add_argument("--seed", type=int, default=1)
+
+    def handle(self, *args, **options):
+        # Los datos se borran deshaciendo la transaccion, y en el medio se quitan y agregan
+        # indices: en MySQL cada DDL confirma la transaccion y el millon de filas quedaria
+        if not connection.features.can_rollback_ddl:
+            raise CommandError("Solo corre en motores con DDL transaccional (PostgreSQL o SQLite)")
+        self.rng = random.Random(options["seed"])
+        self.repeticiones = options["repeticiones"]
+        try:
+            # El editor se abre antes de la transaccion: en SQLite tiene que desactivar
+            # los chequeos de claves foraneas fuera de ella
+            with connection.schema_editor(atomic=False) as editor, transaction.atomic():
+                inicio = time.perf_counter()
+                muestra = self.cargar_datos(options["tickets"], options["usuarios"], options["eventos"])
+                self.stdout.write(f"Datos cargados en {time.perf_counter() - inicio:.1f}s")
+
+                consultas = self.consultas(muestra)
+                indices = [
+                    (model, index)
+                    for model in (Ticket, Rating, RefundRequest, Venue, Event)
+                    for index in model._meta.indexes
+                ]
+
+                for model, index in indices:
+                    editor.remove_index(model, index)
+                self.informar("SIN INDICES", consultas)
+
+                for model, index in indices:
+                    editor.add_index(model, index)
+                self.informar("CON INDICES", consultas)
+                raise Rollback
+        except Rollback:
+            self.stdout.write(self.style.SUCCESS("Transaccion deshecha, la base quedo como estaba."))
+
+    def cargar_datos(self, cantidad_tickets, cantidad_usuarios, cantidad_eventos):
+        ahora = timezone.now()
+        User.objects.bulk_create(
+            [User(username=f"bench_{i}", password="!", is_organizer=i % 100 == 0) for i in range(cantidad_usuarios)],
+            batch_size=BATCH_SIZE,
+        )
+        usuarios = list(User.objects.filter(username__startswith="bench_").values_list("id", flat=True))
+        organizadores = usuarios[::100]
+
+        Venue.objects.bulk_create(
+            [
+                Venue(name=f"Ubicacion {i}", address="-", city="-", capacity=100_000, contact="-", bl_baja=i % 2 == 0)
+                for i in range(200)
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        ubicaciones = list(Venue.objects.filter(bl_baja=False).values_list("id", flat=True))
+
+        Event.objects.bulk_create(
+            [
+                Event(
+                    title=f"Evento {i}",
+                    description="-",
+                    scheduled_at=ahora + timezone.timedelta(days=self.rng.randint(-365, 365)),
+                    organizer_id=self.rng.choice(organizadores),
+                    venue_id=self.rng.choice(ubicaciones),
+                )
+                for i in range(cantidad_eventos)
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        eventos = list(Event.objects.filter(title__startswith="Evento ").values_list("id", flat=True))
+
+        for inicio in range(0, cantidad_tickets, BATCH_SIZE):
+            Ticket.objects.bulk_create(
+                [
+                    Ticket(
+                        quantity=self.rng.randint(1, 4),
+                        event_id=self.rng.choice(eventos),
+                        user_id=self.rng.choice(usuarios),
+                        buy_date=ahora,
+                        bl_baja=self.rng.random() < 0.1,
+                    )
+                    for _ in range(min(BATCH_SIZE, cantidad_tickets - inicio))
+                ]
+            )
+
+        # Una calificacion y una solicitud de reembolso cada 20 entradas
+        cantidad_extra = max(cantidad_tickets // 20, 1)
+        calificaciones = []
+        vigentes = set()
+        for _ in range(cantidad_extra):
+            par = (self.rng.choice(usuarios), self.rng.choice(eventos))
+            # Solo puede haber una calificacion vigente por usuario y evento
+            is_current = par not in vigentes
+            vigentes.add(par)
+            calificaciones.append(
+                Rating(user_id=par[0], event_id=par[1], title="-", rating=self.rng.randint(1, 5), is_current=is_current)
+            )
+        Rating.objects.bulk_create(calificaciones, batch_size=BATCH_SIZE)
+        RefundRequest.objects.bulk_create(
+            [
+                RefundRequest(
+                    ticket_code="-",
+                    reason="no_asistencia",
+                    requester_id=self.rng.choice(usuarios),
+                    status=self.rng.choice(RefundRequest.Status.values),
+                )
+                for _ in range(cantidad_extra)
+            ],
+            batch_size=BATCH_SIZE,
+        )
+
+        ticket = Ticket.objects.filter(event_id__in=eventos, bl_baja=False).order_by("?").first()
+        return {
+            "user": ticket.user_id,
+            "event": ticket.event_id,
+            "organizer": self.rng.choice(organizadores),
+        }
+
+    def consultas(self, muestra):
+        return [
+            (
+                "Limite de entradas por usuario y evento",
+                Ticket.objects.filter(user_id=muestra["user"], event_id=muestra["event"], bl_baja=False)
+                .values("event")
+                .annotate(total=Sum("quantity")),
+            ),
+            (
+                "Entradas vendidas de un evento",
+                Ticket.objects.filter(event_id=muestra["event"], bl_baja=False)
+                .values("event")
+                .annotate(total=Sum("quantity")),
+            ),
+            (
+                "Calificaciones vigentes de un evento",
+                Rating.objects.filter(event_id=muestra["event"], bl_baja=False, is_current=True),
+            ),
+            (
+                "Reembolsos pendientes de un usuario",
+                RefundRequest.objects.filter(requester_id=muestra["user"], status=RefundRequest.Status.PENDING),
+            ),
+            ("Ubicaciones activas", Venue.objects.filter(bl_baja=False).order_by("name")),
+            (
+                "Eventos de un organizador",
+                Event.objects.filter(organizer_id=muestra["organizer"]).order_by("scheduled_at"),
+            ),
+        ]
+
+    def informar(self, titulo, consultas):
+        # Actualiza las estadisticas para que el planificador elija con datos reales
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        self.stdout.write(self.style.MIGRATE_HEADING(f"== {titulo} =="))
+        for nombre, queryset in consultas:
+            tiempos = []
+            for _ in range(self.repeticiones):
+                inicio = time.perf_counter()
+                list(queryset.all())
+                tiempos.append(time.perf_counter() - inicio)
+            self.stdout.write(f"{nombre}: mediana {statistics.median(tiempos) * 1000:.2f} ms")
+            for linea in queryset.explain().splitlines():
+                self.stdout.write(f"    {linea}")
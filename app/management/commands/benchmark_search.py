@@ -0,0 +1,91 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from app.busqueda import buscar_eventos, indexa, reconstruir_indice
+from app.models import Category, Event, User, Venue
+
+PALABRAS = [
+    "música", "rock", "festival", "teatro", "jazz", "tango", "folklore", "electrónica", "danza",
+    "comedia", "cine", "feria", "gastronomía", "maratón", "fútbol", "conferencia", "taller",
+    "exposición", "ópera", "candombe", "acústico", "nocturno", "infantil", "clásico",
+]
+CIUDADES = ["La Plata", "Córdoba", "Rosario", "Mendoza", "Tucumán", "Neuquén", "Bahía Blanca"]
+BUSQUEDAS = ["musica", "rock cordoba", "teatro", "festival jazz", "opera", "tango rosario", "electro", "fut"]
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Carga eventos de prueba, arma el indice de busqueda y mide la latencia de buscar_eventos "
+        "(mediana y p95). Corre en una transaccion que se deshace al final."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--eventos", type=int, default=100_000, help="Eventos a cargar")
+        parser.add_argument("--busquedas", type=int, default=400, help="Busquedas a medir")
+
+    def handle(self, *args, **options):
+        if not indexa():
+            raise CommandError("Este motor de base de datos no usa indice de busqueda")
+        azar = random.Random(42)
+        try:
+            with transaction.atomic():
+                organizer = User.objects.create(username="benchmark_busqueda", is_organizer=True)
+                venues = Venue.objects.bulk_create([
+                    Venue(name=f"Sala {i}", address="-", city=ciudad, capacity=500, contact="-")
+                    for i, ciudad in enumerate(CIUDADES * 10)
+                ])
+                categorias = Category.objects.bulk_create(
+                    [Category(name=f"Benchmark {palabra}") for palabra in PALABRAS[:8]]
+                )
+                ahora = timezone.now()
+                events = Event.objects.bulk_create(
+                    [
+                        Event(
+                            title=" ".join(azar.sample(PALABRAS, 3)).capitalize(),
+                            # Relleno variado y una palabra del vocabulario, para que cada busqueda
+                            # coincida con una parte de los eventos y no con casi todos
+                            description=" ".join(
+                                [azar.choice(PALABRAS)] + [f"texto{azar.randrange(5000)}" for _ in range(20)]
+                            ),
+                            scheduled_at=ahora + timezone.timedelta(minutes=i),
+                            organizer=organizer,
+                            venue=azar.choice(venues),
+                        )
+                        for i in range(options["eventos"])
+                    ],
+                    batch_size=2000,
+                )
+                Event.categories.through.objects.bulk_create(
+                    [
+                        Event.categories.through(event_id=event.pk, category_id=azar.choice(categorias).pk)
+                        for event in events
+                    ],
+                    batch_size=2000,
+                )
+
+                inicio = time.perf_counter()
+                reconstruir_indice()
+                self.stdout.write(f"Indice armado en {time.perf_counter() - inicio:.1f}s")
+
+                tiempos = []
+                for i in range(options["busquedas"]):
+                    inicio = time.perf_counter()
+                    buscar_eventos(BUSQUEDAS[i % len(BUSQUEDAS)], pagina=1 + i % 3)
+                    tiempos.append((time.perf_counter() - inicio) * 1000)
+                p95 = statistics.quantiles(tiempos, n=20)[-1]
+                self.stdout.write(
+                    f"{options['eventos']} eventos, {len(tiempos)} busquedas: "
+                    f"mediana {statistics.median(tiempos):.1f} ms, p95 {p95:.1f} ms, max {max(tiempos):.1f} ms"
+                )
+                raise Rollback
+        except Rollback:
+            self.stdout.write(self.style.SUCCESS("Transaccion deshecha, la base quedo como estaba."))
@@ -0,0 +1,107 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection
+from django.utils import timezone
+
+from app.models import Event, Ticket, User, Venue
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara el rendimiento de compras concurrentes sobre SQLite sin y con "
+        "DJANGO_DB_SQLITE_TUNING. Cada medicion usa un archivo temporal propio."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--compradores", type=int, default=400, help="Compras a intentar")
+        parser.add_argument("--hilos", type=int, default=16, help="Compradores simultaneos")
+        parser.add_argument(
+            "--medir",
+            action="store_true",
+            help="Uso interno: mide sobre la base configurada e imprime el resultado en JSON",
+        )
+
+    def handle(self, *args, **options):
+        if options["medir"]:
+            if connection.vendor != "sqlite":
+                raise CommandError("La medicion solo tiene sentido sobre SQLite")
+            self.stdout.write(json.dumps(self.medir(options["compradores"], options["hilos"])))
+            return
+
+        # Cada modo corre en otro proceso: los OPTIONS de la conexion se leen al iniciar Django
+        for nombre, tuning in (("Sin ajustes", "0"), ("Con WAL + BEGIN IMMEDIATE", "1")):
+            with tempfile.TemporaryDirectory() as directorio:
+                env = {
+                    **os.environ,
+                    "DJANGO_DB_ENGINE": "sqlite",
+                    "DJANGO_DB_NAME": str(Path(directorio) / "benchmark.sqlite3"),
+                    "DJANGO_DB_SQLITE_TUNING": tuning,
+                }
+                self.manage(env, "migrate", "--verbosity", "0")
+                salida = self.manage(
+                    env, "benchmark_sqlite", "--medir",
+                    "--compradores", str(options["compradores"]), "--hilos", str(options["hilos"]),
+                )
+            resultado = json.loads(salida.strip().splitlines()[-1])
+            self.stdout.write(
+                f"{nombre}: {resultado['compras_por_segundo']:.1f} compras/s, "
+                f"{resultado['vendidas']} vendidas, {resultado['bloqueos']} fallidas por 'database is locked' "
+                f"({resultado['segundos']:.2f}s)"
+            )
+
+    def manage(self, env, *args):
+        resultado = subprocess.run(
+            [sys.executable, str(Path(settings.BASE_DIR) / "manage.py"), *args],
+            env=env, capture_output=True, text=True,
+        )
+        if resultado.returncode:
+            raise CommandError(resultado.stderr)
+        return resultado.stdout
+
+    def medir(self, compradores, hilos):
+        organizer = User.objects.create(username="benchmark_organizador", is_organizer=True)
+        venue = Venue.objects.create(
+            name="Benchmark", address="-", city="-", capacity=compradores, contact="-"
+        )
+        event = Event.objects.create(
+            title="Benchmark", description="-", scheduled_at=timezone.now() + timezone.timedelta(days=30),
+            organizer=organizer, venue=venue,
+        )
+        usuarios = User.objects.bulk_create(
+            [User(username=f"benchmark_{i}", password="!") for i in range(compradores)]
+        )
+
+        def comprar(user):
+            # Como en ticket_buy: se lee el evento y se compra, sin reintentos
+            try:
+                evento = Event.objects.select_related("venue").get(pk=event.pk)
+                Ticket.new(buy_date=timezone.now(), quantity=1, type=Ticket.Type.GENERAL, event=evento, user=user)
+                return "vendida"
+            except ValidationError:
+                return "rechazada"
+            except OperationalError:
+                return "bloqueo"
+            finally:
+                connection.close()
+
+        inicio = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=hilos) as pool:
+            resultados = list(pool.map(comprar, usuarios))
+        segundos = time.perf_counter() - inicio
+
+        return {
+            "segundos": segundos,
+            "vendidas": resultados.count("vendida"),
+            "bloqueos": resultados.count("bloqueo"),
+            "compras_por_segundo": resultados.count("vendida") / segundos,
+        }
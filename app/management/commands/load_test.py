@@ -0,0 +1,75 @@
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from app.carga import MEZCLA, correr, datos_de_fixture, leer_mezcla
+
+
+class Command(BaseCommand):
+    help = (
+        "Prueba de carga contra un servidor levantado (runserver, gunicorn, uvicorn): usuarios "
+        "virtuales repiten una mezcla de pedidos y se informa pedidos/s y p50/p95/p99 por "
+        "endpoint en JSON. Los datos salen de seed_load_test."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", default="http://127.0.0.1:8000", help="Direccion del servidor")
+        parser.add_argument(
+            "--fixture",
+            default=str(Path(settings.BASE_DIR) / "fixtures" / "load_test.json"),
+            help="Fixture generado por seed_load_test",
+        )
+        parser.add_argument("--hilos", type=int, default=10, help="Usuarios virtuales simultaneos")
+        parser.add_argument("--segundos", type=float, default=30, help="Duracion de la prueba")
+        parser.add_argument("--pedidos", type=int, help="Cortar despues de esta cantidad de pedidos")
+        parser.add_argument(
+            "--mezcla",
+            default=",".join(f"{nombre}={peso}" for nombre, peso in MEZCLA.items()),
+            help="Pesos de cada pedido, p. ej. events=50,ticket_buy=10",
+        )
+        parser.add_argument("--semilla", type=int, help="Semilla para repetir la misma secuencia de pedidos")
+        parser.add_argument("--salida", help="Ademas de imprimirlo, guardar el resultado en este archivo")
+        parser.add_argument("--comparar", help="Resultado anterior contra el cual comparar los p95")
+
+    def handle(self, *args, **options):
+        try:
+            mezcla = leer_mezcla(options["mezcla"])
+            registros = json.loads(Path(options["fixture"]).read_text(encoding="utf-8"))
+            # Antes de correr: un archivo equivocado no debe tirar abajo una prueba de minutos
+            anterior = self.leer_resultado(options["comparar"]) if options["comparar"] else None
+        except (OSError, ValueError) as e:
+            raise CommandError(e)
+        usuarios, event_ids = datos_de_fixture(registros)
+        if not usuarios or not event_ids:
+            raise CommandError("El fixture no tiene asistentes o eventos; generarlo con seed_load_test")
+
+        try:
+            resultado = correr(
+                options["url"], usuarios, event_ids, mezcla=mezcla, hilos=options["hilos"],
+                pedidos=options["pedidos"], segundos=None if options["pedidos"] else options["segundos"],
+                semilla=options["semilla"],
+            )
+        except (OSError, RuntimeError) as e:
+            raise CommandError(e)
+
+        salida = json.dumps(resultado, indent=2)
+        self.stdout.write(salida)
+        if options["salida"]:
+            Path(options["salida"]).write_text(salida + "\n", encoding="utf-8")
+        if anterior is not None:
+            self.comparar(anterior, resultado)
+
+    def leer_resultado(self, archivo):
+        anterior = json.loads(Path(archivo).read_text(encoding="utf-8"))
+        if not isinstance(anterior, dict) or not isinstance(anterior.get("endpoints"), dict):
+            raise ValueError(f"{archivo} no es un resultado de load_test")
+        return anterior
+
+    def comparar(self, anterior, actual):
+        for nombre, datos in actual["endpoints"].items():
+            antes = anterior["endpoints"].get(nombre, {}).get("p95_ms")
+            ahora = datos["p95_ms"]
+            if antes and ahora:
+                self.stderr.write(f"{nombre}: p95 {antes:.1f} ms -> {ahora:.1f} ms ({(ahora - antes) / antes:+.0%})")
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from app.models import EventDailyStat
+
+
+class Command(BaseCommand):
+    help = "Recalcula el resumen diario del tablero de organizadores a partir de las tablas de origen"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--event",
+            type=int,
+            action="append",
+            dest="events",
+            help="Solo este evento (se puede repetir)",
+        )
+
+    def handle(self, *args, **options):
+        filas = EventDailyStat.reconstruir(event_ids=options["events"])
+        self.stdout.write(self.style.SUCCESS(f"Resumen diario recalculado: {filas} fila(s)."))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from app.busqueda import indexa, reconstruir_indice
+
+
+class Command(BaseCommand):
+    help = "Vuelve a armar el indice de busqueda de eventos (FTS5 en SQLite, tsvector en PostgreSQL)"
+
+    def handle(self, *args, **options):
+        if not indexa():
+            self.stdout.write(self.style.WARNING("Este motor de base de datos no usa indice de busqueda."))
+            return
+        total = reconstruir_indice()
+        self.stdout.write(self.style.SUCCESS(f"{total} evento(s) indexados."))
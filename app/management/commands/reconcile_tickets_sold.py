@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from app.models import Event
+
+
+class Command(BaseCommand):
+    help = "Recalcula Event.tickets_sold a partir de la suma real de entradas activas"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Solo informa las diferencias, sin corregirlas",
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options["dry_run"]
+        diferencias = Event.reconciliar_tickets_vendidos(dry_run=dry_run)
+
+        for event, guardado, real in diferencias:
+            self.stdout.write(f"Evento {event.pk} ({event.title}): tickets_sold={guardado}, real={real}")
+
+        if not diferencias:
+            self.stdout.write(self.style.SUCCESS("Los contadores de entradas vendidas estan al dia."))
+        elif dry_run:
+            self.stdout.write(self.style.WARNING(f"{len(diferencias)} evento(s) con diferencias."))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"{len(diferencias)} evento(s) corregidos."))
@@ -0,0 +1,42 @@
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+from app.carga import PRIMER_PK, datos_de_fixture, generar_fixture
+from app.models import Comment, Rating, Ticket
+
+
+class Command(BaseCommand):
+    help = (
+        "Genera el fixture de la prueba de carga (un organizador, asistentes y eventos futuros) "
+        "y lo carga con loaddata. load_test lee del mismo archivo a quien loguear y que eventos pedir."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--usuarios", type=int, default=100, help="Asistentes a crear")
+        parser.add_argument("--eventos", type=int, default=200, help="Eventos a crear")
+        parser.add_argument("--primer-pk", type=int, default=PRIMER_PK, help="Primer pk de cada modelo")
+        parser.add_argument(
+            "--archivo",
+            default=str(Path(settings.BASE_DIR) / "fixtures" / "load_test.json"),
+            help="Donde escribir el fixture",
+        )
+        parser.add_argument("--solo-archivo", action="store_true", help="Escribe el fixture sin cargarlo")
+
+    def handle(self, *args, **options):
+        registros = generar_fixture(options["usuarios"], options["eventos"], primer_pk=options["primer_pk"])
+        archivo = Path(options["archivo"])
+        archivo.parent.mkdir(parents=True, exist_ok=True)
+        archivo.write_text(json.dumps(registros, indent=4, ensure_ascii=False), encoding="utf-8")
+        self.stdout.write(f"{len(registros)} registros en {archivo}")
+
+        if not options["solo_archivo"]:
+            # loaddata pisa los eventos pero no borra lo que dejo una corrida anterior: con esas
+            # entradas y calificaciones los asistentes llegarian enseguida a sus limites
+            _, event_ids = datos_de_fixture(registros)
+            for modelo in (Ticket, Rating, Comment):
+                modelo.objects.filter(event__in=event_ids).delete()
+            call_command("loaddata", str(archivo), verbosity=options["verbosity"], stdout=self.stdout)
@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from app.cache import invalidar_paginas_publicas
+from app.models import Event
+
+
+class Command(BaseCommand):
+    help = "Marca como Finalizados o Agotados los eventos que corresponda (y reabre agotados con cupo)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--intervalo",
+            type=int,
+            default=0,
+            help="Segundos entre corridas; si se indica, el comando queda corriendo como worker",
+        )
+
+    def handle(self, *args, **options):
+        intervalo = options["intervalo"]
+        while True:
+            self.actualizar()
+            if not intervalo:
+                break
+            time.sleep(intervalo)
+
+    def actualizar(self):
+        cambios = Event.actualizar_estados()
+        if not cambios:
+            self.stdout.write("No hay eventos para actualizar.")
+            return
+
+        # Los UPDATE masivos no disparan señales: se invalida a mano lo cacheado de eventos
+        invalidar_paginas_publicas("event")
+        for estado, ids in cambios.items():
+            self.stdout.write(self.style.SUCCESS(f"{len(ids)} evento(s) pasaron a {estado}."))
@@ -0,0 +1,33 @@
+# Generated by Django 5.2 on 2026-10-18 13:11
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def calcular_tickets_vendidos(apps, schema_editor):
+    Event = apps.get_model('app', 'Event')
+    Ticket = apps.get_model('app', 'Ticket')
+    vendidos = (
+        Ticket.objects.filter(event=OuterRef('pk'), bl_baja=False)
+        .values('event')
+        .annotate(total=Sum('quantity'))
+        .values('total')
+    )
+    Event.objects.update(tickets_sold=Coalesce(Subquery(vendidos), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0019_satisfactionsurvey'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='tickets_sold',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(calcular_tickets_vendidos, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2 on 2026-10-18 13:16
+
+from django.db import migrations, models
+from django.db.models import Avg, Count, Sum
+
+
+def calcular_calificaciones(apps, schema_editor):
+    Event = apps.get_model('app', 'Event')
+    Rating = apps.get_model('app', 'Rating')
+    agregados = (
+        Rating.objects.filter(is_current=True, bl_baja=False)
+        .values('event')
+        .annotate(suma=Sum('rating'), cantidad=Count('id'), promedio=Avg('rating'))
+    )
+    for fila in agregados:
+        Event.objects.filter(pk=fila['event']).update(
+            rating_sum=fila['suma'],
+            rating_count=fila['cantidad'],
+            rating_avg=fila['promedio'],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0020_event_tickets_sold'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='rating_avg',
+            field=models.FloatField(db_index=True, default=0),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(calcular_calificaciones, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2 on 2026-10-18 13:29
+
+import uuid
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def resolver_tickets(apps, schema_editor):
+    RefundRequest = apps.get_model('app', 'RefundRequest')
+    Ticket = apps.get_model('app', 'Ticket')
+
+    codigos = {}
+    for refund_id, ticket_code in RefundRequest.objects.values_list('id', 'ticket_code').iterator():
+        try:
+            codigos.setdefault(uuid.UUID(ticket_code.strip()), []).append(refund_id)
+        except ValueError:
+            # Codigos mal ingresados quedan sin ticket asociado
+            continue
+
+    lista = list(codigos)
+    for inicio in range(0, len(lista), 500):
+        tickets = Ticket.objects.filter(ticket_code__in=lista[inicio:inicio + 500])
+        for ticket_id, ticket_code in tickets.values_list('id', 'ticket_code'):
+            RefundRequest.objects.filter(id__in=codigos[ticket_code]).update(ticket_id=ticket_id)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0022_comment_event_created_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='refundrequest',
+            name='ticket',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='refund_requests', to='app.ticket'),
+        ),
+        migrations.RunPython(resolver_tickets, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2 on 2026-10-18 13:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0023_refundrequest_ticket'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['organizer', 'scheduled_at'], name='event_organizer_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rating',
+            index=models.Index(condition=models.Q(('bl_baja', False)), fields=['event', 'is_current'], name='rating_event_activa_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='refundrequest',
+            index=models.Index(fields=['requester', 'status'], name='refund_requester_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(condition=models.Q(('bl_baja', False)), fields=['user', 'event'], name='ticket_user_event_activo_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(condition=models.Q(('bl_baja', False)), fields=['event', 'quantity'], name='ticket_event_activo_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='venue',
+            index=models.Index(condition=models.Q(('bl_baja', False)), fields=['name'], name='venue_activa_idx'),
+        ),
+    ]
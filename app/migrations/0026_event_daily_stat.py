@@ -0,0 +1,28 @@
+# Generated by Django 5.2 on 2026-10-18 14:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0025_event_status_fecha_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventDailyStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('metric', models.CharField(choices=[('tickets', 'Entradas vendidas'), ('reembolsos', 'Reembolsos'), ('calificaciones', 'Calificaciones'), ('encuesta', 'Encuesta de satisfaccion')], max_length=20)),
+                ('key', models.CharField(max_length=120)),
+                ('value', models.IntegerField(default=0)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='app.event')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('event', 'day', 'metric', 'key'), name='event_daily_stat_unica')],
+            },
+        ),
+    ]
@@ -0,0 +1,55 @@
+from django.db import migrations
+
+SQLITE = [
+    # unicode61 con remove_diacritics: "musica" encuentra "Música"
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS app_event_search USING fts5(
+        title, description, venue, categories,
+        tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """,
+]
+
+POSTGRESQL = [
+    "CREATE EXTENSION IF NOT EXISTS unaccent",
+    """
+    DO $$
+    BEGIN
+        IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'es_unaccent') THEN
+            CREATE TEXT SEARCH CONFIGURATION es_unaccent (COPY = spanish);
+            ALTER TEXT SEARCH CONFIGURATION es_unaccent
+                ALTER MAPPING FOR hword, hword_part, word WITH unaccent, spanish_stem;
+        END IF;
+    END
+    $$
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS app_event_search (
+        event_id bigint PRIMARY KEY REFERENCES app_event (id) ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED,
+        document tsvector NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS app_event_search_document_idx ON app_event_search USING GIN (document)",
+]
+
+
+def crear_indice(apps, schema_editor):
+    sentencias = {"sqlite": SQLITE, "postgresql": POSTGRESQL}.get(schema_editor.connection.vendor, [])
+    for sql in sentencias:
+        schema_editor.execute(sql)
+
+
+def borrar_indice(apps, schema_editor):
+    if schema_editor.connection.vendor in ("sqlite", "postgresql"):
+        schema_editor.execute("DROP TABLE IF EXISTS app_event_search")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0026_event_daily_stat'),
+    ]
+
+    operations = [
+        migrations.RunPython(crear_indice, borrar_indice),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2 on 2026-10-18 14:51
+
+from django.db import migrations, models
+
+LOTE = 2000
+
+
+def copiar(origen, destino):
+    filas = origen.objects.values_list('category_id', 'event_id').order_by('pk').iterator(chunk_size=LOTE)
+    lote = []
+    for category_id, event_id in filas:
+        lote.append(destino(category_id=category_id, event_id=event_id))
+        if len(lote) == LOTE:
+            destino.objects.bulk_create(lote, ignore_conflicts=True)
+            lote = []
+    destino.objects.bulk_create(lote, ignore_conflicts=True)
+
+
+def unificar(apps, schema_editor):
+    # Las filas que solo estaban en Category.events pasan a Event.categories;
+    # las que ya estaban en las dos las descarta la restriccion unique
+    Category = apps.get_model('app', 'Category')
+    Event = apps.get_model('app', 'Event')
+    copiar(Category.events.through, Event.categories.through)
+
+
+def separar(apps, schema_editor):
+    Category = apps.get_model('app', 'Category')
+    Event = apps.get_model('app', 'Event')
+    copiar(Event.categories.through, Category.events.through)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0027_event_search_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(unificar, separar),
+        migrations.RemoveField(
+            model_name='category',
+            name='events',
+        ),
+        migrations.AlterField(
+            model_name='event',
+            name='categories',
+            field=models.ManyToManyField(blank=True, related_name='events', to='app.category'),
+        ),
+    ]
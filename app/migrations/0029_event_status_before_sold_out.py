@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-18 15:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0028_merge_category_events'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='status_before_sold_out',
+            field=models.CharField(blank=True, choices=[('Activo', 'Activo'), ('Cancelado', 'Cancelado'), ('Reprogramado', 'Reprogramado'), ('Agotado', 'Agotado'), ('Finalizado', 'Finalizado')], max_length=20),
+        ),
+    ]
@@ -1,14 +1,20 @@
+from collections import Counter
 from datetime import timedelta
 from django.contrib.auth.models import AbstractUser
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import models, transaction
 import uuid
 from django.utils import timezone
 from django.conf import settings
 from django.core.validators import MinValueValidator, MaxValueValidator
-from django.db.models import Avg
+from django.db.models import Avg, Case, Count, F, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Cast, Coalesce, TruncDate
+from django.dispatch import Signal
 import re
-from app.utils import calculate_average_rating
+
+# Se envia (despues del commit) cuando cambian las entradas vendidas de un evento.
+# Los UPDATE de los contadores no disparan post_save, por eso la señal propia.
+disponibilidad_cambiada = Signal()
 
 class User(AbstractUser):
     is_organizer = models.BooleanField(default=False)
@@ -38,7 +44,6 @@ class Category(models.Model):
     name = models.CharField(max_length=100, unique=True)
     description = models.TextField(blank=True, null=True)
     is_active = models.BooleanField(default=True)
-    events = models.ManyToManyField("Event", related_name="category_events", blank=True)
     
     @classmethod
     def validateCategory(cls, name, description=None, category_id=None):
@@ -61,6 +66,11 @@ class Category(models.Model):
 
         return error
 
+    def invalidar_eventos(self):
+        # Cambia updated_at de los eventos de la categoria para que su fila cacheada
+        # en el listado de eventos se vuelva a renderizar
+        Event.objects.filter(categories=self).update(updated_at=timezone.now())
+
     @classmethod
     def newCategory(cls,name, description=None, is_active=True):
         errors =cls.validateCategory(name, description)
@@ -88,6 +98,11 @@ class Venue(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     bl_baja= models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            # El listado de ubicaciones y el formulario de eventos muestran solo las activas, por nombre
+            models.Index(fields=["name"], condition=models.Q(bl_baja=False), name="venue_activa_idx"),
+        ]
 
     @classmethod
     def newVenue(cls, name,address,city,capacity,contact):
@@ -136,14 +151,194 @@ class Event(models.Model):
     )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
-    categories = models.ManyToManyField(Category, related_name="events_categories", blank=True)
+    categories = models.ManyToManyField(Category, related_name="events", blank=True)
+    tickets_sold = models.PositiveIntegerField(default=0)
+    # Estado que tenia antes de pasar a Agotado, para volver a el si se liberan entradas
+    status_before_sold_out = models.CharField(max_length=20, choices=Status.choices, blank=True)
+    # Agregados de las calificaciones vigentes, mantenidos por Rating.save()
+    rating_sum = models.PositiveIntegerField(default=0)
+    rating_count = models.PositiveIntegerField(default=0)
+    rating_avg = models.FloatField(default=0, db_index=True)
+
+    # Contadores que solo se modifican con UPDATE atomicos, nunca con un save() completo
+    COUNTER_FIELDS = ("tickets_sold", "rating_sum", "rating_count", "rating_avg")
+
+    class Meta:
+        indexes = [
+            # Eventos de un organizador ordenados por fecha (paneles y reembolsos)
+            models.Index(fields=["organizer", "scheduled_at"], name="event_organizer_fecha_idx"),
+            # Transiciones automaticas de estado y listados filtrados por estado
+            models.Index(fields=["status", "scheduled_at"], name="event_status_fecha_idx"),
+        ]
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        # Un save() de un evento cargado en memoria no debe pisar los contadores
+        # que otras transacciones actualizaron mientras tanto
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.COUNTER_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
+    def reservar_cupos(self, cantidad) -> bool:
+        '''
+        Reserva `cantidad` entradas con un unico UPDATE condicional
+        (tickets_sold + cantidad <= capacidad), atomico aun con compradores concurrentes.
+        Devuelve False si no quedan cupos suficientes.
+        '''
+        capacidad_maxima = self.venue.capacity
+        reservado = Event.objects.filter(
+            pk=self.pk, tickets_sold__lte=capacidad_maxima - cantidad
+        ).update(tickets_sold=F("tickets_sold") + cantidad)
+        if reservado:
+            self.avisar_disponibilidad()
+        return reservado == 1
+
+    def avisar_disponibilidad(self):
+        # robust: la compra ya se confirmo, un error al avisar solo se registra en el log
+        transaction.on_commit(lambda: disponibilidad_cambiada.send(sender=Event, event_id=self.pk), robust=True)
+
+    @property
+    def remaining_capacity(self):
+        return max(self.venue.capacity - self.tickets_sold, 0)
+
+    @classmethod
+    def reconciliar_tickets_vendidos(cls, dry_run=False):
+        '''
+        Compara tickets_sold con la suma real de las entradas activas de cada evento.
+        Devuelve una lista de (evento, valor_guardado, valor_real) con los que difieren
+        y, salvo que sea dry_run, los corrige.
+        '''
+        reales = dict(
+            Ticket.objects.filter(bl_baja=False)
+            .values_list("event_id")
+            .annotate(total=Sum("quantity"))
+        )
+        diferencias = []
+        for event in cls.objects.only("id", "title", "tickets_sold").iterator():
+            real = reales.get(event.pk, 0)
+            if event.tickets_sold != real:
+                diferencias.append((event, event.tickets_sold, real))
+        if diferencias and not dry_run:
+            # La suma se vuelve a calcular en el mismo UPDATE: una compra confirmada despues
+            # de la lectura de arriba no se pisa con un valor viejo
+            vendidas = (
+                Ticket.objects.filter(event_id=OuterRef("pk"), bl_baja=False)
+                .order_by()
+                .values("event_id")
+                .annotate(total=Sum("quantity"))
+                .values("total")
+            )
+            cls.objects.filter(pk__in=[event.pk for event, _, _ in diferencias]).update(
+                tickets_sold=Coalesce(Subquery(vendidas), 0)
+            )
+        return diferencias
+
+    @classmethod
+    def actualizar_estados(cls, ahora=None):
+        '''
+        Pasa a Finalizado los eventos que ya ocurrieron, a Agotado los que vendieron toda
+        la capacidad y devuelve los agotados que liberaron entradas al estado que tenian antes
+        (Activo o Reprogramado). Cada transicion es un unico UPDATE; los cancelados no se tocan.
+        Devuelve {estado_nuevo: [ids]} con los eventos que cambiaron.
+        '''
+        ahora = ahora or timezone.now()
+        capacidad = Subquery(Venue.objects.filter(pk=OuterRef("venue_id")).values("capacity")[:1])
+        en_venta = [cls.Status.ACTIVO, cls.Status.REPROGRAMADO]
+        reabiertos = (
+            cls.objects.filter(status=cls.Status.AGOTADO, scheduled_at__gt=ahora)
+            .alias(capacidad=capacidad)
+            .filter(tickets_sold__lt=F("capacidad"))
+        )
+        # (estado nuevo, eventos, otros campos del UPDATE)
+        transiciones = [
+            (
+                cls.Status.FINALIZADO,
+                cls.objects.filter(status__in=en_venta + [cls.Status.AGOTADO], scheduled_at__lte=ahora),
+                {},
+            ),
+            (
+                cls.Status.AGOTADO,
+                cls.objects.filter(status__in=en_venta, scheduled_at__gt=ahora)
+                .alias(capacidad=capacidad)
+                .filter(tickets_sold__gte=F("capacidad")),
+                {"status_before_sold_out": F("status")},
+            ),
+            (
+                cls.Status.REPROGRAMADO,
+                reabiertos.filter(status_before_sold_out=cls.Status.REPROGRAMADO),
+                {"status_before_sold_out": ""},
+            ),
+            (
+                cls.Status.ACTIVO,
+                reabiertos.exclude(status_before_sold_out=cls.Status.REPROGRAMADO),
+                {"status_before_sold_out": ""},
+            ),
+        ]
+
+        cambios = {}
+        for estado, queryset, otros in transiciones:
+            with transaction.atomic():
+                ids = list(queryset.select_for_update().values_list("pk", flat=True))
+                if not ids:
+                    continue
+                # Se mueve updated_at para que el listado no muestre la fila cacheada vieja
+                queryset.filter(pk__in=ids).update(status=estado, updated_at=ahora, **otros)
+                for pk in ids:
+                    transaction.on_commit(
+                        lambda pk=pk: disponibilidad_cambiada.send(sender=cls, event_id=pk), robust=True
+                    )
+            cambios[estado] = ids
+        return cambios
+
+    def liberar_cupos(self, cantidad):
+        Event.liberar_cupos_de(self.pk, cantidad)
+
+    @classmethod
+    def liberar_cupos_de(cls, event_id, cantidad):
+        cls.objects.filter(pk=event_id).update(
+            tickets_sold=Case(
+                When(tickets_sold__gte=cantidad, then=F("tickets_sold") - cantidad),
+                default=Value(0),
+            )
+        )
+        transaction.on_commit(lambda: disponibilidad_cambiada.send(sender=cls, event_id=event_id), robust=True)
+
+    def excede_capacidad(self, cantidad) -> bool:
+        '''
+        Si comprar `cantidad` entradas superaria la capacidad del espacio, segun el contador
+        tickets_sold. Solo informativo: la compra la limita el UPDATE condicional de reservar_cupos.
+        '''
+        self.refresh_from_db(fields=["tickets_sold"])
+        return cantidad > self.remaining_capacity
+
     def average_rating(self):
-        filtered_ratings = self.rating_set.filter(bl_baja=False, is_current=True)
-        return calculate_average_rating(filtered_ratings)
+        return self.rating_avg
+
+    @classmethod
+    def ajustar_calificaciones(cls, event_id, delta_suma, delta_cantidad):
+        '''
+        Aplica la diferencia de suma y cantidad de calificaciones de un evento en un unico UPDATE
+        y recalcula el promedio guardado con los valores nuevos.
+        '''
+        if not delta_suma and not delta_cantidad:
+            return
+        suma = F("rating_sum") + delta_suma
+        cantidad = F("rating_count") + delta_cantidad
+        cls.objects.filter(pk=event_id).update(
+            rating_sum=suma,
+            rating_count=cantidad,
+            rating_avg=Case(
+                When(rating_count__gt=-delta_cantidad, then=Cast(suma, models.FloatField()) / cantidad),
+                default=Value(0.0),
+                output_field=models.FloatField(),
+            ),
+        )
     
     @classmethod
     def validate(cls, title, description,venue,scheduled_at, categories=None):
@@ -170,11 +365,15 @@ class Event(models.Model):
 
     @property
     def countdown(self):
+        return self.countdown_hasta(self.scheduled_at)
+
+    @staticmethod
+    def countdown_hasta(scheduled_at):
         now = timezone.now()
-        if self.scheduled_at <= now:
+        if scheduled_at <= now:
             return {'days': 0, 'hours': 0, 'minutes': 0}
 
-        delta: timedelta = self.scheduled_at - now
+        delta: timedelta = scheduled_at - now
         total_seconds = int(delta.total_seconds())
         days = total_seconds // 86400
         hours = (total_seconds % 86400) // 3600
@@ -248,48 +447,186 @@ class Ticket(models.Model):
     ticket_code = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
     bl_baja = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            # Limite de entradas por usuario y evento, solo sobre entradas activas
+            models.Index(
+                fields=["user", "event"], condition=models.Q(bl_baja=False), name="ticket_user_event_activo_idx"
+            ),
+            # Suma de entradas vendidas por evento; incluye quantity para no leer la tabla
+            models.Index(
+                fields=["event", "quantity"], condition=models.Q(bl_baja=False), name="ticket_event_activo_idx"
+            ),
+        ]
+
+    LIMITE_POR_USUARIO = 4
+
+    # (user_id, event_id, quantity, bl_baja) con los que se verifico el limite por ultima vez
+    # o con los que se leyo de la base; si no cambian en algo que sume entradas, no se consulta
+    _estado_validado = None
+    # Aporte del ticket a EventDailyStat tal como esta guardado en la base
+    _aporte_diario_guardado = None
+
     def __str__(self) -> str:
         return str(self.ticket_code)
+
     @classmethod
-    def ticket_excede_limite_usuario(cls, user_id, event_id, nueva_cantidad, ticket_id=None):
-        tickets = cls.objects.filter(user_id=user_id, event_id=event_id, bl_baja=False)
-        total = 0
-        for t in tickets:
-            if ticket_id and t.id == ticket_id:
-                total += nueva_cantidad
-            else:
-                total += t.quantity
-        return total > 4
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._estado_validado = instance.estado_limite()
+        instance._aporte_diario_guardado = instance.aporte_diario()
+        return instance
+
+    def estado_limite(self):
+        return (self.user_id, self.event_id, self.quantity, self.bl_baja)
 
+    def aporte_diario(self):
+        if self.bl_baja:
+            return {}
+        dia = EventDailyStat.dia(self.buy_date)
+        return {(self.event_id, dia, EventDailyStat.Metric.TICKETS, self.type): self.quantity}
+
+    @classmethod
+    def ticket_excede_limite_usuario(cls, user_id, event_id, nueva_cantidad, ticket_id=None):
+        '''
+        Suma en una sola consulta las demas entradas activas del usuario en el evento y
+        verifica que, con `nueva_cantidad` para este ticket, no pase el limite.
+        '''
+        otras = cls.objects.filter(user_id=user_id, event_id=event_id, bl_baja=False)
+        if ticket_id:
+            otras = otras.exclude(pk=ticket_id)
+        total = otras.aggregate(total=Sum("quantity"))["total"] or 0
+        return total + nueva_cantidad > cls.LIMITE_POR_USUARIO
+
+    def requiere_validar_limite(self):
+        if self.bl_baja:
+            # Un ticket dado de baja no cuenta para el limite (p. ej. soft_delete)
+            return False
+        if self._estado_validado is None:
+            return True
+        user_id, event_id, quantity, bl_baja = self._estado_validado
+        return bl_baja or (user_id, event_id) != (self.user_id, self.event_id) or self.quantity > quantity
 
     def clean(self):
-    # Usar el método para validar el límite
+        if not self.requiere_validar_limite():
+            return
         if self.ticket_excede_limite_usuario(
-            user_id=self.user.id,
-            event_id=self.event.id,
+            user_id=self.user_id,
+            event_id=self.event_id,
             nueva_cantidad=self.quantity,
             ticket_id=self.pk
         ):
-            raise ValidationError("No puedes tener más de 4 tickets para un mismo evento.")
+            raise ValidationError("No puedes tener más de 4 tickets para un mismo evento.", code="limite_usuario")
+        self._estado_validado = self.estado_limite()
 
+    def validar(self):
+        # Las FK y el ticket_code unico ya los garantiza la base; validarlos aca
+        # costaria una consulta por campo en cada compra
+        self.full_clean(exclude=["event", "user", "ticket_code"])
 
     def save(self, *args, **kwargs):
-        self.full_clean()  # Esto llama a clean() y levanta ValidationError si no pasa la validación
-        super().save(*args, **kwargs)
+        self.validar()  # Esto llama a clean() y levanta ValidationError si no pasa la validación
+        aporte = self.aporte_diario()
+        with transaction.atomic(savepoint=False):
+            super().save(*args, **kwargs)
+            EventDailyStat.registrar(self._aporte_diario_guardado, aporte)
+        self._aporte_diario_guardado = aporte
+
+    @staticmethod
+    def reservar_o_fallar(event, cantidad):
+        if not event.reservar_cupos(cantidad):
+            raise ValidationError("Lo sentimos, la capacidad maxima de entradas fue superada")
 
     @classmethod
     def new(cls, buy_date, quantity, type, event, user):
-        ticket = cls(
-            buy_date=buy_date,
-            quantity=quantity,
-            type=type,
-            event=event,
-            user=user
-        )
-        ticket.save()
+        # La reserva de cupos y el alta del ticket van en la misma transaccion:
+        # si el ticket no pasa las validaciones, la reserva se deshace
+        with transaction.atomic():
+            ticket = cls(
+                buy_date=buy_date,
+                quantity=quantity,
+                type=type,
+                event=event,
+                user=user
+            )
+            # El UPDATE de la reserva bloquea la fila del evento hasta el final, como el
+            # select_for_update de new_masivo: el limite por usuario se cuenta despues, sin
+            # que otra compra o un lote del mismo evento sume a la vez. El save() ya no lo repite
+            cls.reservar_o_fallar(event, quantity)
+            ticket.validar()
+            ticket.save()
         return ticket
 
+    @classmethod
+    def new_masivo(cls, event, compras, buy_date=None):
+        '''
+        Alta de muchas entradas de un evento en una sola transaccion (ventas de boleteria,
+        compras grupales). `compras` es una lista de dicts con user_id, quantity y type.
+        Valida tipos, usuarios y el limite por usuario (con el evento bloqueado) con una
+        consulta para todo el lote, reserva la capacidad total de una vez y crea las filas con bulk_create.
+        Devuelve los tickets creados; si algo no valida no se crea ninguno.
+        '''
+        buy_date = buy_date or timezone.now()
+        errores = []
+        por_usuario = {}
+        for i, compra in enumerate(compras, start=1):
+            if compra["type"] not in cls.Type.values:
+                errores.append(f"Entrada {i}: el tipo de ticket no es válido.")
+            # bool es subclase de int: True no es una cantidad
+            cantidad = compra["quantity"]
+            if isinstance(cantidad, bool) or not isinstance(cantidad, int) or cantidad <= 0:
+                errores.append(f"Entrada {i}: la cantidad debe ser un número entero positivo.")
+            else:
+                por_usuario[compra["user_id"]] = por_usuario.get(compra["user_id"], 0) + compra["quantity"]
+        if errores:
+            raise ValidationError(errores)
+
+        existentes = set(User.objects.filter(pk__in=por_usuario).values_list("pk", flat=True))
+        faltantes = sorted(set(por_usuario) - existentes, key=str)
+        if faltantes:
+            raise ValidationError(f"No existen los usuarios: {', '.join(map(str, faltantes))}")
+
+        with transaction.atomic():
+            # Bloquea el evento hasta el final: dos lotes concurrentes para el mismo evento no
+            # pueden sumar lo ya comprado a la vez y pasar juntos el limite por usuario
+            Event.objects.select_for_update().filter(pk=event.pk).values_list("pk").get()
+            compradas = dict(
+                cls.objects.filter(event=event, user_id__in=por_usuario, bl_baja=False)
+                .values_list("user_id")
+                .annotate(total=Sum("quantity"))
+            )
+            excedidos = [
+                user_id for user_id, cantidad in por_usuario.items()
+                if compradas.get(user_id, 0) + cantidad > cls.LIMITE_POR_USUARIO
+            ]
+            if excedidos:
+                raise ValidationError(
+                    "No se pueden tener más de 4 tickets para un mismo evento "
+                    f"(usuarios: {', '.join(map(str, sorted(excedidos)))})."
+                )
+
+            cls.reservar_o_fallar(event, sum(por_usuario.values()))
+            tickets = cls.objects.bulk_create([
+                cls(
+                    buy_date=buy_date,
+                    quantity=compra["quantity"],
+                    type=compra["type"],
+                    event=event,
+                    user_id=compra["user_id"],
+                )
+                for compra in compras
+            ])
+            # bulk_create no pasa por save(): el resumen diario se ajusta una vez por tipo
+            aporte = Counter()
+            for ticket in tickets:
+                ticket._aporte_diario_guardado = ticket.aporte_diario()
+                aporte.update(ticket._aporte_diario_guardado)
+            EventDailyStat.registrar({}, aporte)
+            return tickets
+
     def update(self, buy_date=None, quantity=None, type=None, event=None, user=None):
+        cantidad_anterior = self.quantity
+        event_anterior = self.event
         if buy_date is not None:
             self.buy_date = buy_date
         if quantity is not None:
@@ -300,11 +637,27 @@ class Ticket(models.Model):
             self.event = event
         if user is not None:
             self.user = user
-        self.save()
+
+        # Se ajusta el contador de entradas vendidas solo por la diferencia
+        with transaction.atomic():
+            self.validar()
+            if not self.bl_baja:
+                if self.event.pk != event_anterior.pk:
+                    event_anterior.liberar_cupos(cantidad_anterior)
+                    self.reservar_o_fallar(self.event, self.quantity)
+                elif self.quantity > cantidad_anterior:
+                    self.reservar_o_fallar(self.event, self.quantity - cantidad_anterior)
+                elif self.quantity < cantidad_anterior:
+                    self.event.liberar_cupos(cantidad_anterior - self.quantity)
+            self.save()
 
     def soft_delete(self):
-        self.bl_baja = True
-        self.save()
+        if self.bl_baja:
+            return
+        with transaction.atomic():
+            self.bl_baja = True
+            self.save()
+            self.event.liberar_cupos(self.quantity)
 
 
 #models para comment
@@ -336,6 +689,10 @@ class Comment(models.Model):
         ordering = ['-created_at']  # Ordenar por fecha descendente
         verbose_name = "Comentario"
         verbose_name_plural = "Comentarios"
+        indexes = [
+            # Paginacion de comentarios por evento con cursor sobre (created_at, id)
+            models.Index(fields=["event", "created_at"], name="comment_event_created_idx"),
+        ]
 # intervengo
 
 REASON_CHOICES = [
@@ -356,15 +713,52 @@ class RefundRequest(models.Model):
         default=Status.PENDING
     )
     ticket_code = models.CharField(max_length=255)
+    # Ticket resuelto a partir de ticket_code; queda en None si el codigo no existe
+    ticket = models.ForeignKey(
+        Ticket, on_delete=models.SET_NULL, null=True, blank=True, related_name="refund_requests"
+    )
     reason = models.CharField(max_length=100, choices=REASON_CHOICES)
     details = models.TextField(blank=True, default="")
     approval_date = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     requester = models.ForeignKey(User, on_delete=models.CASCADE, related_name="refund_requests")
 
+    class Meta:
+        indexes = [
+            # Solicitudes de un usuario filtradas por estado (p. ej. pendientes)
+            models.Index(fields=["requester", "status"], name="refund_requester_status_idx"),
+        ]
+
+    # (ticket_id, status, reason) tal como esta guardado en la base
+    _estado_diario_guardado = None
+
     def __str__(self):
         return f"Refund {self.ticket_code}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._estado_diario_guardado = instance.estado_diario()
+        return instance
+
+    def estado_diario(self):
+        return (self.ticket_id, self.status, self.reason)
+
+    def aporte_diario(self, estado):
+        '''
+        Aporte a EventDailyStat de la solicitud con `estado` (ticket_id, status, reason).
+        Las solicitudes cuyo codigo no corresponde a ningun ticket no tienen evento y no cuentan.
+        '''
+        if estado is None or estado[0] is None:
+            return {}
+        ticket_id, status, reason = estado
+        if ticket_id == self.ticket_id:
+            event_id = self.ticket.event_id
+        else:
+            event_id = Ticket.objects.filter(pk=ticket_id).values_list("event_id", flat=True).first()
+        dia = EventDailyStat.dia(self.created_at)
+        return {(event_id, dia, EventDailyStat.Metric.REEMBOLSOS, f"{status}:{reason}"): 1}
+
     def clean(self):
         errors = {}
         if not self.ticket_code.strip():
@@ -390,10 +784,28 @@ class RefundRequest(models.Model):
         except ValidationError as e:
             return False, e.message_dict
 
+    def get_ticket(self):
+        if self.ticket_id:
+            return self.ticket
+        return self.buscar_ticket(self.ticket_code)
+
+    @staticmethod
+    def buscar_ticket(ticket_code):
+        try:
+            return Ticket.objects.filter(ticket_code=ticket_code.strip()).first()
+        except ValidationError:
+            # El codigo ingresado no es un UUID valido
+            return None
+
     def approve(self):
-        self.status = self.Status.APPROVED
-        self.approval_date = timezone.now()
-        self.save()
+        # Al aprobar el reembolso el ticket se da de baja y sus cupos vuelven a estar disponibles
+        with transaction.atomic():
+            self.status = self.Status.APPROVED
+            self.approval_date = timezone.now()
+            self.save()
+            ticket = self.get_ticket()
+            if ticket:
+                ticket.soft_delete()
 
     def reject(self):
         self.status = self.Status.REJECTED
@@ -409,7 +821,15 @@ class RefundRequest(models.Model):
     
     def save(self, *args, **kwargs):
         self.full_clean()  
-        super().save(*args, **kwargs)
+        if self.ticket_id is None or str(self.ticket.ticket_code) != self.ticket_code.strip():
+            self.ticket = self.buscar_ticket(self.ticket_code)
+        estado = self.estado_diario()
+        with transaction.atomic(savepoint=False):
+            super().save(*args, **kwargs)
+            EventDailyStat.registrar(
+                self.aporte_diario(self._estado_diario_guardado), self.aporte_diario(estado)
+            )
+        self._estado_diario_guardado = estado
 
 
 
@@ -431,6 +851,58 @@ class Rating(models.Model):
                 name='unique_active_rating_per_user_event'
             )
         ]
+        indexes = [
+            # Calificaciones visibles de un evento, las vigentes primero en el indice
+            models.Index(
+                fields=["event", "is_current"], condition=models.Q(bl_baja=False), name="rating_event_activa_idx"
+            ),
+        ]
+
+    # Aporte de esta calificacion a los agregados del evento, tal como esta guardada en la base
+    _aporte_guardado = None
+    _event_guardado = None
+    _aporte_diario_guardado = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._aporte_guardado = instance.aporte_al_promedio()
+        instance._event_guardado = instance.event_id
+        instance._aporte_diario_guardado = instance.aporte_diario()
+        return instance
+
+    def aporte_diario(self):
+        # Histograma de las calificaciones vigentes, por el dia en que se crearon
+        if self.aporte_al_promedio() is None:
+            return {}
+        dia = EventDailyStat.dia(self.created_at)
+        return {(self.event_id, dia, EventDailyStat.Metric.CALIFICACIONES, str(self.rating)): 1}
+
+    def aporte_al_promedio(self):
+        if self.is_current and not self.bl_baja:
+            return self.rating
+        return None
+
+    def save(self, *args, **kwargs):
+        # Los agregados del evento se actualizan en la misma transaccion que la calificacion
+        aporte = self.aporte_al_promedio()
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if self._aporte_guardado is not None:
+                if self._event_guardado != self.event_id or aporte is None:
+                    Event.ajustar_calificaciones(self._event_guardado, -self._aporte_guardado, -1)
+                    self._aporte_guardado = None
+            if aporte is not None:
+                if self._aporte_guardado is None:
+                    Event.ajustar_calificaciones(self.event_id, aporte, 1)
+                else:
+                    Event.ajustar_calificaciones(self.event_id, aporte - self._aporte_guardado, 0)
+            # created_at recien tiene valor despues del primer save
+            aporte_diario = self.aporte_diario()
+            EventDailyStat.registrar(self._aporte_diario_guardado, aporte_diario)
+        self._aporte_guardado = aporte
+        self._event_guardado = self.event_id
+        self._aporte_diario_guardado = aporte_diario
 
     @classmethod
     def newRating(cls, user, event, title, rating, text=None):
@@ -459,5 +931,229 @@ class SatisfactionSurvey(models.Model):
     comment = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    _rating_guardado = None
+
     def __str__(self):
-        return f"{self.user.username} - {self.ticket.ticket_code} - {self.rating}"
\ No newline at end of file
+        return f"{self.user.username} - {self.ticket.ticket_code} - {self.rating}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._rating_guardado = instance.rating
+        return instance
+
+    def aporte_diario(self, rating):
+        if rating is None:
+            return {}
+        clave = (self.ticket.event_id, EventDailyStat.dia(self.created_at), EventDailyStat.Metric.ENCUESTA)
+        return {(*clave, "suma"): rating, (*clave, "cantidad"): 1}
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic(savepoint=False):
+            super().save(*args, **kwargs)
+            EventDailyStat.registrar(self.aporte_diario(self._rating_guardado), self.aporte_diario(self.rating))
+        self._rating_guardado = self.rating
+
+
+class EventDailyStat(models.Model):
+    '''
+    Resumen por evento y por dia para el tablero de organizadores. Cada fila es un contador
+    (metric, key) del dia: cada alta o cambio de entradas, reembolsos, calificaciones y
+    encuestas suma solo su diferencia, y rebuild_event_stats lo recalcula desde las tablas.
+    '''
+
+    class Metric(models.TextChoices):
+        # key: tipo de ticket; value: entradas activas compradas ese dia
+        TICKETS = "tickets", "Entradas vendidas"
+        # key: "estado:motivo"; value: solicitudes creadas ese dia
+        REEMBOLSOS = "reembolsos", "Reembolsos"
+        # key: puntaje; value: calificaciones vigentes creadas ese dia
+        CALIFICACIONES = "calificaciones", "Calificaciones"
+        # key: "suma" o "cantidad" de los puntajes de las encuestas de ese dia
+        ENCUESTA = "encuesta", "Encuesta de satisfaccion"
+
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name="daily_stats")
+    day = models.DateField()
+    metric = models.CharField(max_length=20, choices=Metric.choices)
+    key = models.CharField(max_length=120)
+    value = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["event", "day", "metric", "key"], name="event_daily_stat_unica"),
+        ]
+
+    def __str__(self):
+        return f"{self.event_id} {self.day} {self.metric}:{self.key}={self.value}"
+
+    @staticmethod
+    def dia(fecha):
+        return timezone.localdate(fecha) if timezone.is_aware(fecha) else fecha.date()
+
+    @classmethod
+    def sumar(cls, clave, delta):
+        event_id, day, metric, key = clave
+        return cls.objects.filter(event_id=event_id, day=day, metric=metric, key=key).update(
+            value=F("value") + delta
+        )
+
+    @classmethod
+    def registrar(cls, anterior, actual):
+        '''
+        Aplica la diferencia entre lo que una fila aportaba (`anterior`) y lo que aporta ahora
+        (`actual`), ambos {(event_id, day, metric, key): valor}. Un UPDATE por contador que
+        cambia; los que todavia no existen se crean en un solo INSERT que ignora conflictos
+        (otra transaccion pudo crearlos antes) y despues se suman.
+        '''
+        cambios = Counter(actual)
+        cambios.subtract(anterior or {})
+        faltantes = [clave for clave, delta in cambios.items() if delta and not cls.sumar(clave, delta)]
+        if not faltantes:
+            return
+        cls.objects.bulk_create(
+            [cls(event_id=event_id, day=day, metric=metric, key=key) for event_id, day, metric, key in faltantes],
+            ignore_conflicts=True,
+        )
+        for clave in faltantes:
+            cls.sumar(clave, cambios[clave])
+
+    @classmethod
+    def descontar(cls, aporte):
+        '''
+        Resta lo que aportaba una fila borrada. Solo UPDATE: si el contador ya no existe
+        (el evento se borro en cascada junto con su resumen) no queda nada que restar.
+        '''
+        for clave, valor in aporte.items():
+            if valor:
+                cls.sumar(clave, -valor)
+
+    @classmethod
+    def totales(cls, tickets=None, reembolsos=None, calificaciones=None, encuestas=None):
+        '''
+        Lo que aportan al resumen las filas de cada QuerySet (los que no se pasan no
+        cuentan), con una consulta agrupada por fuente: {(event_id, day, metric, key): valor}.
+        '''
+        totales = Counter()
+        if tickets is not None:
+            filas = (
+                tickets.filter(bl_baja=False)
+                .annotate(dia=TruncDate("buy_date"))
+                .values_list("event_id", "dia", "type")
+                .annotate(total=Sum("quantity"))
+                .order_by()
+            )
+            for event_id, dia, tipo, total in filas:
+                totales[(event_id, dia, cls.Metric.TICKETS, tipo)] += total
+        if reembolsos is not None:
+            filas = (
+                reembolsos.filter(ticket__isnull=False)
+                .annotate(dia=TruncDate("created_at"))
+                .values_list("ticket__event_id", "dia", "status", "reason")
+                .annotate(total=Count("id"))
+                .order_by()
+            )
+            for event_id, dia, status, reason, total in filas:
+                totales[(event_id, dia, cls.Metric.REEMBOLSOS, f"{status}:{reason}")] += total
+        if calificaciones is not None:
+            filas = (
+                calificaciones.filter(bl_baja=False, is_current=True)
+                .annotate(dia=TruncDate("created_at"))
+                .values_list("event_id", "dia", "rating")
+                .annotate(total=Count("id"))
+                .order_by()
+            )
+            for event_id, dia, rating, total in filas:
+                totales[(event_id, dia, cls.Metric.CALIFICACIONES, str(rating))] += total
+        if encuestas is not None:
+            filas = (
+                encuestas.annotate(dia=TruncDate("created_at"))
+                .values_list("ticket__event_id", "dia")
+                .annotate(suma=Sum("rating"), cantidad=Count("id"))
+                .order_by()
+            )
+            for event_id, dia, suma, cantidad in filas:
+                totales[(event_id, dia, cls.Metric.ENCUESTA, "suma")] += suma
+                totales[(event_id, dia, cls.Metric.ENCUESTA, "cantidad")] += cantidad
+        return totales
+
+    @classmethod
+    def reconstruir(cls, event_ids=None):
+        '''
+        Borra y recalcula el resumen (de todos los eventos o de `event_ids`) con una consulta
+        agrupada por fuente. Devuelve la cantidad de filas creadas.
+        '''
+        def de_eventos(queryset, campo="event_id"):
+            return queryset if event_ids is None else queryset.filter(**{f"{campo}__in": event_ids})
+
+        totales = cls.totales(
+            tickets=de_eventos(Ticket.objects.all()),
+            reembolsos=de_eventos(RefundRequest.objects.all(), "ticket__event_id"),
+            calificaciones=de_eventos(Rating.objects.all()),
+            encuestas=de_eventos(SatisfactionSurvey.objects.all(), "ticket__event_id"),
+        )
+
+        with transaction.atomic():
+            de_eventos(cls.objects.all()).delete()
+            filas = cls.objects.bulk_create(
+                [
+                    cls(event_id=event_id, day=day, metric=metric, key=key, value=valor)
+                    for (event_id, day, metric, key), valor in totales.items()
+                    if valor
+                ],
+                batch_size=1000,
+            )
+        return len(filas)
+
+    @classmethod
+    def resumen_por_evento(cls, event_ids, dias=14, hoy=None):
+        '''
+        Totales de cada evento y sus ventas de los ultimos `dias` dias, leidos solo del resumen
+        en dos consultas. Devuelve {event_id: {...}}.
+        '''
+        hoy = hoy or timezone.localdate()
+        ventana = [hoy - timedelta(days=i) for i in reversed(range(dias))]
+        resumen = {
+            event_id: {
+                "tickets": {tipo: 0 for tipo in Ticket.Type.values},
+                "reembolsos_por_estado": {estado: 0 for estado in RefundRequest.Status.values},
+                "reembolsos_por_motivo": {motivo: 0 for motivo, _ in REASON_CHOICES},
+                "calificaciones": {str(puntaje): 0 for puntaje in range(1, 6)},
+                "encuesta_promedio": None,
+                "ventas_por_dia": dict.fromkeys(ventana, 0),
+            }
+            for event_id in event_ids
+        }
+
+        encuestas = Counter()
+        totales = (
+            cls.objects.filter(event_id__in=event_ids)
+            .values_list("event_id", "metric", "key")
+            .annotate(total=Sum("value"))
+            .order_by()
+        )
+        for event_id, metric, key, total in totales:
+            datos = resumen[event_id]
+            if metric == cls.Metric.TICKETS:
+                datos["tickets"][key] = total
+            elif metric == cls.Metric.REEMBOLSOS:
+                estado, _, motivo = key.partition(":")
+                datos["reembolsos_por_estado"][estado] = datos["reembolsos_por_estado"].get(estado, 0) + total
+                datos["reembolsos_por_motivo"][motivo] = datos["reembolsos_por_motivo"].get(motivo, 0) + total
+            elif metric == cls.Metric.CALIFICACIONES:
+                datos["calificaciones"][key] = total
+            elif metric == cls.Metric.ENCUESTA:
+                encuestas[(event_id, key)] = total
+        for event_id, datos in resumen.items():
+            if encuestas[(event_id, "cantidad")]:
+                datos["encuesta_promedio"] = encuestas[(event_id, "suma")] / encuestas[(event_id, "cantidad")]
+
+        ventas = (
+            cls.objects.filter(event_id__in=event_ids, metric=cls.Metric.TICKETS, day__gte=ventana[0])
+            .values_list("event_id", "day")
+            .annotate(total=Sum("value"))
+            .order_by()
+        )
+        for event_id, day, total in ventas:
+            if day in resumen[event_id]["ventas_por_dia"]:
+                resumen[event_id]["ventas_por_dia"][day] = total
+        return resumen
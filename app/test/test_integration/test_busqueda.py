@@ -0,0 +1,100 @@
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from app.busqueda import buscar_eventos
+from app.models import Category, Event, User, Venue
+
+
+class BusquedaEventosTest(TestCase):
+    def setUp(self):
+        self.organizer = User.objects.create_user(username="organizador", password="password123", is_organizer=True)
+        self.venue = Venue.objects.create(name="Teatro Colón", address="Calle 1", city="Córdoba", capacity=100, contact="c@c.com")
+        self.otra = Venue.objects.create(name="Estadio", address="Calle 2", city="La Plata", capacity=100, contact="c@c.com")
+        self.rock = Category.objects.create(name="Rock nacional")
+
+    def crear(self, title, description="Desc", venue=None, categories=()):
+        event = Event.objects.create(
+            title=title, description=description, organizer=self.organizer, venue=venue or self.otra,
+            scheduled_at=timezone.now() + timezone.timedelta(days=10),
+        )
+        event.categories.set(categories)
+        return event
+
+    def titulos(self, texto, **kwargs):
+        return [event.title for event in buscar_eventos(texto, **kwargs)[0]]
+
+    def test_ignora_acentos_y_mayusculas(self):
+        self.crear("Música en vivo")
+        self.crear("Ópera", venue=self.venue)
+
+        self.assertEqual(self.titulos("musica"), ["Música en vivo"])
+        self.assertEqual(self.titulos("CORDOBA colon"), ["Ópera"])
+        self.assertEqual(self.titulos("opera"), ["Ópera"])
+
+    def test_busca_en_categorias_y_por_prefijo(self):
+        self.crear("Recital", categories=[self.rock])
+        self.crear("Obra de teatro")
+
+        self.assertEqual(self.titulos("nacio"), ["Recital"])
+        self.assertEqual(self.titulos("rock recital"), ["Recital"])
+        self.assertEqual(self.titulos("rock obra"), [])
+
+    def test_el_titulo_pesa_mas_que_la_descripcion(self):
+        self.crear("Noche de tango en la ciudad", description="Baile")
+        self.crear("Milonga", description="Clases de tango para principiantes")
+        self.crear("Feria", description="Puestos de comida")
+
+        self.assertEqual(self.titulos("tango"), ["Noche de tango en la ciudad", "Milonga"])
+
+    def test_el_indice_sigue_los_cambios(self):
+        event = self.crear("Festival", categories=[self.rock])
+
+        event.title = "Maratón"
+        event.save()
+        self.assertEqual(self.titulos("festival"), [])
+        self.assertEqual(self.titulos("maraton"), ["Maratón"])
+
+        self.rock.name = "Jazz"
+        self.rock.save()
+        self.assertEqual(self.titulos("jazz"), ["Maratón"])
+
+        event.categories.clear()
+        self.assertEqual(self.titulos("jazz"), [])
+
+        self.otra.city = "Rosario"
+        self.otra.save()
+        self.assertEqual(self.titulos("rosario"), ["Maratón"])
+
+        event.delete()
+        self.assertEqual(self.titulos("maraton"), [])
+
+    def test_borrar_categoria_reindexa_sus_eventos(self):
+        self.crear("Recital", categories=[self.rock])
+        self.rock.delete()
+        self.assertEqual(self.titulos("rock"), [])
+
+    def test_texto_con_sintaxis_de_busqueda(self):
+        self.crear("Recital")
+        # Las comillas, * y parentesis se descartan; OR o NEAR serian palabras comunes
+        self.assertEqual(self.titulos('recital" * ('), ["Recital"])
+        self.assertEqual(self.titulos('"*()'), [])
+
+    def test_vista_pagina_los_resultados(self):
+        for i in range(3):
+            self.crear(f"Feria {i}")
+        self.client.login(username="organizador", password="password123")
+
+        response = self.client.get(reverse("event_search"), {"q": "feria"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context["events"]), 3)
+        self.assertFalse(response.context["has_next"])
+
+        primera, hay_mas = buscar_eventos("feria", pagina=1, por_pagina=2)
+        segunda, _ = buscar_eventos("feria", pagina=2, por_pagina=2)
+        self.assertTrue(hay_mas)
+        self.assertEqual(len(segunda), 1)
+        self.assertNotIn(segunda[0], primera)
+
+        response = self.client.get(reverse("event_search"), {"q": "feria", "page": "x"})
+        self.assertEqual(response.context["page"], 1)
@@ -0,0 +1,100 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from app.cache import estadisticas
+from app.models import Category, Comment, Event, User, Venue
+
+
+class PublicPageCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.organizer = User.objects.create_user(username="organizador", password="password123", is_organizer=True)
+        self.venue = Venue.objects.create(name="Estadio", address="Calle 1", city="La Plata", capacity=100, contact="c@c.com")
+        self.category = Category.objects.create(name="Rock", description="Recitales")
+        self.event = Event.objects.create(
+            title="Recital",
+            description="Banda en vivo",
+            scheduled_at=timezone.now() + timezone.timedelta(days=5),
+            organizer=self.organizer,
+            venue=self.venue,
+        )
+        self.event.categories.add(self.category)
+        self.comment = Comment.objects.create(title="Buenisimo", text="Muy bueno", user=self.organizer, event=self.event)
+
+    def test_anonymous_page_is_served_from_cache(self):
+        url = reverse("category_events", args=[self.category.id])
+        self.client.get(url)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+
+        self.assertContains(response, "Recital")
+        self.assertEqual(estadisticas()["hits"], 1)
+        self.assertEqual(estadisticas()["misses"], 1)
+        self.assertEqual(estadisticas()["hit_ratio"], 0.5)
+
+    def test_cache_is_invalidated_when_event_changes(self):
+        url = reverse("category_events", args=[self.category.id])
+        self.client.get(url)
+
+        self.event.title = "Recital reprogramado"
+        self.event.save()
+
+        response = self.client.get(url)
+        self.assertContains(response, "Recital reprogramado")
+
+    def test_cache_is_invalidated_when_comment_changes(self):
+        url = reverse("view_comment", args=[self.comment.id])
+        self.client.get(url)
+
+        self.comment.text = "Texto editado"
+        self.comment.save()
+
+        self.assertContains(self.client.get(url), "Texto editado")
+
+    def test_comment_change_keeps_event_pages_cached(self):
+        url = reverse("category_events", args=[self.category.id])
+        self.client.get(url)
+
+        self.comment.text = "Texto editado"
+        self.comment.save()
+
+        # Cada modelo tiene su generacion: un comentario no descarta las paginas de eventos
+        with self.assertNumQueries(0):
+            self.assertContains(self.client.get(url), "Recital")
+
+    def test_cache_is_invalidated_when_categories_change(self):
+        url = reverse("category_events", args=[self.category.id])
+        self.client.get(url)
+
+        self.event.categories.remove(self.category)
+
+        self.assertContains(self.client.get(url), "No hay eventos en esta categoría")
+
+    def test_authenticated_users_are_not_cached(self):
+        self.client.login(username="organizador", password="password123")
+        url = reverse("home")
+        self.client.get(url)
+        self.client.get(url)
+        self.assertEqual(estadisticas()["hits"], 0)
+        self.assertEqual(estadisticas()["misses"], 0)
+
+    def test_venue_detail_invalidated_when_venue_changes(self):
+        self.client.login(username="organizador", password="password123")
+        url = reverse("venue_detail", args=[self.venue.id])
+        self.client.get(url)
+        self.venue.editarVenue("Estadio Nuevo", None, None, None, None)
+
+        self.assertContains(self.client.get(url), "Estadio Nuevo")
+
+    def test_cache_stats_requires_staff(self):
+        self.client.login(username="organizador", password="password123")
+        self.assertEqual(self.client.get(reverse("cache_stats")).status_code, 403)
+
+        self.organizer.is_staff = True
+        self.organizer.save()
+        response = self.client.get(reverse("cache_stats"))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("hit_ratio", response.json())
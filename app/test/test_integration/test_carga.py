@@ -0,0 +1,38 @@
+import json
+import tempfile
+
+from django.core.management import call_command
+from django.test import LiveServerTestCase
+
+from app.carga import correr, datos_de_fixture, generar_fixture
+from app.models import Comment, Rating, Ticket
+
+
+class CargaContraServidorTest(LiveServerTestCase):
+    def test_recorre_la_mezcla_logueado(self):
+        registros = generar_fixture(usuarios=2, eventos=3)
+        with tempfile.TemporaryDirectory() as directorio:
+            archivo = f"{directorio}/load_test.json"
+            with open(archivo, "w", encoding="utf-8") as f:
+                json.dump(registros, f)
+            call_command("loaddata", archivo, verbosity=0)
+        usuarios, event_ids = datos_de_fixture(registros)
+
+        resumen = correr(self.live_server_url, usuarios, event_ids, hilos=1, pedidos=60, semilla=7)
+
+        self.assertEqual(resumen["pedidos"], 60)
+        self.assertEqual(resumen["errores"], 0)
+        self.assertEqual(set(resumen["endpoints"]), {
+            "events", "event_detail", "countdown_json", "ticket_buy", "add_comment", "create_rating",
+        })
+        # Los POST pasaron el CSRF y escribieron
+        self.assertTrue(Ticket.objects.exists())
+        self.assertTrue(Comment.objects.exists())
+        self.assertTrue(Rating.objects.exists())
+        # Solo los pedidos aceptados entran en los percentiles: cada uno escribio una fila
+        aceptados = {
+            nombre: datos["pedidos"] - datos["errores"] - datos["rechazos"]
+            for nombre, datos in resumen["endpoints"].items()
+        }
+        self.assertEqual(aceptados["ticket_buy"], Ticket.objects.count())
+        self.assertEqual(aceptados["create_rating"], Rating.objects.count())
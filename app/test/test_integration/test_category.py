@@ -0,0 +1,103 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from app.categorias import VERSION_KEY, version_actual
+from app.models import Category, Event, User, Venue
+
+
+class BaseCategoryTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.organizer = User.objects.create_user(username="organizador", password="password123", is_organizer=True)
+        venue = Venue.objects.create(name="Estadio", address="Calle 1", city="La Plata", capacity=100, contact="c@c.com")
+        self.rock = Category.objects.create(name="Rock", description="Recitales", is_active=False)
+        self.jazz = Category.objects.create(name="Jazz", description="Conciertos", is_active=False)
+        self.event = Event.objects.create(
+            title="Recital", description="Desc", organizer=self.organizer, venue=venue,
+            scheduled_at=timezone.now() + timezone.timedelta(days=5),
+        )
+        self.event.categories.add(self.rock)
+        self.client.login(username="organizador", password="password123")
+
+
+class CategoryEventsRelationTest(BaseCategoryTestCase):
+    def test_las_dos_puntas_son_la_misma_relacion(self):
+        self.assertEqual(list(self.rock.events.all()), [self.event])
+        self.jazz.events.add(self.event)
+        self.assertEqual(set(self.event.categories.all()), {self.rock, self.jazz})
+
+    def test_listado_cuenta_los_eventos_de_cada_categoria(self):
+        # sesion + usuario + categorias con su cantidad de eventos
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse("category_list"))
+        cantidades = {category.name: category.event_count for category in response.context["categories"]}
+        self.assertEqual(cantidades, {"Rock": 1, "Jazz": 0})
+
+    def test_no_se_borra_una_categoria_con_eventos(self):
+        self.client.post(reverse("category_delete", args=[self.rock.id]))
+        self.assertTrue(Category.objects.filter(pk=self.rock.pk).exists())
+
+        self.client.post(reverse("category_delete", args=[self.jazz.id]))
+        self.assertFalse(Category.objects.filter(pk=self.jazz.pk).exists())
+
+    def test_eventos_de_la_categoria(self):
+        response = self.client.get(reverse("category_events", args=[self.rock.id]))
+        self.assertContains(response, "Recital")
+        response = self.client.get(reverse("category_events", args=[self.jazz.id]))
+        self.assertContains(response, "No hay eventos en esta categoría")
+
+
+class CategoryMetadataCacheTest(BaseCategoryTestCase):
+    def cantidades(self):
+        response = self.client.get(reverse("category_list"))
+        return {category.name: category.event_count for category in response.context["categories"]}
+
+    def test_listado_y_formulario_no_consultan_categorias_con_el_cache_caliente(self):
+        self.client.get(reverse("category_list"))
+        # sesion + usuario
+        with self.assertNumQueries(2):
+            self.client.get(reverse("category_list"))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.jazz.is_active = True
+            self.jazz.save()
+        self.client.get(reverse("event_form"))
+        # sesion + usuario + ubicaciones activas
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse("event_form"))
+        self.assertEqual([category.name for category in response.context["categories"]], ["Jazz"])
+
+    def test_se_invalida_al_cambiar_categorias_o_eventos(self):
+        self.assertEqual(self.cantidades(), {"Rock": 1, "Jazz": 0})
+
+        # La version cambia al confirmar, no antes
+        with self.captureOnCommitCallbacks(execute=True):
+            self.event.categories.add(self.jazz)
+            self.assertEqual(self.cantidades(), {"Rock": 1, "Jazz": 0})
+        self.assertEqual(self.cantidades(), {"Rock": 1, "Jazz": 1})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.rock.events.clear()
+        self.assertEqual(self.cantidades(), {"Rock": 0, "Jazz": 1})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.objects.create(name="Tango", description="Milongas")
+        self.assertIn("Tango", self.cantidades())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.event.delete()
+        self.assertEqual(self.cantidades(), {"Rock": 0, "Jazz": 0, "Tango": 0})
+
+    def test_transaccion_deshecha_no_cambia_la_version(self):
+        version = version_actual()
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    Category.objects.create(name="Tango", description="Milongas")
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertEqual(cache.get(VERSION_KEY), version)
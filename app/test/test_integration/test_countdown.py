@@ -45,3 +45,30 @@ class CountdownIntegrationTest(TestCase):
             self.assertEqual(data2['days'], 0)
             self.assertEqual(data2['hours'], 0)
             self.assertTrue(data2['minutes'] < data1['minutes'])
+
+    def test_countdown_devuelve_fecha_objetivo_y_usa_cache(self):
+        self.client.login(username='user1', password='pass123')
+        url = reverse('countdown_json', args=[self.event.id])
+
+        response = self.client.get(url)
+        self.assertEqual(response.json()['target'], self.event.scheduled_at.isoformat())
+
+        # sesion + usuario; la fecha del evento ya esta en la cache
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+
+    def test_countdown_organizador_y_evento_inexistente(self):
+        self.client.login(username='org', password='pass123')
+        response = self.client.get(reverse('countdown_json', args=[self.event.id]))
+        self.assertEqual(response.status_code, 403)
+
+        self.client.login(username='user1', password='pass123')
+        response = self.client.get(reverse('countdown_json', args=[self.event.id + 100]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_detalle_incluye_fecha_objetivo_para_el_navegador(self):
+        self.client.login(username='user1', password='pass123')
+        response = self.client.get(reverse('event_detail', args=[self.event.id]))
+        self.assertContains(response, f'data-target="{int(self.event.scheduled_at.timestamp())}"')
+        self.assertNotContains(response, "/countdown/")
@@ -0,0 +1,39 @@
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from app.models import Event, Rating, Ticket, User, Venue
+
+
+class OrganizerDashboardTest(TestCase):
+    def setUp(self):
+        self.organizer = User.objects.create_user(username="organizador", password="password123", is_organizer=True)
+        self.user = User.objects.create_user(username="comprador", password="password123")
+        self.venue = Venue.objects.create(name="Estadio", address="Calle 1", city="La plata", capacity=100, contact="c@c.com")
+        self.events = [
+            Event.objects.create(
+                title=f"Evento {i}", description="Desc", organizer=self.organizer, venue=self.venue,
+                scheduled_at=timezone.now() + timezone.timedelta(days=10 + i),
+            )
+            for i in range(3)
+        ]
+
+    def test_muestra_los_totales_del_resumen(self):
+        Ticket.new(buy_date=timezone.now(), quantity=3, type=Ticket.Type.VIP, event=self.events[0], user=self.user)
+        Rating.objects.create(user=self.user, event=self.events[0], title="Bien", rating=5)
+        self.client.login(username="organizador", password="password123")
+
+        # sesion, usuario, eventos y dos consultas al resumen, sin importar cuantos eventos haya
+        with self.assertNumQueries(5):
+            response = self.client.get(reverse("organizer_dashboard"))
+
+        self.assertEqual(response.status_code, 200)
+        fila = next(f for f in response.context["filas"] if f["event"] == self.events[0])
+        self.assertEqual(fila["tickets_total"], 3)
+        self.assertEqual(fila["calificaciones"]["5"], 1)
+        self.assertContains(response, f'id="dashboard-event-{self.events[2].id}"')
+
+    def test_solo_para_organizadores(self):
+        self.client.login(username="comprador", password="password123")
+        response = self.client.get(reverse("organizer_dashboard"))
+        self.assertRedirects(response, reverse("events"))
@@ -0,0 +1,103 @@
+import asyncio
+import json
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from app.disponibilidad import BrokerEnMemoria, canal_evento, clave_estado, obtener_broker
+from app.models import Event, Ticket, User, Venue
+
+
+class DisponibilidadEnVivoTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.organizer = User.objects.create_user(username="organizador", password="password123", is_organizer=True)
+        self.user = User.objects.create_user(username="comprador", password="password123")
+        venue = Venue.objects.create(name="Estadio", address="Calle 1", city="La plata", capacity=10, contact="c@c.com")
+        self.event = Event.objects.create(
+            title="Recital", description="Desc", organizer=self.organizer, venue=venue,
+            scheduled_at=timezone.now() + timezone.timedelta(days=10),
+        )
+
+    def test_compra_publica_disponibilidad_al_confirmar(self):
+        with patch.object(obtener_broker(), "publicar") as publicar:
+            with self.captureOnCommitCallbacks(execute=True):
+                Ticket.new(buy_date=timezone.now(), quantity=3, type=Ticket.Type.GENERAL, event=self.event, user=self.user)
+
+        esperado = {"remaining_capacity": 7, "status": "Activo"}
+        publicar.assert_called_once_with(canal_evento(self.event.pk), esperado)
+        self.assertEqual(cache.get(clave_estado(self.event.pk)), esperado)
+
+    def test_cambio_de_estado_se_publica(self):
+        with patch.object(obtener_broker(), "publicar") as publicar:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.event.status = Event.Status.CANCELADO
+                self.event.save()
+
+        publicar.assert_called_once_with(
+            canal_evento(self.event.pk), {"remaining_capacity": 10, "status": "Cancelado"}
+        )
+
+    def test_detalle_se_conecta_al_stream(self):
+        self.client.login(username="comprador", password="password123")
+        response = self.client.get(reverse("event_detail", args=[self.event.id]))
+        self.assertContains(response, reverse("event_availability_stream", args=[self.event.id]))
+        self.assertContains(response, '<span id="remaining-capacity">10</span>', html=True)
+
+    def test_stream_por_wsgi_termina_despues_del_estado_actual(self):
+        # Sin ASGI la conexion no puede quedar abierta: cada una tomaria un worker
+        cache.set(clave_estado(self.event.pk), {"remaining_capacity": 10, "status": "Activo"})
+        response = self.client.get(reverse("event_availability_stream", args=[self.event.id]))
+        self.assertEqual(
+            # Como lo consume el handler WSGI
+            b"".join(response),
+            b'retry: 5000\n\ndata: {"remaining_capacity": 10, "status": "Activo"}\n\n',
+        )
+        self.assertEqual(obtener_broker().suscripciones, {})
+
+
+class BrokerEnMemoriaTest(TestCase):
+    async def test_reparte_a_todos_los_suscriptores(self):
+        broker = BrokerEnMemoria()
+        async with broker.suscribir("evento:1") as a, broker.suscribir("evento:1") as b:
+            async with broker.suscribir("evento:2") as otro:
+                # Se publica desde otro hilo, como lo hace una compra sincronica
+                await asyncio.to_thread(broker.publicar, "evento:1", {"remaining_capacity": 4})
+                self.assertEqual(await a.recibir(timeout=1), {"remaining_capacity": 4})
+                self.assertEqual(await b.recibir(timeout=1), {"remaining_capacity": 4})
+                self.assertIsNone(await otro.recibir(timeout=0.05))
+        self.assertEqual(broker.suscripciones, {})
+
+    async def test_stream_envia_estado_inicial_y_cambios(self):
+        event_id = 999
+        await cache.aset(clave_estado(event_id), {"remaining_capacity": 5, "status": "Activo"})
+
+        response = await self.async_client.get(reverse("event_availability_stream", args=[event_id]))
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        chunks = response.streaming_content.__aiter__()
+
+        self.assertEqual(await chunks.__anext__(), b"retry: 5000\n\n")
+        inicial = await chunks.__anext__()
+        self.assertEqual(json.loads(inicial.decode()[len("data: "):]), {"remaining_capacity": 5, "status": "Activo"})
+
+        siguiente = asyncio.ensure_future(chunks.__anext__())
+        # Espera a que el stream quede suscripto antes de publicar
+        while not obtener_broker().suscripciones.get(canal_evento(event_id)):
+            await asyncio.sleep(0.01)
+        await asyncio.to_thread(
+            obtener_broker().publicar, canal_evento(event_id), {"remaining_capacity": 0, "status": "Agotado"}
+        )
+        self.assertEqual(await siguiente, b'data: {"remaining_capacity": 0, "status": "Agotado"}\n\n')
+        await chunks.aclose()
+
+    @override_settings(SSE_MAX_SECONDS=0.05)
+    async def test_stream_se_corta_despues_de_sse_max_seconds(self):
+        await cache.aclear()
+        response = await self.async_client.get(reverse("event_availability_stream", args=[999]))
+        chunks = [chunk async for chunk in response.streaming_content]
+        self.assertEqual(chunks[0], b"retry: 5000\n\n")
+        self.assertEqual(set(chunks[1:]), {b": ping\n\n"})
+        self.assertEqual(obtener_broker().suscripciones, {})
@@ -1,11 +1,14 @@
 import datetime
 import time
 from datetime import timedelta
+from unittest.mock import patch
+from django.core.cache import cache
 from django.test import Client, TestCase
 from django.urls import reverse
 from django.utils import timezone
 
-from app.models import Event, User, Venue, Category
+from app.models import Category, Comment, Event, Rating, Ticket, User, Venue
+from app.utils import encode_cursor
 
 
 class BaseEventTestCase(TestCase):
@@ -96,6 +99,120 @@ class EventsListViewTest(BaseEventTestCase):
         self.assertEqual(response.status_code, 302)
         self.assertTrue(response.url.startswith("/accounts/login/"))
 
+    def test_events_view_paginates_with_cursor(self):
+        """Test que verifica que el listado se recorre por cursor sin repetir ni saltear eventos"""
+        same_date = timezone.now() + datetime.timedelta(days=3)
+        for i in range(5):
+            Event.objects.create(
+                title=f"Evento extra {i}",
+                description="Descripción",
+                scheduled_at=same_date,
+                organizer=self.organizer,
+                venue=self.venue,
+            )
+        self.client.login(username="regular", password="password123")
+
+        seen = []
+        cursor = None
+        with patch("app.views.EVENTS_PAGE_SIZE", 3):
+            while True:
+                params = {"cursor": cursor} if cursor else {}
+                response = self.client.get(reverse("events"), params)
+                self.assertEqual(response.status_code, 200)
+                seen.extend(event.id for event in response.context["events"])
+                cursor = response.context["next_cursor"]
+                if cursor is None:
+                    break
+
+        expected = list(Event.objects.order_by("scheduled_at", "id").values_list("id", flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_events_view_query_count_is_constant(self):
+        """Test que verifica que la cantidad de consultas no depende de la cantidad de eventos"""
+        category = Category.objects.create(name="Música", description="Conciertos")
+        for i in range(10):
+            event = Event.objects.create(
+                title=f"Evento extra {i}",
+                description="Descripción",
+                scheduled_at=timezone.now() + datetime.timedelta(days=5 + i),
+                organizer=self.organizer,
+                venue=self.venue,
+            )
+            event.categories.add(category)
+        self.client.login(username="regular", password="password123")
+
+        # sesion + usuario + pagina de eventos + categorias prefetcheadas
+        # + una consulta para las tres facetas (categoria, ciudad y estado)
+        with self.assertNumQueries(5):
+            response = self.client.get(reverse("events"))
+        self.assertContains(response, "Música")
+
+    def test_events_view_reuses_cached_rows_until_event_changes(self):
+        """Test que verifica que la fila cacheada de un evento se reconstruye solo si el evento cambia"""
+        cache.clear()
+        self.client.login(username="regular", password="password123")
+        self.client.get(reverse("events"))
+
+        # Un UPDATE directo no cambia updated_at, la fila sigue saliendo del cache
+        Event.objects.filter(pk=self.event1.pk).update(title="Titulo sin version")
+        self.assertNotContains(self.client.get(reverse("events")), "Titulo sin version")
+
+        self.event1.refresh_from_db()
+        self.event1.save()
+        self.assertContains(self.client.get(reverse("events")), "Titulo sin version")
+
+    def test_category_edit_bumps_cached_event_rows(self):
+        """Test que verifica que editar una categoria invalida las filas de sus eventos"""
+        cache.clear()
+        category = Category.objects.create(name="Jazz", description="Musica")
+        self.event1.categories.add(category)
+        self.client.login(username="organizador", password="password123")
+        self.assertContains(self.client.get(reverse("events")), "Jazz")
+
+        self.client.post(reverse("category_edit", args=[category.id]), {
+            "name": "Blues",
+            "description": "Musica",
+            "is_active": "on",
+        })
+
+        response = self.client.get(reverse("events"))
+        self.assertContains(response, "Blues")
+        self.assertNotContains(response, "Jazz")
+
+        # Quitar la categoria desde la relacion tambien cambia la version de la fila
+        category.events.remove(self.event1)
+        self.assertNotContains(self.client.get(reverse("events")), "Blues")
+
+    def test_events_view_with_invalid_cursor(self):
+        """Test que verifica que un cursor invalido muestra la primera pagina"""
+        self.client.login(username="regular", password="password123")
+        response = self.client.get(reverse("events"), {"cursor": "no-es-un-cursor"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context["events"]), 2)
+
+    def test_events_view_with_cursor_of_wrong_types(self):
+        """Test que verifica que un cursor bien codificado pero con valores de otro tipo muestra la primera pagina"""
+        self.client.login(username="regular", password="password123")
+        for values in (["2025-01-01T00:00:00+00:00", "abc"], [{"a": 1}, 1], [None, None]):
+            with self.subTest(values=values):
+                response = self.client.get(reverse("events"), {"cursor": encode_cursor(values)})
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(len(response.context["events"]), 2)
+
+    def test_events_view_filters_by_status(self):
+        """Test que verifica el filtro por estado del listado"""
+        Event.objects.filter(pk=self.event2.pk).update(status=Event.Status.AGOTADO)
+        self.client.login(username="regular", password="password123")
+
+        response = self.client.get(reverse("events"), {"status": "Agotado"})
+        self.assertEqual(list(response.context["events"]), [self.event2])
+        self.assertEqual(response.context["status"], "Agotado")
+
+        # Un estado desconocido se ignora
+        response = self.client.get(reverse("events"), {"status": "Inexistente"})
+        self.assertEqual(len(response.context["events"]), 2)
+        self.assertIsNone(response.context["status"])
+
 
 class EventDetailViewTest(BaseEventTestCase):
     """Tests para la vista de detalle de un evento"""
@@ -114,6 +231,80 @@ class EventDetailViewTest(BaseEventTestCase):
         self.assertIn("event", response.context)
         self.assertEqual(response.context["event"].id, self.event1.id)
 
+    def test_event_detail_query_count_is_constant(self):
+        """Test que verifica que la cantidad de consultas del detalle no depende de comentarios ni calificaciones"""
+        category = Category.objects.create(name="Música", description="Conciertos")
+        self.event1.categories.add(category)
+        for i in range(20):
+            user = User.objects.create(username=f"comentador_{i}")
+            Comment.objects.create(title=f"Comentario {i}", text="Texto", user=user, event=self.event1)
+            Rating.objects.create(event=self.event1, user=user, rating=4, title=f"Calificacion {i}")
+            Ticket.objects.create(event=self.event1, user=user, quantity=1, buy_date=timezone.now())
+
+        self.client.login(username="regular", password="password123")
+        # sesion + usuario + evento (venue, organizador y cantidad de comentarios)
+        # + categorias + comentarios con usuario + calificaciones con usuario
+        with self.assertNumQueries(6):
+            response = self.client.get(reverse("event_detail", args=[self.event1.id]))
+        self.assertContains(response, "Comentarios (20)")
+        self.assertContains(response, "comentador_19")
+
+        self.client.login(username="organizador", password="password123")
+        # el organizador ademas ve las compras activas con su usuario
+        with self.assertNumQueries(7):
+            response = self.client.get(reverse("event_detail", args=[self.event1.id]))
+        self.assertContains(response, "Compras (20)")
+
+    def test_event_detail_renders_first_page_of_comments(self):
+        """Test que verifica que el detalle solo renderiza la primera pagina de comentarios"""
+        for i in range(15):
+            Comment.objects.create(title=f"Comentario {i:02}", text="Texto", user=self.regular_user, event=self.event1)
+        self.client.login(username="regular", password="password123")
+
+        with patch("app.views.COMMENTS_PAGE_SIZE", 10):
+            response = self.client.get(reverse("event_detail", args=[self.event1.id]))
+
+        self.assertContains(response, "Comentarios (15)")
+        self.assertEqual(len(response.context["comments"]), 10)
+        self.assertContains(response, "Comentario 14")
+        self.assertNotContains(response, "Comentario 04")
+        self.assertIsNotNone(response.context["comments_next_cursor"])
+
+    def test_event_comments_json_paginates_with_cursor(self):
+        """Test que verifica que el endpoint JSON devuelve todos los comentarios sin repetir"""
+        same_date = timezone.now()
+        for i in range(7):
+            Comment.objects.create(title=f"Comentario {i}", text="Texto", user=self.regular_user, event=self.event1, created_at=same_date)
+        Comment.objects.create(title="Otro evento", text="Texto", user=self.regular_user, event=self.event2)
+        self.client.login(username="organizador", password="password123")
+
+        seen = []
+        cursor = None
+        with patch("app.views.COMMENTS_PAGE_SIZE", 3):
+            while True:
+                params = {"cursor": cursor} if cursor else {}
+                data = self.client.get(reverse("event_comments", args=[self.event1.id]), params).json()
+                seen.extend(comment["id"] for comment in data["comments"])
+                cursor = data["next_cursor"]
+                if cursor is None:
+                    break
+
+        expected = list(self.event1.comments.order_by("-created_at", "-id").values_list("id", flat=True))
+        self.assertEqual(seen, expected)
+        # El organizador puede borrar pero no editar comentarios ajenos
+        self.assertIsNone(data["comments"][0]["edit_url"])
+        self.assertIsNotNone(data["comments"][0]["delete_url"])
+
+    def test_event_comments_json_with_cursor_of_wrong_types(self):
+        """Test que verifica que un cursor con valores de otro tipo devuelve la primera pagina"""
+        Comment.objects.create(title="Comentario", text="Texto", user=self.regular_user, event=self.event1)
+        self.client.login(username="regular", password="password123")
+        for values in (["2025-01-01T00:00:00+00:00", "abc"], [{"a": 1}, 1], [None, None]):
+            with self.subTest(values=values):
+                response = self.client.get(reverse("event_comments", args=[self.event1.id]), {"cursor": encode_cursor(values)})
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(len(response.json()["comments"]), 1)
+
     def test_event_detail_view_without_login(self):
         """Test que verifica que la vista event_detail redirige a login cuando el usuario no está logueado"""
         # Hacer petición a la vista event_detail sin login
@@ -0,0 +1,101 @@
+import datetime
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from app.models import Category, Comment, Event, User, Venue
+
+
+class FiltrosEventosTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.organizer = User.objects.create_user(username="organizador", password="password123", is_organizer=True)
+        self.la_plata = Venue.objects.create(name="Estadio", address="Calle 1", city="La Plata", capacity=100, contact="c@c.com")
+        self.cordoba = Venue.objects.create(name="Teatro", address="Calle 2", city="Córdoba", capacity=100, contact="c@c.com")
+        self.rock = Category.objects.create(name="Rock")
+        self.jazz = Category.objects.create(name="Jazz")
+        self.teatro = Category.objects.create(name="Teatro")
+        self.hoy = timezone.localdate()
+
+        self.recital = self.crear("Recital", self.la_plata, [self.rock, self.jazz], dias=1)
+        self.festival = self.crear("Festival", self.cordoba, [self.jazz], dias=5)
+        self.obra = self.crear("Obra", self.cordoba, [self.teatro], dias=10, status=Event.Status.AGOTADO)
+        self.client.login(username="organizador", password="password123")
+
+    def crear(self, title, venue, categories, dias, status=Event.Status.ACTIVO):
+        event = Event.objects.create(
+            title=title, description="Desc", organizer=self.organizer, venue=venue, status=status,
+            scheduled_at=timezone.make_aware(datetime.datetime.combine(
+                self.hoy + datetime.timedelta(days=dias), datetime.time(21, 0)
+            )),
+        )
+        event.categories.set(categories)
+        return event
+
+    def listar(self, **params):
+        return self.client.get(reverse("events"), params)
+
+    def test_varias_categorias_sin_repetir_eventos(self):
+        response = self.listar(category=[self.rock.pk, self.jazz.pk])
+        self.assertEqual(list(response.context["events"]), [self.recital, self.festival])
+
+        response = self.listar(category=[self.teatro.pk, "x"])
+        self.assertEqual(list(response.context["events"]), [self.obra])
+
+    def test_ciudad_fechas_y_estado(self):
+        response = self.listar(city="Córdoba")
+        self.assertEqual(list(response.context["events"]), [self.festival, self.obra])
+
+        # Las dos puntas del rango incluyen el dia completo
+        desde = self.hoy + datetime.timedelta(days=1)
+        hasta = self.hoy + datetime.timedelta(days=5)
+        response = self.listar(**{"from": desde.isoformat(), "to": hasta.isoformat()})
+        self.assertEqual(list(response.context["events"]), [self.recital, self.festival])
+
+        response = self.listar(city="Córdoba", status="Agotado", **{"from": "2025-02-30"})
+        self.assertEqual(list(response.context["events"]), [self.obra])
+        self.assertIsNone(response.context["filtros"]["from"])
+
+    def test_cada_faceta_cuenta_sin_su_propio_filtro(self):
+        response = self.listar(category=[self.jazz.pk], city="Córdoba")
+        facetas = response.context["facetas"]
+
+        self.assertEqual(list(response.context["events"]), [self.festival])
+        # Categorias con la ciudad aplicada: en Córdoba hay un evento de jazz y uno de teatro
+        self.assertEqual(facetas["category"], [(self.jazz.pk, "Jazz", 1), (self.teatro.pk, "Teatro", 1)])
+        # Ciudades con la categoria aplicada: jazz hay en las dos
+        self.assertEqual(facetas["city"], [("Córdoba", 1), ("La Plata", 1)])
+        estados = {value: total for value, _, total in facetas["status"]}
+        self.assertEqual(estados["Activo"], 1)
+        self.assertEqual(estados["Agotado"], 0)
+
+    def test_facetas_se_cachean_por_combinacion_de_filtros(self):
+        self.listar(city="Córdoba")
+        # sesion + usuario + pagina de eventos + categorias prefetcheadas, sin las facetas
+        with self.assertNumQueries(4):
+            self.listar(city="Córdoba")
+        # Otra combinacion de filtros se cuenta aparte, con una sola consulta para las tres facetas
+        with self.assertNumQueries(5):
+            self.listar(city="La Plata")
+
+        # Un comentario no cambia ninguna faceta: siguen cacheadas
+        Comment.objects.create(title="Hola", text="Texto", user=self.organizer, event=self.obra)
+        with self.assertNumQueries(4):
+            self.listar(city="Córdoba")
+
+        # Cambiar un evento invalida las facetas cacheadas
+        self.obra.status = Event.Status.ACTIVO
+        self.obra.save()
+        response = self.listar(city="Córdoba")
+        estados = {value: total for value, _, total in response.context["facetas"]["status"]}
+        self.assertEqual(estados["Activo"], 2)
+
+    def test_la_paginacion_conserva_los_filtros(self):
+        for i in range(20):
+            self.crear(f"Extra {i}", self.la_plata, [self.rock], dias=20 + i)
+
+        response = self.listar(category=[self.rock.pk], city="La Plata")
+        self.assertIsNotNone(response.context["next_cursor"])
+        self.assertContains(response, f"category={self.rock.pk}&amp;city=La+Plata")
@@ -69,4 +69,38 @@ class AverageRatingIntegrationTest(TestCase):
             self.assertContains(response, "Regular")
             
             # 7. Verificar que NO se muestra la calificación inválida
-            self.assertNotContains(response, "user3")  # is_current=False
\ No newline at end of file
+            self.assertNotContains(response, "user3")  # is_current=False
+
+    def test_update_rating_form_updates_average(self):
+        rating = Rating.objects.get(user=self.user1)
+        self.client.force_login(self.user1)
+        url = reverse('update_rating', args=[self.event.id, rating.id])
+        response = self.client.post(url, {"title": "Bueno", "text": "", "rating": 1})
+        self.assertEqual(response.status_code, 302)
+
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.rating_avg, 2.0)  # (1 + 3) / 2
+
+    def test_top_rated_events_sorted_by_stored_average(self):
+        other_event = Event.objects.create(
+            title="Evento top",
+            description="Descripción",
+            scheduled_at=timezone.now() + timezone.timedelta(days=2),
+            organizer=self.organizer,
+            venue=self.venue,
+        )
+        Rating.objects.create(event=other_event, user=self.user1, rating=5, title="Excelente")
+        Event.objects.create(
+            title="Evento sin calificar",
+            description="Descripción",
+            scheduled_at=timezone.now() + timezone.timedelta(days=3),
+            organizer=self.organizer,
+            venue=self.venue,
+        )
+
+        self.client.force_login(self.user2)
+        response = self.client.get(reverse('top_rated_events'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([e.id for e in response.context['events']], [other_event.id, self.event.id])
+        self.assertNotContains(response, "Evento sin calificar")
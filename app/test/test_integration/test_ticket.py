@@ -1,8 +1,16 @@
-from django.test import TestCase
+import csv
+import json
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+from django.core.exceptions import ValidationError
+from django.db import OperationalError, close_old_connections, connection
+from django.test import TestCase, TransactionTestCase
 from django.urls import reverse
 from django.contrib.messages import get_messages
 from django.utils import timezone
 from app.models import *
+from app.utils import encode_cursor
 import datetime
 from django.db.models import Sum
 
@@ -144,13 +152,14 @@ class TicketModelTest(TestCase):
             status=Event.Status.ACTIVO
         )
 
-        ticket = Ticket.objects.create(
+        # bulk_create no pasa por la validacion del limite por usuario: carga la ocupacion directamente
+        Ticket.objects.bulk_create([Ticket(
             quantity=100,
             type=Ticket.Type.VIP,
             event=event,
             buy_date=timezone.now(),
             user=user
-        )
+        )])
 
 
         # Simular intento de compra de 1 ticket adicional
@@ -161,6 +170,47 @@ class TicketModelTest(TestCase):
         # Verificamos la lógica
         self.assertTrue(capacidad_utilizada + nueva_cantidad > capacidad_maxima)
 
+class TicketConsultasPorCompraTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="comprador", password="password123")
+        organizer = User.objects.create_user(username="organizador_consultas", password="password123", is_organizer=True)
+        venue = Venue.objects.create(name="Estadio", address="Calle 1", city="La plata", capacity=100, contact="c@c.com")
+        self.event = Event.objects.create(
+            title="Evento", description="Desc", organizer=organizer, venue=venue,
+            scheduled_at=timezone.now() + timezone.timedelta(days=10),
+        )
+        self.client.login(username="comprador", password="password123")
+
+    def test_compra_en_cantidad_minima_de_consultas(self):
+        # sesion, usuario, evento con ubicacion, savepoint, reserva de cupos (bloquea el
+        # evento), suma del limite, insert, resumen diario y release. Es la primera venta del
+        # dia: el UPDATE del resumen no encuentra la fila, se crea y se vuelve a sumar
+        with self.assertNumQueries(11):
+            response = self.client.post(reverse("ticket_buy", args=[self.event.id]), {"quantity": 2, "type": "GENERAL"})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Ticket.objects.get().quantity, 2)
+
+    def test_compra_nueva_cuenta_su_propia_cantidad(self):
+        Ticket.new(buy_date=timezone.now(), quantity=3, type=Ticket.Type.GENERAL, event=self.event, user=self.user)
+        with self.assertRaises(ValidationError):
+            Ticket.new(buy_date=timezone.now(), quantity=2, type=Ticket.Type.GENERAL, event=self.event, user=self.user)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.tickets_sold, 3)
+
+    def test_cambios_que_no_suman_entradas_no_consultan_el_limite(self):
+        Ticket.new(buy_date=timezone.now(), quantity=3, type=Ticket.Type.GENERAL, event=self.event, user=self.user)
+        ticket = Ticket.objects.select_related("event__venue").get()
+
+        # savepoint, update, resumen diario (resta GENERAL; VIP no existe: update,
+        # alta y update) y release: sin suma del limite
+        with self.assertNumQueries(7):
+            ticket.update(type=Ticket.Type.VIP)
+
+        # savepoint, update, resumen diario, liberar cupos y release
+        with self.assertNumQueries(5):
+            ticket.soft_delete()
+
+
 class TicketReembolsoTest(TestCase):
     def setUp(self) -> None:
         self.user = User.objects.create_user(
@@ -247,4 +297,214 @@ class TicketReembolsoTest(TestCase):
         # Verificar que se redirige al formulario
         self.assertTemplateUsed(response, "request_form.html")
 
-        
\ No newline at end of file
+
+class ReembolsosOrganizadorTest(TestCase):
+    def setUp(self):
+        self.organizer = User.objects.create_user(username="organizador", password="password123", is_organizer=True)
+        self.other_organizer = User.objects.create_user(username="otro_organizador", password="password123", is_organizer=True)
+        venue = Venue.objects.create(name="Estadio", address="Calle 1", city="La plata", capacity=1000, contact="c@c.com")
+        self.event = Event.objects.create(
+            title="Evento propio", description="Desc", organizer=self.organizer, venue=venue,
+            scheduled_at=timezone.now() + timezone.timedelta(days=10),
+        )
+        other_event = Event.objects.create(
+            title="Evento ajeno", description="Desc", organizer=self.other_organizer, venue=venue,
+            scheduled_at=timezone.now() + timezone.timedelta(days=10),
+        )
+        for i in range(5):
+            user = User.objects.create(username=f"comprador_{i}")
+            for event in (self.event, other_event):
+                ticket = Ticket.objects.create(quantity=1, event=event, buy_date=timezone.now(), user=user)
+                RefundRequest.objects.create(ticket_code=str(ticket.ticket_code), reason="no_asistencia", requester=user)
+        self.client.login(username="organizador", password="password123")
+
+    def test_solo_muestra_reembolsos_de_eventos_propios(self):
+        # sesion + usuario + reembolsos con ticket, evento y solicitante
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse("reembolsos_eventos"))
+        self.assertEqual(len(response.context["refunds"]), 5)
+        self.assertContains(response, "Evento propio")
+        self.assertNotContains(response, "Evento ajeno")
+
+    def test_reembolsos_paginados(self):
+        seen = []
+        cursor = None
+        with patch("app.views.REFUNDS_PAGE_SIZE", 2):
+            while True:
+                params = {"cursor": cursor} if cursor else {}
+                response = self.client.get(reverse("reembolsos_eventos"), params)
+                seen.extend(refund.id for refund in response.context["refunds"])
+                cursor = response.context["next_cursor"]
+                if cursor is None:
+                    break
+        expected = RefundRequest.objects.filter(ticket__event=self.event).order_by("-created_at", "-id")
+        self.assertEqual(seen, list(expected.values_list("id", flat=True)))
+
+    def test_reembolsos_con_cursor_de_otro_tipo(self):
+        for values in (["2025-01-01T00:00:00+00:00", "abc"], [{"a": 1}, 1], [None, None]):
+            with self.subTest(values=values):
+                response = self.client.get(reverse("reembolsos_eventos"), {"cursor": encode_cursor(values)})
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(len(response.context["refunds"]), 5)
+
+
+class TicketCompraMasivaViewTest(TestCase):
+    def setUp(self):
+        self.organizer = User.objects.create_user(username="organizador", password="password123", is_organizer=True)
+        self.other_user = User.objects.create_user(username="otro", password="password123")
+        venue = Venue.objects.create(name="Estadio", address="Calle 1", city="La plata", capacity=100, contact="c@c.com")
+        self.event = Event.objects.create(
+            title="Congreso", description="Desc", organizer=self.organizer, venue=venue,
+            scheduled_at=timezone.now() + timezone.timedelta(days=10),
+        )
+        self.users = [User.objects.create(username=f"empleado_{i}") for i in range(5)]
+        self.url = reverse("ticket_bulk_buy", args=[self.event.id])
+
+    def post(self, tickets):
+        return self.client.post(self.url, json.dumps({"tickets": tickets}), content_type="application/json")
+
+    def test_organizador_emite_lote(self):
+        self.client.login(username="organizador", password="password123")
+        response = self.post([{"user_id": user.pk, "quantity": 2, "type": "VIP"} for user in self.users])
+
+        self.assertEqual(response.status_code, 201)
+        data = response.json()
+        self.assertEqual(data["count"], 5)
+        codigos = set(Ticket.objects.filter(event=self.event).values_list("ticket_code", flat=True))
+        self.assertEqual({uuid.UUID(c) for c in data["ticket_codes"]}, codigos)
+
+    def test_solo_organizador_o_staff(self):
+        self.client.login(username="otro", password="password123")
+        response = self.post([{"user_id": self.users[0].pk, "quantity": 1}])
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_pedidos_invalidos(self):
+        self.client.login(username="organizador", password="password123")
+        response = self.client.post(self.url, "no es json", content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+
+        response = self.post([{"user_id": self.users[0].pk, "quantity": 5}])
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("No se pueden tener más de 4 tickets", response.json()["error"][0])
+        self.assertFalse(Ticket.objects.exists())
+
+    def test_user_id_debe_ser_entero(self):
+        self.client.login(username="organizador", password="password123")
+        pk = self.users[0].pk
+        # int() los convertiria en otro usuario: 3.7 -> 3, True -> 1
+        for user_id in (pk + 0.7, True, "3.7", "-1", None, [pk]):
+            with self.subTest(user_id=user_id):
+                response = self.post([{"user_id": user_id, "quantity": 1}])
+                self.assertEqual(response.status_code, 400)
+        self.assertFalse(Ticket.objects.exists())
+
+        response = self.post([{"user_id": str(pk), "quantity": 1}])
+        self.assertEqual(response.status_code, 201)
+
+
+class TicketCompraConcurrenteTest(TransactionTestCase):
+    CAPACIDAD = 20
+    COMPRADORES = 60
+
+    def setUp(self):
+        organizer = User.objects.create(username="organizador_rush", is_organizer=True)
+        venue = Venue.objects.create(name="Estadio", address="Calle 1", city="La plata", capacity=self.CAPACIDAD, contact="c@c.com")
+        self.event = Event.objects.create(
+            title="Preventa",
+            description="Salida a la venta",
+            scheduled_at=timezone.now() + timezone.timedelta(days=30),
+            organizer=organizer,
+            venue=venue,
+        )
+        self.users = [User.objects.create(username=f"comprador_{i}") for i in range(self.COMPRADORES)]
+
+    def comprar(self, user):
+        # Cada hilo usa su propia conexion; con SQLite se reintenta si la base esta bloqueada
+        try:
+            for _ in range(50):
+                try:
+                    event = Event.objects.select_related("venue").get(pk=self.event.pk)
+                    Ticket.new(buy_date=timezone.now(), quantity=1, type=Ticket.Type.GENERAL, event=event, user=user)
+                    return True
+                except ValidationError:
+                    return False
+                except OperationalError:
+                    continue
+            return False
+        finally:
+            close_old_connections()
+            connection.close()
+
+    def test_compras_concurrentes_no_superan_capacidad(self):
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            resultados = list(pool.map(self.comprar, self.users))
+
+        self.event.refresh_from_db()
+        vendidos = Ticket.objects.filter(event=self.event, bl_baja=False).aggregate(total=Sum("quantity"))["total"] or 0
+        self.assertEqual(resultados.count(True), self.CAPACIDAD)
+        self.assertEqual(vendidos, self.CAPACIDAD)
+        self.assertEqual(self.event.tickets_sold, vendidos)
+
+
+class ExportarAsistentesTest(TestCase):
+    def setUp(self):
+        self.organizer = User.objects.create_user(username="organizador_export", password="password123", is_organizer=True)
+        venue = Venue.objects.create(name="Estadio", address="Calle 1", city="La plata", capacity=100, contact="c@c.com")
+        self.event = Event.objects.create(
+            title="Evento", description="Desc", organizer=self.organizer, venue=venue,
+            scheduled_at=timezone.now() + timezone.timedelta(days=10),
+        )
+        self.users = [User.objects.create_user(username=f"asistente_{i}", email=f"a{i}@test.com", password="password123") for i in range(3)]
+        self.tickets = Ticket.new_masivo(self.event, [
+            {"user_id": self.users[0].pk, "quantity": 2, "type": Ticket.Type.VIP},
+            {"user_id": self.users[1].pk, "quantity": 1, "type": Ticket.Type.GENERAL},
+            {"user_id": self.users[2].pk, "quantity": 1, "type": Ticket.Type.GENERAL},
+        ])
+        SatisfactionSurvey.objects.create(user=self.users[0], ticket=self.tickets[0], rating=4)
+        self.tickets[2].soft_delete()
+        self.url = reverse("event_attendees_export", args=[self.event.id])
+
+    def test_csv_con_las_entradas_activas(self):
+        self.client.login(username="organizador_export", password="password123")
+        response = self.client.get(self.url)
+
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+        self.assertIn("attachment", response["Content-Disposition"])
+        filas = list(csv.reader(b"".join(response.streaming_content).decode().splitlines()))
+        self.assertEqual(filas[0], ["ticket_code", "username", "email", "type", "quantity", "buy_date", "survey_rating"])
+        self.assertEqual(
+            [fila[:5] + fila[6:] for fila in filas[1:]],
+            [
+                [str(self.tickets[0].ticket_code), "asistente_0", "a0@test.com", "VIP", "2", "4"],
+                [str(self.tickets[1].ticket_code), "asistente_1", "a1@test.com", "GENERAL", "1", ""],
+            ],
+        )
+
+    def test_jsonl(self):
+        self.client.login(username="organizador_export", password="password123")
+        response = self.client.get(self.url, {"format": "jsonl"})
+
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        lineas = [json.loads(linea) for linea in b"".join(response.streaming_content).decode().splitlines()]
+        self.assertEqual([linea["username"] for linea in lineas], ["asistente_0", "asistente_1"])
+        self.assertEqual(lineas[0]["survey_rating"], 4)
+        self.assertIsNone(lineas[1]["survey_rating"])
+
+    def test_la_cabecera_sale_antes_de_consultar(self):
+        self.client.login(username="organizador_export", password="password123")
+        response = self.client.get(self.url)
+        contenido = iter(response.streaming_content)
+        with self.assertNumQueries(0):
+            self.assertEqual(next(contenido), b"ticket_code,username,email,type,quantity,buy_date,survey_rating\r\n")
+        # Las entradas salen de una sola consulta
+        with self.assertNumQueries(1):
+            self.assertEqual(len(list(contenido)), 2)
+
+    def test_solo_organizador_del_evento(self):
+        self.client.login(username="asistente_0", password="password123")
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+    def test_formato_invalido(self):
+        self.client.login(username="organizador_export", password="password123")
+        self.assertEqual(self.client.get(self.url, {"format": "xml"}).status_code, 400)
@@ -0,0 +1,85 @@
+import json
+import tempfile
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from app.carga import datos_de_fixture, generar_fixture, leer_mezcla, percentil, resumir
+from app.models import Category, Event, Ticket, User
+
+
+class CargaTest(TestCase):
+    def test_percentil_por_rango_mas_cercano(self):
+        valores = list(range(1, 101))
+        self.assertEqual(percentil(valores, 50), 50)
+        self.assertEqual(percentil(valores, 95), 95)
+        self.assertEqual(percentil(valores, 99), 99)
+        self.assertEqual(percentil([7], 99), 7)
+
+    def test_resumen_por_endpoint(self):
+        resumen = resumir(
+            {"events": [30.0, 10.0, 20.0]}, {"events": 1, "ticket_buy": 2}, segundos=2, rechazos={"create_rating": 2}
+        )
+
+        self.assertEqual(resumen["pedidos"], 8)
+        self.assertEqual(resumen["errores"], 3)
+        self.assertEqual(resumen["rechazos"], 2)
+        self.assertEqual(resumen["pedidos_por_segundo"], 4.0)
+        self.assertEqual(resumen["endpoints"]["events"]["p50_ms"], 20.0)
+        self.assertEqual(resumen["endpoints"]["events"]["p99_ms"], 30.0)
+        # Un endpoint en el que todo fallo o fue rechazado no tiene percentiles
+        self.assertIsNone(resumen["endpoints"]["ticket_buy"]["p95_ms"])
+        self.assertEqual(resumen["endpoints"]["create_rating"]["rechazos"], 2)
+        self.assertIsNone(resumen["endpoints"]["create_rating"]["p95_ms"])
+
+    def test_leer_mezcla(self):
+        self.assertEqual(leer_mezcla("events=3, ticket_buy=1"), {"events": 3, "ticket_buy": 1})
+        for invalida in ("otra=1", "events=x", "events=0", "events=-1"):
+            with self.assertRaises(ValueError):
+                leer_mezcla(invalida)
+
+    def test_el_fixture_se_carga_con_loaddata(self):
+        registros = generar_fixture(usuarios=3, eventos=4, primer_pk=500)
+        usuarios, event_ids = datos_de_fixture(registros)
+        self.assertEqual(usuarios, ["carga_0", "carga_1", "carga_2"])
+
+        call_command("seed_load_test", usuarios=3, eventos=4, primer_pk=500, archivo=self.archivo(), stdout=StringIO())
+
+        self.assertEqual(sorted(Event.objects.values_list("pk", flat=True)), event_ids)
+        self.assertTrue(User.objects.get(username="carga_organizador").is_organizer)
+        self.assertTrue(User.objects.get(username="carga_0").check_password("carga12345"))
+        self.assertEqual(Category.objects.get(pk=500).events.count(), 1)
+
+    def test_volver_a_sembrar_borra_lo_de_la_corrida_anterior(self):
+        archivo = self.archivo()
+        call_command("seed_load_test", usuarios=1, eventos=1, primer_pk=500, archivo=archivo, stdout=StringIO())
+        Ticket.objects.create(
+            user=User.objects.get(username="carga_0"), event_id=500, quantity=4, buy_date=timezone.now()
+        )
+
+        call_command("seed_load_test", usuarios=1, eventos=1, primer_pk=500, archivo=archivo, stdout=StringIO())
+
+        self.assertFalse(Ticket.objects.filter(event_id=500).exists())
+        self.assertEqual(Event.objects.get(pk=500).tickets_sold, 0)
+
+    def test_comparar_se_valida_antes_de_correr(self):
+        fixture = self.archivo()
+        with open(fixture, "w", encoding="utf-8") as f:
+            json.dump(generar_fixture(usuarios=1, eventos=1), f)
+        no_es_resultado = f"{fixture}.anterior"
+        with open(no_es_resultado, "w", encoding="utf-8") as f:
+            json.dump([1, 2], f)
+
+        with patch("app.management.commands.load_test.correr") as correr:
+            for comparar in (f"{fixture}.inexistente", no_es_resultado, fixture):
+                with self.subTest(comparar=comparar), self.assertRaises(CommandError):
+                    call_command("load_test", fixture=fixture, comparar=comparar, stdout=StringIO())
+        correr.assert_not_called()
+
+    def archivo(self):
+        directorio = tempfile.TemporaryDirectory()
+        self.addCleanup(directorio.cleanup)
+        return f"{directorio.name}/load_test.json"
@@ -0,0 +1,102 @@
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from app.db_router import COOKIE_PRIMARIA, ReplicaMiddleware, lectura_en_replica
+from app.models import Event, User, Venue
+
+
+def base_de_lectura(request):
+    # QuerySet.db consulta al router sin ejecutar la consulta
+    return HttpResponse(Event.objects.all().db)
+
+
+@lectura_en_replica
+def listado(request):
+    return base_de_lectura(request)
+
+
+@lectura_en_replica
+def listado_que_escribe(request):
+    Venue.objects.create(name="Nueva", address="-", city="-", capacity=1, contact="-")
+    return base_de_lectura(request)
+
+
+@lectura_en_replica
+def listado_que_bloquea(request):
+    return HttpResponse(Event.objects.select_for_update().db)
+
+
+@override_settings(REPLICA_DATABASES=["replica1"], REPLICA_STICKY_SECONDS=5)
+class ReplicaRouterTest(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def pedir(self, view, request=None):
+        return ReplicaMiddleware(view)(request or self.factory.get("/"))
+
+    def test_vista_marcada_lee_de_la_replica(self):
+        response = self.pedir(listado)
+        self.assertEqual(response.content, b"replica1")
+        self.assertNotIn(COOKIE_PRIMARIA, response.cookies)
+
+    def test_vista_sin_marcar_lee_de_la_primaria(self):
+        self.assertEqual(self.pedir(base_de_lectura).content, b"default")
+
+    def test_fuera_de_un_pedido_lee_de_la_primaria(self):
+        self.assertEqual(Event.objects.all().db, "default")
+
+    def test_post_lee_de_la_primaria(self):
+        self.assertEqual(self.pedir(listado, self.factory.post("/")).content, b"default")
+
+    def test_select_for_update_lee_de_la_primaria(self):
+        self.assertEqual(self.pedir(listado_que_bloquea).content, b"default")
+
+    def test_escritura_fija_la_primaria_y_deja_la_cookie(self):
+        response = self.pedir(listado_que_escribe)
+        self.assertEqual(response.content, b"default")
+        self.assertEqual(response.cookies[COOKIE_PRIMARIA]["max-age"], 5)
+
+    def test_cookie_mantiene_la_primaria_en_el_pedido_siguiente(self):
+        request = self.factory.get("/")
+        request.COOKIES[COOKIE_PRIMARIA] = "1"
+        self.assertEqual(self.pedir(listado, request).content, b"default")
+
+    def crear_evento(self):
+        User.objects.create_user(username="comprador", password="password123")
+        organizer = User.objects.create_user(username="organizador", password="password123", is_organizer=True)
+        venue = Venue.objects.create(name="Estadio", address="-", city="-", capacity=10, contact="-")
+        return Event.objects.create(
+            title="Recital", description="-", organizer=organizer, venue=venue,
+            scheduled_at=timezone.now() + timezone.timedelta(days=10),
+        )
+
+    def test_compra_deja_la_cookie_para_la_encuesta(self):
+        # ticket_buy redirige a satisfaction_survey, que tiene que ver el ticket recien creado
+        event = self.crear_evento()
+        self.client.login(username="comprador", password="password123")
+
+        response = self.client.post(reverse("ticket_buy", args=[event.pk]), {"quantity": 1, "type": "GENERAL"})
+        self.assertEqual(response.status_code, 302)
+        self.assertIn(COOKIE_PRIMARIA, response.cookies)
+
+    async def test_por_asgi_la_cadena_sigue_siendo_asincronica(self):
+        async def vista(request):
+            return await sync_to_async(listado)(request)
+
+        middleware = ReplicaMiddleware(vista)
+        self.assertTrue(iscoroutinefunction(middleware))
+        response = await middleware(self.factory.get("/"))
+        self.assertEqual(response.content, b"replica1")
+
+    async def test_compra_por_asgi_deja_la_cookie(self):
+        event = await sync_to_async(self.crear_evento)()
+        await self.async_client.alogin(username="comprador", password="password123")
+
+        response = await self.async_client.post(
+            reverse("ticket_buy", args=[event.pk]), {"quantity": 1, "type": "GENERAL"}
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertIn(COOKIE_PRIMARIA, response.cookies)
@@ -1,4 +1,6 @@
 from datetime import timedelta, datetime
+from io import StringIO
+from django.core.management import call_command
 from django.test import TestCase
 from django.utils import timezone
 from app.models import Event, User,Venue,Category
@@ -188,4 +190,79 @@ class EventStatusModelTest(TestCase):
     def test_puede_cambiarse_a_cancelado(self):
         self.event.status = Event.Status.CANCELADO
         self.event.save()
-        self.assertEqual(self.event.status, Event.Status.CANCELADO)
\ No newline at end of file
+        self.assertEqual(self.event.status, Event.Status.CANCELADO)
+
+class EventActualizarEstadosTest(TestCase):
+    def setUp(self):
+        self.organizer = User.objects.create_user(username="organizador_estados", password="password123", is_organizer=True)
+        self.venue = Venue.objects.create(name="Sala", address="Calle 1", city="La Plata", capacity=10, contact="c@c.com")
+
+    def crear_evento(self, titulo, dias, vendidas=0, status=Event.Status.ACTIVO):
+        event = Event.objects.create(
+            title=titulo,
+            description="Desc",
+            scheduled_at=timezone.now() + timedelta(days=dias),
+            venue=self.venue,
+            organizer=self.organizer,
+            status=status,
+        )
+        Event.objects.filter(pk=event.pk).update(tickets_sold=vendidas)
+        return event
+
+    def test_transiciones_en_bloque(self):
+        pasado = self.crear_evento("Pasado", -1)
+        agotado = self.crear_evento("Agotado", 5, vendidas=10)
+        self.crear_evento("Con cupo", 5, vendidas=3)
+        reabierto = self.crear_evento("Reabierto", 5, vendidas=9, status=Event.Status.AGOTADO)
+        cancelado = self.crear_evento("Cancelado", -1, status=Event.Status.CANCELADO)
+
+        # Por transicion: savepoint, SELECT de los ids, un UPDATE y release (sin el
+        # UPDATE si no hay eventos, como la de los reprogramados)
+        with self.assertNumQueries(15):
+            cambios = Event.actualizar_estados()
+
+        self.assertEqual(cambios, {
+            Event.Status.FINALIZADO: [pasado.pk],
+            Event.Status.AGOTADO: [agotado.pk],
+            Event.Status.ACTIVO: [reabierto.pk],
+        })
+        estados = dict(Event.objects.values_list("title", "status"))
+        self.assertEqual(estados["Pasado"], Event.Status.FINALIZADO)
+        self.assertEqual(estados["Agotado"], Event.Status.AGOTADO)
+        self.assertEqual(estados["Con cupo"], Event.Status.ACTIVO)
+        self.assertEqual(estados["Reabierto"], Event.Status.ACTIVO)
+        cancelado.refresh_from_db()
+        self.assertEqual(cancelado.status, Event.Status.CANCELADO)
+
+        agotado_antes = agotado.updated_at
+        agotado.refresh_from_db()
+        self.assertGreater(agotado.updated_at, agotado_antes)
+
+        # Una segunda corrida no encuentra nada para cambiar
+        self.assertEqual(Event.actualizar_estados(), {})
+
+    def test_reprogramado_agotado_vuelve_a_reprogramado(self):
+        reprogramado = self.crear_evento("Reprogramado", 5, vendidas=10, status=Event.Status.REPROGRAMADO)
+        activo = self.crear_evento("Activo", 5, vendidas=10)
+        cambios = Event.actualizar_estados()
+        self.assertCountEqual(cambios[Event.Status.AGOTADO], [reprogramado.pk, activo.pk])
+
+        Event.objects.filter(pk__in=[reprogramado.pk, activo.pk]).update(tickets_sold=8)
+        self.assertEqual(Event.actualizar_estados(), {
+            Event.Status.REPROGRAMADO: [reprogramado.pk],
+            Event.Status.ACTIVO: [activo.pk],
+        })
+        reprogramado.refresh_from_db()
+        self.assertEqual(reprogramado.status, Event.Status.REPROGRAMADO)
+        self.assertEqual(reprogramado.status_before_sold_out, "")
+
+    def test_comando_update_event_status(self):
+        self.crear_evento("Pasado", -1)
+        out = StringIO()
+        call_command("update_event_status", stdout=out)
+        self.assertIn("1 evento(s) pasaron a Finalizado.", out.getvalue())
+
+        out = StringIO()
+        call_command("update_event_status", stdout=out)
+        self.assertIn("No hay eventos para actualizar.", out.getvalue())
+
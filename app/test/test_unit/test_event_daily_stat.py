@@ -0,0 +1,181 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from app.models import (
+    Event,
+    EventDailyStat,
+    Rating,
+    RefundRequest,
+    SatisfactionSurvey,
+    Ticket,
+    User,
+    Venue,
+)
+
+
+def contadores(event):
+    return {
+        (stat.day, stat.metric, stat.key): stat.value
+        for stat in EventDailyStat.objects.filter(event=event).exclude(value=0)
+    }
+
+
+class EventDailyStatTest(TestCase):
+    def setUp(self):
+        self.organizer = User.objects.create_user(username="organizador", password="password123", is_organizer=True)
+        self.users = [User.objects.create_user(username=f"asistente_{i}", password="password123") for i in range(3)]
+        venue = Venue.objects.create(name="Estadio", address="Calle 1", city="La plata", capacity=100, contact="c@c.com")
+        self.event = Event.objects.create(
+            title="Recital", description="Desc", organizer=self.organizer, venue=venue,
+            scheduled_at=timezone.now() + timezone.timedelta(days=10),
+        )
+        self.hoy = timezone.localdate()
+
+    def comprar(self, user, quantity, type=Ticket.Type.GENERAL, buy_date=None):
+        return Ticket.new(
+            buy_date=buy_date or timezone.now(), quantity=quantity, type=type, event=self.event, user=user
+        )
+
+    def test_entradas_se_suman_por_dia_y_tipo(self):
+        ayer = timezone.now() - timezone.timedelta(days=1)
+        self.comprar(self.users[0], 2, buy_date=ayer)
+        ticket = self.comprar(self.users[1], 3)
+        Ticket.new_masivo(self.event, [{"user_id": self.users[2].pk, "quantity": 1, "type": Ticket.Type.VIP}])
+
+        ticket.update(type=Ticket.Type.VIP)
+        self.comprar(self.users[0], 1).soft_delete()
+
+        self.assertEqual(contadores(self.event), {
+            (timezone.localdate(ayer), "tickets", "GENERAL"): 2,
+            (self.hoy, "tickets", "VIP"): 4,
+        })
+
+    def test_reembolsos_calificaciones_y_encuestas(self):
+        ticket = self.comprar(self.users[0], 2)
+        RefundRequest.new(str(ticket.ticket_code), "no_asistencia", "", self.users[0])
+        RefundRequest.objects.get().approve()
+        # Un codigo que no es de ningun ticket no tiene evento y no se cuenta
+        RefundRequest.new("codigo-inexistente", "error_compra", "", self.users[1])
+
+        rating = Rating.objects.create(user=self.users[1], event=self.event, title="Bien", rating=4)
+        rating.rating = 5
+        rating.save()
+        Rating.objects.create(user=self.users[2], event=self.event, title="Mal", rating=1).soft_delete()
+
+        SatisfactionSurvey.objects.create(user=self.users[1], ticket=self.comprar(self.users[1], 1), rating=4)
+        SatisfactionSurvey.objects.create(user=self.users[2], ticket=self.comprar(self.users[2], 1), rating=3)
+
+        self.assertEqual(contadores(self.event), {
+            (self.hoy, "tickets", "GENERAL"): 2,
+            (self.hoy, "reembolsos", "aprobado:no_asistencia"): 1,
+            (self.hoy, "calificaciones", "5"): 1,
+            (self.hoy, "encuesta", "suma"): 7,
+            (self.hoy, "encuesta", "cantidad"): 2,
+        })
+
+        RefundRequest.objects.get(ticket=ticket).delete()
+        self.assertNotIn((self.hoy, "reembolsos", "aprobado:no_asistencia"), contadores(self.event))
+
+    def test_borrados_fisicos_se_descuentan(self):
+        ticket = self.comprar(self.users[0], 2)
+        self.comprar(self.users[1], 1)
+        Rating.objects.create(user=self.users[0], event=self.event, title="Bien", rating=4)
+        SatisfactionSurvey.objects.create(user=self.users[0], ticket=ticket, rating=5)
+
+        # Borra la encuesta en cascada
+        ticket.delete()
+        Rating.objects.filter(event=self.event).delete()
+        self.assertEqual(contadores(self.event), {(self.hoy, "tickets", "GENERAL"): 1})
+
+        # Con el evento se borra su resumen: no queda nada que descontar ni filas nuevas
+        self.event.delete()
+        self.assertFalse(EventDailyStat.objects.exists())
+
+    def test_borrar_un_usuario_descuenta_todo_lo_suyo_agrupado(self):
+        for _ in range(3):
+            self.comprar(self.users[0], 1)
+        ticket = self.comprar(self.users[1], 1)
+        RefundRequest.new(str(ticket.ticket_code), "no_asistencia", "", self.users[1])
+        Rating.objects.create(user=self.users[1], event=self.event, title="Bien", rating=4)
+        SatisfactionSurvey.objects.create(user=self.users[1], ticket=ticket, rating=5)
+        # Reembolso pedido por otro usuario sobre un ticket que queda: desaparece con quien lo pidio
+        otro = self.comprar(self.users[2], 2)
+        RefundRequest.new(str(otro.ticket_code), "error_compra", "", self.users[0])
+
+        with CaptureQueriesContext(connection) as consultas:
+            self.users[0].delete()
+        # Un UPDATE por contador (tres tickets del mismo dia y tipo y un reembolso), no por fila
+        updates = [q for q in consultas if q["sql"].startswith('UPDATE "app_eventdailystat"')]
+        self.assertEqual(len(updates), 2)
+
+        self.users[1].delete()
+        self.assertEqual(contadores(self.event), {(self.hoy, "tickets", "GENERAL"): 2})
+        self.assertEqual(self.reconstruido(), contadores(self.event))
+
+    def test_borrar_un_ticket_descuenta_sus_reembolsos(self):
+        ticket = self.comprar(self.users[0], 2)
+        RefundRequest.new(str(ticket.ticket_code), "no_asistencia", "", self.users[0])
+
+        # La solicitud queda sin ticket (SET_NULL) y deja de contar
+        ticket.delete()
+        self.assertEqual(contadores(self.event), {})
+        self.assertIsNone(RefundRequest.objects.get().ticket)
+
+    def test_borrar_el_evento_no_descuenta_fila_por_fila(self):
+        for user in self.users:
+            Rating.objects.create(user=user, event=self.event, title="Bien", rating=4)
+            SatisfactionSurvey.objects.create(user=user, ticket=self.comprar(user, 1), rating=5)
+
+        with CaptureQueriesContext(connection) as consultas:
+            self.event.delete()
+        # Ni el resumen ni los agregados del evento: se borran con el
+        self.assertFalse([q for q in consultas if q["sql"].startswith(('UPDATE "app_eventdailystat"', 'UPDATE "app_event"'))])
+        self.assertFalse(EventDailyStat.objects.exists())
+
+    def reconstruido(self):
+        with transaction.atomic():
+            call_command("rebuild_event_stats", stdout=StringIO())
+            reconstruido = contadores(self.event)
+            transaction.set_rollback(True)
+        return reconstruido
+
+    def test_reconstruir_coincide_con_lo_incremental(self):
+        ticket = self.comprar(self.users[0], 3)
+        ticket.update(quantity=1)
+        self.comprar(self.users[1], 2, type=Ticket.Type.VIP)
+        RefundRequest.new(str(ticket.ticket_code), "error_compra", "", self.users[0])
+        Rating.objects.create(user=self.users[0], event=self.event, title="Bien", rating=4)
+        SatisfactionSurvey.objects.create(user=self.users[0], ticket=ticket, rating=5)
+        incremental = contadores(self.event)
+
+        EventDailyStat.objects.update(value=0)
+        call_command("rebuild_event_stats", stdout=StringIO())
+
+        self.assertEqual(contadores(self.event), incremental)
+
+    def test_resumen_por_evento(self):
+        self.comprar(self.users[0], 2)
+        self.comprar(self.users[1], 1, type=Ticket.Type.VIP, buy_date=timezone.now() - timezone.timedelta(days=20))
+        Rating.objects.create(user=self.users[0], event=self.event, title="Bien", rating=4)
+        otro = Event.objects.create(
+            title="Sin ventas", description="Desc", organizer=self.organizer, venue=self.event.venue,
+            scheduled_at=timezone.now() + timezone.timedelta(days=5),
+        )
+
+        with self.assertNumQueries(2):
+            resumen = EventDailyStat.resumen_por_evento([self.event.pk, otro.pk], hoy=self.hoy)
+
+        datos = resumen[self.event.pk]
+        self.assertEqual(datos["tickets"], {"GENERAL": 2, "VIP": 1})
+        self.assertEqual(datos["calificaciones"]["4"], 1)
+        self.assertIsNone(datos["encuesta_promedio"])
+        # La venta de hace 20 dias queda fuera de la ventana de 14
+        self.assertEqual(len(datos["ventas_por_dia"]), 14)
+        self.assertEqual(datos["ventas_por_dia"][self.hoy], 2)
+        self.assertEqual(sum(datos["ventas_por_dia"].values()), 2)
+        self.assertEqual(sum(resumen[otro.pk]["tickets"].values()), 0)
@@ -1,4 +1,6 @@
-from django.test import SimpleTestCase
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+from app.models import Event, Rating, User, Venue
 from app.utils import calculate_average_rating
 
 class CalculateAverageRatingTest(SimpleTestCase):
@@ -17,4 +19,73 @@ class CalculateAverageRatingTest(SimpleTestCase):
             self.FakeRating(1, bl_baja=True)        # excluido
         ]
         result = calculate_average_rating(ratings)
-        self.assertEqual(result, 4.0)  # (5 + 3) / 2
\ No newline at end of file
+        self.assertEqual(result, 4.0)  # (5 + 3) / 2
+
+class EventRatingAggregatesTest(TestCase):
+
+    def setUp(self):
+        self.organizer = User.objects.create(username="organizador", is_organizer=True)
+        self.user1 = User.objects.create(username="user1")
+        self.user2 = User.objects.create(username="user2")
+        venue = Venue.objects.create(name="Test Venue", address="Somewhere")
+        self.event = Event.objects.create(
+            title="Evento prueba",
+            description="Descripción de prueba",
+            scheduled_at=timezone.now() + timezone.timedelta(days=1),
+            organizer=self.organizer,
+            venue=venue,
+        )
+
+    def test_crear_calificaciones_actualiza_agregados(self):
+        Rating.objects.create(event=self.event, user=self.user1, rating=5, title="Excelente")
+        Rating.objects.create(event=self.event, user=self.user2, rating=2, title="Malo")
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.rating_sum, 7)
+        self.assertEqual(self.event.rating_count, 2)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.event.average_rating(), 3.5)
+
+    def test_editar_calificacion_ajusta_suma(self):
+        rating = Rating.objects.create(event=self.event, user=self.user1, rating=5, title="Excelente")
+        rating = Rating.objects.get(pk=rating.pk)
+        rating.rating = 3
+        rating.save()
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.rating_sum, 3)
+        self.assertEqual(self.event.rating_count, 1)
+        self.assertEqual(self.event.rating_avg, 3.0)
+
+    def test_baja_de_calificacion_descuenta_agregados(self):
+        Rating.objects.create(event=self.event, user=self.user1, rating=5, title="Excelente")
+        rating = Rating.objects.create(event=self.event, user=self.user2, rating=1, title="Malo")
+        rating.soft_delete()
+        rating.soft_delete()
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.rating_count, 1)
+        self.assertEqual(self.event.rating_avg, 5.0)
+
+        Rating.objects.get(user=self.user1).soft_delete()
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.rating_count, 0)
+        self.assertEqual(self.event.rating_avg, 0)
+
+    def test_calificacion_no_vigente_no_cuenta(self):
+        Rating.objects.create(event=self.event, user=self.user1, rating=1, title="Vieja", is_current=False)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.rating_count, 0)
+
+    def test_borrar_al_autor_descuenta_su_calificacion(self):
+        Rating.objects.create(event=self.event, user=self.user1, rating=1, title="Malo")
+        Rating.objects.create(event=self.event, user=self.user2, rating=5, title="Excelente")
+
+        # El borrado en cascada no pasa por Rating.save()
+        self.user1.delete()
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.rating_sum, 5)
+        self.assertEqual(self.event.rating_count, 1)
+        self.assertEqual(self.event.rating_avg, 5.0)
+
+        Rating.objects.all().delete()
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.rating_count, 0)
+        self.assertEqual(self.event.rating_avg, 0)
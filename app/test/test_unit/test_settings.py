@@ -0,0 +1,99 @@
+import tempfile
+from pathlib import Path
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.utils import ConnectionHandler
+from django.test import TestCase
+
+from eventhub.settings.database import bases_de_datos, configuracion_base_de_datos
+
+BASE_DIR = Path("/proyecto")
+
+
+class ConfiguracionBaseDeDatosTest(TestCase):
+    def test_sin_variables_usa_sqlite(self):
+        config = configuracion_base_de_datos({}, BASE_DIR)
+        self.assertEqual(config["ENGINE"], "django.db.backends.sqlite3")
+        self.assertEqual(config["NAME"], BASE_DIR / "db.sqlite3")
+        self.assertEqual(config["CONN_MAX_AGE"], 0)
+        self.assertFalse(config["CONN_HEALTH_CHECKS"])
+
+    def test_postgresql_con_conexiones_persistentes(self):
+        env = {
+            "DJANGO_DB_ENGINE": "postgresql",
+            "DJANGO_DB_NAME": "eventhub",
+            "DJANGO_DB_USER": "usuario",
+            "DJANGO_DB_PASSWORD": "secreto",
+            "DJANGO_DB_HOST": "db",
+            "DJANGO_DB_PORT": "5432",
+        }
+        config = configuracion_base_de_datos(env, BASE_DIR, conn_max_age=60, health_checks=True)
+        self.assertEqual(config["ENGINE"], "django.db.backends.postgresql")
+        self.assertEqual(config["HOST"], "db")
+        self.assertEqual(config["CONN_MAX_AGE"], 60)
+        self.assertTrue(config["CONN_HEALTH_CHECKS"])
+
+    def test_variables_pisan_los_valores_del_entorno(self):
+        env = {"DJANGO_DB_CONN_MAX_AGE": "5", "DJANGO_DB_CONN_HEALTH_CHECKS": "0"}
+        config = configuracion_base_de_datos(env, BASE_DIR, conn_max_age=60, health_checks=True)
+        self.assertEqual(config["CONN_MAX_AGE"], 5)
+        self.assertFalse(config["CONN_HEALTH_CHECKS"])
+
+    def test_pool_desactiva_conexiones_persistentes(self):
+        env = {"DJANGO_DB_ENGINE": "postgresql", "DJANGO_DB_POOL_SIZE": "10"}
+        config = configuracion_base_de_datos(env, BASE_DIR, conn_max_age=60)
+        self.assertEqual(config["OPTIONS"]["pool"], {"min_size": 1, "max_size": 10})
+        self.assertEqual(config["CONN_MAX_AGE"], 0)
+
+        env = {"DJANGO_DB_ENGINE": "mysql", "DJANGO_DB_POOL_SIZE": "5"}
+        config = configuracion_base_de_datos(env, BASE_DIR)
+        self.assertEqual(config["ENGINE"], "mysql.connector.django")
+        self.assertEqual(config["OPTIONS"], {"pool_name": "eventhub", "pool_size": 5})
+
+    def test_configuraciones_invalidas(self):
+        with self.assertRaises(ImproperlyConfigured):
+            configuracion_base_de_datos({"DJANGO_DB_ENGINE": "oracle"}, BASE_DIR)
+        with self.assertRaises(ImproperlyConfigured):
+            configuracion_base_de_datos({"DJANGO_DB_POOL_SIZE": "4"}, BASE_DIR)
+
+    def test_ajuste_de_sqlite_es_opcional(self):
+        self.assertEqual(configuracion_base_de_datos({}, BASE_DIR)["OPTIONS"], {})
+
+        config = configuracion_base_de_datos({"DJANGO_DB_SQLITE_TUNING": "1"}, BASE_DIR)
+        self.assertEqual(config["OPTIONS"]["transaction_mode"], "IMMEDIATE")
+        self.assertEqual(config["OPTIONS"]["timeout"], 20)
+        self.assertIn("PRAGMA journal_mode=WAL", config["OPTIONS"]["init_command"])
+
+    def test_ajuste_de_sqlite_se_aplica_al_conectar(self):
+        with tempfile.TemporaryDirectory() as directorio:
+            env = {"DJANGO_DB_NAME": str(Path(directorio) / "db.sqlite3"), "DJANGO_DB_SQLITE_TUNING": "1"}
+            conexion = ConnectionHandler({"default": configuracion_base_de_datos(env, BASE_DIR)})["default"]
+            try:
+                with conexion.cursor() as cursor:
+                    cursor.execute("PRAGMA journal_mode")
+                    self.assertEqual(cursor.fetchone()[0], "wal")
+                    cursor.execute("PRAGMA synchronous")
+                    # 1 = NORMAL
+                    self.assertEqual(cursor.fetchone()[0], 1)
+            finally:
+                conexion.close()
+
+
+    def test_replicas_de_lectura(self):
+        self.assertEqual(list(bases_de_datos({}, BASE_DIR)), ["default"])
+
+        env = {
+            "DJANGO_DB_REPLICAS": "2",
+            "DJANGO_DB_REPLICA1_NAME": "/tmp/replica1.sqlite3",
+            "DJANGO_DB_REPLICA2_ENGINE": "postgresql",
+            "DJANGO_DB_REPLICA2_HOST": "replica2",
+        }
+        databases = bases_de_datos(env, BASE_DIR, conn_max_age=60)
+        self.assertEqual(list(databases), ["default", "replica1", "replica2"])
+        self.assertEqual(databases["replica1"]["NAME"], "/tmp/replica1.sqlite3")
+        self.assertEqual(databases["replica2"]["HOST"], "replica2")
+        self.assertEqual(databases["replica2"]["CONN_MAX_AGE"], 60)
+        self.assertEqual(databases["replica1"]["TEST"], {"MIRROR": "default"})
+
+        with self.assertRaises(ImproperlyConfigured):
+            bases_de_datos({"DJANGO_DB_REPLICAS": "1"}, BASE_DIR)
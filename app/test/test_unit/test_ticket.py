@@ -1,15 +1,14 @@
 import unittest
-from django.test import TestCase
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase
 from django.utils import timezone
 from unittest.mock import patch, MagicMock
 from app.models import *
 from app.views import *
 from datetime import datetime
 from django.core.exceptions import ValidationError
-from django.test import TestCase
 from app.models import User, Venue, Event, Ticket
-from app.views import ticket_excede_capacidad_maxima
-from django.utils import timezone
 
 
 class TicketUsuarioLimiteTest(TestCase):
@@ -76,6 +75,16 @@ class TicketUsuarioLimiteTest(TestCase):
         )
         self.assertFalse(resultado, "No debería exceder el límite de tickets")
 
+    def test_ticket_nuevo_suma_su_cantidad(self):
+        Ticket.objects.create(user=self.user, event=self.event, quantity=3, buy_date=timezone.now())
+
+        # Un ticket nuevo (sin id) de 2 lleva el total a 5
+        with self.assertNumQueries(1):
+            resultado = Ticket.ticket_excede_limite_usuario(
+                user_id=self.user.id, event_id=self.event.id, nueva_cantidad=2
+            )
+        self.assertTrue(resultado)
+
 
 # Verificar que al comprar un ticket con X lugares, no se sobrepase la capacidad de lugares del evento.
 class TicketCapacidadTest(TestCase):
@@ -92,14 +101,208 @@ class TicketCapacidadTest(TestCase):
 
     # Si el espacio tiene 90/100 lugares ocupados pero compro 10, el ticket NO excede la capacidad maxima
     def test_no_excede_capacidad(self):
-        Ticket.objects.create(
+        # bulk_create no valida el limite por usuario ni pasa por Ticket.new: carga la
+        # ocupacion directamente y despues se recalcula el contador
+        Ticket.objects.bulk_create([Ticket(
             user=self.user, event=self.event, quantity=90, buy_date=datetime.now()
-        )
-        self.assertFalse(ticket_excede_capacidad_maxima(self.event, 10))
+        )])
+        Event.reconciliar_tickets_vendidos()
+        self.assertFalse(self.event.excede_capacidad(10))
 
     # Si el espacio tiene 100/100 lugares ocupados y compro 10, el ticket SI excede la capacidad maxima
     def test_excede_capacidad(self):
-        Ticket.objects.create(
+        Ticket.objects.bulk_create([Ticket(
             user=self.user, event=self.event, quantity=100, buy_date=datetime.now()
+        )])
+        Event.reconciliar_tickets_vendidos()
+        self.assertTrue(self.event.excede_capacidad(1))
+
+
+# Verificar que la reserva de cupos del evento se hace sobre el contador tickets_sold
+class TicketReservaCuposTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(username="test_user")
+        self.venue = Venue.objects.create(name="Teatro", capacity=5)
+        self.event = Event.objects.create(
+            title="Obra",
+            description="Una obra de teatro",
+            scheduled_at=timezone.now(),
+            organizer=self.user,
+            venue=self.venue,
         )
-        self.assertTrue(ticket_excede_capacidad_maxima(self.event, 1))
+
+    def test_compra_incrementa_tickets_vendidos(self):
+        Ticket.new(buy_date=timezone.now(), quantity=3, type=Ticket.Type.GENERAL, event=self.event, user=self.user)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.tickets_sold, 3)
+
+    def test_compra_sin_cupos_no_crea_ticket(self):
+        otro = User.objects.create(username="otro_user")
+        Ticket.new(buy_date=timezone.now(), quantity=4, type=Ticket.Type.GENERAL, event=self.event, user=self.user)
+        with self.assertRaises(ValidationError):
+            Ticket.new(buy_date=timezone.now(), quantity=2, type=Ticket.Type.GENERAL, event=self.event, user=otro)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.tickets_sold, 4)
+        self.assertEqual(Ticket.objects.filter(event=self.event).count(), 1)
+
+    def test_compra_invalida_deshace_la_reserva(self):
+        # El tipo invalido falla en save(), la reserva de cupos tiene que revertirse
+        with self.assertRaises(ValidationError):
+            Ticket.new(buy_date=timezone.now(), quantity=2, type="PLATEA", event=self.event, user=self.user)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.tickets_sold, 0)
+
+    def test_baja_libera_cupos(self):
+        ticket = Ticket.new(buy_date=timezone.now(), quantity=2, type=Ticket.Type.GENERAL, event=self.event, user=self.user)
+        ticket.soft_delete()
+        ticket.soft_delete()
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.tickets_sold, 0)
+
+    def test_guardar_evento_no_pisa_el_contador(self):
+        evento_en_memoria = Event.objects.get(pk=self.event.pk)
+        Ticket.new(buy_date=timezone.now(), quantity=2, type=Ticket.Type.GENERAL, event=self.event, user=self.user)
+        evento_en_memoria.title = "Obra reprogramada"
+        evento_en_memoria.save()
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.tickets_sold, 2)
+        self.assertEqual(self.event.title, "Obra reprogramada")
+
+    def test_editar_ajusta_tickets_vendidos(self):
+        ticket = Ticket.new(buy_date=timezone.now(), quantity=1, type=Ticket.Type.GENERAL, event=self.event, user=self.user)
+        ticket.update(quantity=3)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.tickets_sold, 3)
+        ticket.update(quantity=2)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.tickets_sold, 2)
+        self.assertEqual(self.event.remaining_capacity, 3)
+
+    def test_editar_sin_cupos_no_modifica_ticket(self):
+        otro = User.objects.create(username="otro_user")
+        ticket = Ticket.new(buy_date=timezone.now(), quantity=1, type=Ticket.Type.GENERAL, event=self.event, user=self.user)
+        Ticket.new(buy_date=timezone.now(), quantity=3, type=Ticket.Type.GENERAL, event=self.event, user=otro)
+        with self.assertRaises(ValidationError):
+            ticket.update(quantity=3)
+        ticket.refresh_from_db()
+        self.event.refresh_from_db()
+        self.assertEqual(ticket.quantity, 1)
+        self.assertEqual(self.event.tickets_sold, 4)
+
+    def test_aprobar_reembolso_libera_cupos(self):
+        ticket = Ticket.new(buy_date=timezone.now(), quantity=2, type=Ticket.Type.GENERAL, event=self.event, user=self.user)
+        refund = RefundRequest.objects.create(ticket_code=str(ticket.ticket_code), reason="no_asistencia", requester=self.user)
+        refund.approve()
+        ticket.refresh_from_db()
+        self.event.refresh_from_db()
+        self.assertTrue(ticket.bl_baja)
+        self.assertEqual(self.event.tickets_sold, 0)
+
+    def test_borrado_fisico_libera_cupos(self):
+        otro = User.objects.create(username="otro_comprador")
+        Ticket.new(buy_date=timezone.now(), quantity=1, type=Ticket.Type.GENERAL, event=self.event, user=self.user)
+        Ticket.new(buy_date=timezone.now(), quantity=2, type=Ticket.Type.GENERAL, event=self.event, user=otro)
+        baja = Ticket.new(buy_date=timezone.now(), quantity=1, type=Ticket.Type.VIP, event=self.event, user=otro)
+        baja.soft_delete()
+
+        # Borrar al usuario borra sus tickets en cascada sin pasar por soft_delete
+        otro.delete()
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.tickets_sold, 1)
+
+        Ticket.objects.filter(event=self.event).delete()
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.tickets_sold, 0)
+
+    def test_reconciliar_corrige_diferencias(self):
+        Ticket.objects.create(user=self.user, event=self.event, quantity=2, buy_date=timezone.now())
+        diferencias = Event.reconciliar_tickets_vendidos(dry_run=True)
+        self.assertEqual([(e.pk, guardado, real) for e, guardado, real in diferencias], [(self.event.pk, 0, 2)])
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.tickets_sold, 0)
+
+        out = StringIO()
+        call_command("reconcile_tickets_sold", stdout=out)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.tickets_sold, 2)
+        self.assertIn("1 evento(s) corregidos", out.getvalue())
+
+    def test_reembolso_resuelve_ticket_por_codigo(self):
+        ticket = Ticket.new(buy_date=timezone.now(), quantity=1, type=Ticket.Type.GENERAL, event=self.event, user=self.user)
+        refund = RefundRequest.objects.create(ticket_code=f" {ticket.ticket_code} ", reason="no_asistencia", requester=self.user)
+        self.assertEqual(refund.ticket, ticket)
+
+        invalido = RefundRequest.objects.create(ticket_code="no-es-un-codigo", reason="no_asistencia", requester=self.user)
+        self.assertIsNone(invalido.ticket)
+
+
+class TicketCompraMasivaTest(TestCase):
+    def setUp(self):
+        self.organizer = User.objects.create(username="boleteria", is_organizer=True)
+        self.venue = Venue.objects.create(name="Estadio", capacity=10)
+        self.event = Event.objects.create(
+            title="Festival",
+            description="Festival de musica",
+            scheduled_at=timezone.now() + timezone.timedelta(days=10),
+            organizer=self.organizer,
+            venue=self.venue,
+        )
+        self.users = [User.objects.create(username=f"asistente_{i}") for i in range(3)]
+
+    def compra(self, user, quantity=1, type=Ticket.Type.GENERAL):
+        return {"user_id": user.pk, "quantity": quantity, "type": type}
+
+    def test_crea_el_lote_y_reserva_la_capacidad(self):
+        compras = [self.compra(self.users[0], 2), self.compra(self.users[1], 3, Ticket.Type.VIP), self.compra(self.users[0], 2)]
+        # usuarios + savepoint + bloqueo del evento + limite por usuario + reserva + insert +
+        # release, y el resumen diario por tipo: dos UPDATE sin filas, un alta para ambas y dos UPDATE
+        with self.assertNumQueries(12):
+            tickets = Ticket.new_masivo(self.event, compras)
+
+        self.assertEqual(len(tickets), 3)
+        self.assertEqual(len({t.ticket_code for t in tickets}), 3)
+        self.assertEqual(Ticket.objects.filter(event=self.event).count(), 3)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.tickets_sold, 7)
+
+    def test_limite_por_usuario_cuenta_lo_ya_comprado(self):
+        Ticket.new(buy_date=timezone.now(), quantity=3, type=Ticket.Type.GENERAL, event=self.event, user=self.users[0])
+
+        with self.assertRaises(ValidationError):
+            Ticket.new_masivo(self.event, [self.compra(self.users[1]), self.compra(self.users[0], 2)])
+
+        self.assertEqual(Ticket.objects.filter(event=self.event).count(), 1)
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.tickets_sold, 3)
+
+    def test_sin_capacidad_no_crea_ninguna(self):
+        Event.objects.filter(pk=self.event.pk).update(tickets_sold=8)
+        with self.assertRaisesMessage(ValidationError, "capacidad maxima"):
+            Ticket.new_masivo(self.event, [self.compra(user) for user in self.users])
+        self.assertFalse(Ticket.objects.filter(event=self.event).exists())
+
+    def test_valida_tipos_cantidades_y_usuarios(self):
+        with self.assertRaises(ValidationError) as ctx:
+            Ticket.new_masivo(self.event, [self.compra(self.users[0], 0), self.compra(self.users[1], 1, "PLATEA")])
+        self.assertEqual(len(ctx.exception.messages), 2)
+
+        with self.assertRaisesMessage(ValidationError, "la cantidad debe ser un número entero positivo"):
+            Ticket.new_masivo(self.event, [self.compra(self.users[0], True)])
+        self.assertFalse(Ticket.objects.filter(event=self.event).exists())
+
+        with self.assertRaisesMessage(ValidationError, "No existen los usuarios: 9999"):
+            Ticket.new_masivo(self.event, [{"user_id": 9999, "quantity": 1, "type": Ticket.Type.GENERAL}])
+
+
+class BenchmarkIndicesTest(TransactionTestCase):
+    def test_compara_planes_y_deshace_los_datos(self):
+        out = StringIO()
+        call_command(
+            "benchmark_indexes", tickets=500, usuarios=200, eventos=20, repeticiones=1, stdout=out
+        )
+        salida = out.getvalue()
+        self.assertIn("SIN INDICES", salida)
+        self.assertIn("ticket_user_event_activo_idx", salida.split("CON INDICES")[1])
+        self.assertFalse(Ticket.objects.exists())
+        self.assertFalse(User.objects.exists())
+
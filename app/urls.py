@@ -10,7 +10,9 @@ urlpatterns = [
 
     #Eventos
     path("events/", views.events, name="events"),
+    path("events/top-rated/", views.top_rated_events, name="top_rated_events"),
     path("events/create/", views.event_form, name="event_form"),
+    path("events/search/", views.event_search, name="event_search"),
     path("events/<int:id>/edit/", views.event_form, name="event_edit"),
     path("events/<int:id>/", views.event_detail, name="event_detail"),
     path("events/<int:id>/delete/", views.event_delete, name="event_delete"),
@@ -27,16 +29,19 @@ urlpatterns = [
     path("ticket/<int:id>/form/", views.ticket_form, name="ticket_form"), # El formulario de tarjeta de credito
     path("ticket/<str:ticket_code>/delete/", views.ticket_delete, name="ticket_delete"), # El formulario de tarjeta de credito
     path("ticket/<int:eventId>/buy/", views.ticket_buy, name="ticket_buy"), # El POST para comprar tickets
+    path("ticket/<int:eventId>/bulk-buy/", views.ticket_bulk_buy, name="ticket_bulk_buy"), # Compra masiva en JSON (boleteria)
 
     path("ticket/<str:ticket_code>/edit/", views.ticket_edit, name="ticket_edit"), 
 
     path("ticket/<str:ticket_code>/form/edit", views.ticket_edit_form, name="ticket_edit_form"), # El POST para comprar tickets
 
     path('events/<int:event_id>/comment/add/', views.add_comment, name='add_comment'),# ruta para comentario
+    path('events/<int:id>/comments/', views.event_comments_json, name='event_comments'),
     path('comments/<int:comment_id>/edit/', views.edit_comment, name='edit_comment'),
     path('comments/<int:comment_id>/delete/', views.delete_comment, name='delete_comment'),
     path('comentario/<int:comment_id>/', views.view_comment, name='view_comment'),
     path('organizer/comments/', views.organizer_comments, name='organizer_comments'),
+    path('organizer/dashboard/', views.organizer_dashboard, name='organizer_dashboard'),
     path('reembolso/solicitar/', views.solicitar_reembolso, name='solicitar_reembolso'),
     path('refund/request/', views.solicitar_reembolso, name='solicitar_reembolso'),
     path('refund/myrefund/', views.my_refund, name='my_refund'),
@@ -51,6 +56,8 @@ urlpatterns = [
     path('event/<int:event_id>/rating/<int:rating_id>/delete/', views.delete_rating, name='delete_rating'),
     path('event/<int:event_id>/ratings/', views.list_ratings, name='list_ratings'),
     path('event/<int:event_id>/countdown/', views.countdown_json, name='countdown_json'),
+    path('events/<int:id>/availability/', views.event_availability_stream, name='event_availability_stream'),
+    path('events/<int:id>/attendees/export/', views.event_attendees_export, name='event_attendees_export'),
 
 
 ## Venue
@@ -63,4 +70,7 @@ urlpatterns = [
 # encuesta
     path("survey/<str:ticket_code>/", views.satisfaction_survey, name="satisfaction_survey"),
 
+# cache
+    path("cache/stats/", views.cache_stats, name="cache_stats"),
+
 ]
@@ -1,9 +1,72 @@
+import base64
+import json
 
+from django.core.exceptions import ValidationError
+from django.db.models import Q
 
 
 def calculate_average_rating(ratings):
-    
+
     valid_ratings = [r.rating for r in ratings if r.is_current and not r.bl_baja]
     if valid_ratings:
         return sum(valid_ratings) / len(valid_ratings)
-    return 0
\ No newline at end of file
+    return 0
+
+
+def encode_cursor(values):
+    raw = [v.isoformat() if hasattr(v, "isoformat") else v for v in values]
+    return base64.urlsafe_b64encode(json.dumps(raw).encode()).decode()
+
+
+def decode_cursor(cursor):
+    if not cursor:
+        return None
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+    except (ValueError, TypeError):
+        return None
+    return values if isinstance(values, list) else None
+
+
+def cursor_values(model, fields, values):
+    '''
+    Convierte los valores decodificados del cursor al tipo de cada campo de `fields`.
+    Devuelve None si no coinciden en cantidad o alguno no es valido para su campo
+    (por ejemplo un texto en lugar de un id, un objeto o null).
+    '''
+    if not values or len(values) != len(fields):
+        return None
+    try:
+        converted = [model._meta.get_field(field).to_python(value) for field, value in zip(fields, values)]
+    except (ValidationError, ValueError, TypeError):
+        return None
+    if any(value is None for value in converted):
+        return None
+    return converted
+
+
+def keyset_paginate(queryset, fields, cursor=None, page_size=20, descending=False):
+    '''
+    Pagina un queryset por clave (keyset) sobre la tupla `fields`, en lugar de usar OFFSET.
+    El costo de cada pagina no depende de cuantas filas haya antes del cursor.
+    - `fields` debe terminar en un campo unico (por ejemplo "id") para que el orden sea total.
+    - Devuelve (items, next_cursor); next_cursor es None si no hay mas paginas.
+    '''
+    lookup = "lt" if descending else "gt"
+    # Cursor manipulado o invalido: se vuelve a la primera pagina
+    values = cursor_values(queryset.model, fields, decode_cursor(cursor))
+    if values:
+        condition = Q()
+        for i, field in enumerate(fields):
+            equal = {fields[j]: values[j] for j in range(i)}
+            condition |= Q(**equal, **{f"{field}__{lookup}": values[i]})
+        queryset = queryset.filter(condition)
+
+    ordering = [f"-{field}" if descending else field for field in fields]
+    items = list(queryset.order_by(*ordering)[: page_size + 1])
+
+    next_cursor = None
+    if len(items) > page_size:
+        items = items[:page_size]
+        next_cursor = encode_cursor([getattr(items[-1], field) for field in fields])
+    return items, next_cursor
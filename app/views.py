@@ -1,32 +1,51 @@
+import csv
 import datetime
+import json
+from time import monotonic
 from django.contrib.auth import authenticate, login
 from django.http import HttpResponseForbidden
 from django.contrib.auth.decorators import login_required
-from django.db.models import Sum
+from django.db.models import Count
 from django.shortcuts import get_object_or_404, redirect, render
 from django.utils import timezone
 from django.contrib import messages
 from .models import Comment
 from .forms import CommentForm
 from django.http import JsonResponse
-from django.db.models import Prefetch
+from django.urls import reverse
+from django.utils.formats import date_format
 from .models import Ticket, RefundRequest
-from .forms import RatingForm
-from django.contrib import messages
 from .models import Rating
-from django.core.exceptions import ValidationError
+from django.core.exceptions import NON_FIELD_ERRORS, ValidationError
 from .models import Event, User,Category
-from django.db.models import Count
-from .models import Venue, SatisfactionSurvey
-from django.db import IntegrityError
-from django.db.transaction import atomic
+from .models import Venue, EventDailyStat, REASON_CHOICES
 import logging
 from .forms import RatingForm, SatisfactionSurveyForm
-from django.db.models import Avg, Count
-from django.views.decorators.http import require_GET
+from django.views.decorators.http import require_GET, require_POST
+from asgiref.sync import sync_to_async
+from django.http import Http404, HttpResponseBadRequest, StreamingHttpResponse
+from django.core.handlers.asgi import ASGIRequest
+from django.conf import settings
+from django.core.cache import cache
+from .disponibilidad import canal_evento, clave_estado, obtener_broker
+from .utils import keyset_paginate
+from .cache import cache_public_page, estadisticas, get_or_set_publico
+from .filtros import aplicar, facetas, leer_filtros, querystring
+from .db_router import lectura_en_replica
+from .busqueda import buscar_eventos
+from .categorias import categorias, categorias_activas
 
 logger = logging.getLogger(__name__)
 
+EVENTS_PAGE_SIZE = 20
+TOP_RATED_EVENTS_LIMIT = 20
+SEARCH_PAGE_SIZE = 20
+COMMENTS_PAGE_SIZE = 10
+REFUNDS_PAGE_SIZE = 20
+BULK_PURCHASE_MAX_TICKETS = 1000
+ATTENDEES_EXPORT_CHUNK_SIZE = 2000
+ATTENDEES_EXPORT_COLUMNS = ["ticket_code", "username", "email", "type", "quantity", "buy_date", "survey_rating"]
+
 def register(request):
     if request.method == "POST":
         email = request.POST.get("email")
@@ -74,47 +93,108 @@ def login_view(request):
     return render(request, "accounts/login.html")
 
 
+@cache_public_page()
 def home(request):
     return render(request, "home.html")
 
 
 @login_required
+@lectura_en_replica
 def events(request):
-    tickets = Prefetch('tickets', queryset=Ticket.objects.filter(bl_baja=False))
-    events = Event.objects.prefetch_related(tickets).order_by("scheduled_at")
-    
+    # Paginacion por cursor sobre (scheduled_at, id): el listado no carga tickets
+    # y las categorias de toda la pagina se traen en una sola consulta
+    cursor = request.GET.get("cursor")
+    # El estado lo mantiene update_event_status, filtrar es una busqueda por (status, scheduled_at)
+    filtros = leer_filtros(request.GET)
+    queryset = aplicar(Event.objects.select_related("venue").prefetch_related("categories"), filtros)
+    events, next_cursor = keyset_paginate(
+        queryset,
+        ["scheduled_at", "id"],
+        cursor=cursor,
+        page_size=EVENTS_PAGE_SIZE,
+    )
+
     return render(
         request,
         "app/events.html",
-        {"events": events, "user_is_organizer": request.user.is_organizer},
+        {
+            "events": events,
+            "next_cursor": next_cursor,
+            "is_first_page": not cursor,
+            "user_is_organizer": request.user.is_organizer,
+            "status": filtros["status"],
+            "filtros": filtros,
+            "filtros_query": querystring(filtros),
+            "facetas": facetas(filtros),
+        },
     )
 
 @login_required
+@lectura_en_replica
 def event_detail(request, id):
-    event = get_object_or_404(Event, pk=id)
+    # Todo lo que muestra la pagina se trae en una cantidad fija de consultas,
+    # sin importar cuantos comentarios, calificaciones o compras tenga el evento
+    event = get_object_or_404(
+        Event.objects.select_related("venue", "organizer")
+        .annotate(comment_count=Count("comments"))
+        .prefetch_related("categories"),
+        pk=id,
+    )
 
-    # Busca los ratings activos
-    visible_ratings = event.rating_set.filter(bl_baja=False, is_current=True)
+    # Solo la primera pagina de comentarios; el resto se pide a event_comments_json
+    comments, comments_next_cursor = comments_page(event)
 
-    # Promedio y cantidad de ratings
-    rating_stats = visible_ratings.aggregate(
-        promedio=Avg('rating'),
-        cantidad=Count('id')
+    # Busca los ratings activos
+    visible_ratings = list(
+        event.rating_set.filter(bl_baja=False, is_current=True).select_related("user")
     )
+    user_rating = next((r for r in visible_ratings if r.user_id == request.user.id), None)
 
-    user_rating = None
-    if request.user.is_authenticated:
-        user_rating = Rating.objects.filter(user=request.user, event=event, is_current=True, bl_baja=False).first()
+    active_tickets = []
+    if request.user.is_organizer:
+        active_tickets = list(event.active_tickets.select_related("user"))
 
     return render(request, "app/event_detail.html", {
         "event": event,
         "ratings": visible_ratings,
         "user_rating": user_rating,
-        "avg_rating": rating_stats["promedio"],
-        "rating_count": rating_stats["cantidad"]
+        "active_tickets": active_tickets,
+        "comments": comments,
+        "comments_next_cursor": comments_next_cursor,
+        # Promedio y cantidad guardados en el evento, sin recorrer las calificaciones
+        "avg_rating": event.rating_avg if event.rating_count else None,
+        "rating_count": event.rating_count
     })
 
 
+@login_required
+@lectura_en_replica
+@require_GET
+def event_search(request):
+    query = request.GET.get("q", "").strip()
+    try:
+        page = max(int(request.GET.get("page", 1)), 1)
+    except ValueError:
+        page = 1
+    # Titulo, descripcion, ubicacion y categorias, ordenados por relevancia
+    events, has_next = buscar_eventos(query, page, SEARCH_PAGE_SIZE)
+
+    return render(request, "app/event_search.html", {
+        "events": events,
+        "query": query,
+        "page": page,
+        "has_next": has_next,
+    })
+
+@login_required
+def top_rated_events(request):
+    events = (
+        Event.objects.filter(rating_count__gt=0)
+        .order_by("-rating_avg", "-rating_count", "id")[:TOP_RATED_EVENTS_LIMIT]
+    )
+    return render(request, "app/top_rated_events.html", {"events": events})
+
+
 
 @login_required
 def event_delete(request, id):
@@ -137,7 +217,6 @@ def event_form(request, id=None):
     if not user.is_organizer:
         return redirect("events")
     
-    categories = Category.objects.filter(is_active=True)
     selected_categories = []
 
     if request.method == "POST":  
@@ -172,7 +251,7 @@ def event_form(request, id=None):
     event = None
     if id is not None:
         event = get_object_or_404(Event, pk=id)
-    venues = Venue.objects.filter(bl_baja=0)
+    venues = Venue.objects.filter(bl_baja=False).order_by("name")
 
     selected_categories = []
     if event:
@@ -181,7 +260,7 @@ def event_form(request, id=None):
     return render(
         request,
         "app/event_form.html",
-        {"event": event, "venues":venues,"user_is_organizer": request.user.is_organizer, "categories": categories, "selected_categories": selected_categories},
+        {"event": event, "venues":venues,"user_is_organizer": request.user.is_organizer, "categories": categorias_activas(), "selected_categories": selected_categories},
     )
 
 
@@ -206,14 +285,9 @@ def ticket_delete(request,ticket_code):
     return redirect("events")
 
 
-from django.contrib import messages
-from django.shortcuts import render, redirect, get_object_or_404
-from django.db.models import Sum
-from django.contrib.auth.decorators import login_required
-
 @login_required
 def ticket_edit(request, ticket_code):
-    ticket = get_object_or_404(Ticket, ticket_code=ticket_code, user=request.user)
+    ticket = get_object_or_404(Ticket.objects.select_related("event__venue"), ticket_code=ticket_code, user=request.user)
 
     if request.method == "POST":
         quantity = request.POST.get("quantity")
@@ -232,20 +306,15 @@ def ticket_edit(request, ticket_code):
             messages.error(request, "El tipo de ticket no es válido.")
             return render(request, "app/ticket_edit_form.html", {"ticket": ticket, "quantity": quantity, "type": type})
 
-        total_user_tickets = Ticket.objects.filter(
-            user=request.user,
-            event=ticket.event,
-            bl_baja=0
-        ).exclude(id=ticket.id).aggregate(Sum("quantity"))["quantity__sum"] or 0
-
-        if total_user_tickets + quantity > 4:
-            messages.error(request, "No puedes tener más de 4 entradas por evento.")
+        # Actualizar ticket (verifica el limite por usuario y ajusta los cupos vendidos del evento)
+        try:
+            ticket.update(quantity=quantity, type=type)
+        except ValidationError as e:
+            if es_error_de_limite(e):
+                messages.error(request, "No puedes tener más de 4 entradas por evento.")
+            else:
+                messages.error(request, e.messages[0])
             return render(request, "app/ticket_edit_form.html", {"ticket": ticket, "quantity": quantity, "type": type})
-
-        # Actualizar ticket
-        ticket.quantity = quantity
-        ticket.type = type
-        ticket.save()
         messages.success(request, "Ticket editado correctamente")
         return redirect("tickets")
 
@@ -258,22 +327,6 @@ def ticket_edit_form(request,ticket_code):
     return render(request, "app/ticket_edit_form.html",{"ticket":ticket})
 
 
-def ticket_excede_capacidad_maxima(event, quantity) -> bool:
-    '''
-    Verifica que al comprar un ticket, no se superen los cupos maximos del espacio del evento.
-    Toma como parametros:
-    - Evento
-    - Cantidad de entradas a comprar en el ticket
-    '''
-    capacidad_maxima = event.venue.capacity
-    capacidad_utilizada = Ticket.objects.filter(event=event, bl_baja=0).aggregate(total=Sum("quantity"))["total"] or 0
-    # print(f"capacidad utilizada: {capacidad_utilizada}")
-    if(capacidad_utilizada+quantity>capacidad_maxima):
-        return True
-    else:
-        return False
-    
-
 @login_required
 def ticket_buy(request, eventId):
     user = request.user
@@ -294,39 +347,28 @@ def ticket_buy(request, eventId):
             messages.error(request, "La cantidad debe ser un número entero positivo.")
             return redirect('ticket_form', id=eventId)
         
-        event = get_object_or_404(Event, pk=eventId)
-
-        # Validar si hay cupos disponibles para el ticket
-        if ticket_excede_capacidad_maxima(event,quantity):
-            messages.error(request, "Lo sentimos, la capacidad maxima de entradas fue superada" )
-            print("capacidad maxima SUPERADA")
-            return redirect('ticket_form', id=eventId)
+        event = get_object_or_404(Event.objects.select_related("venue"), pk=eventId)
 
         if tipo not in Ticket.Type.values:
             messages.error(request, "El tipo de ticket no es válido.")
             return redirect('ticket_form', id=eventId)
 
-        # Total de tickets comprados por el usuario
-        total_user_tickets = Ticket.objects.filter(
-            user=user, event=event, bl_baja=0
-        ).aggregate(total=Sum("quantity"))["total"] or 0
-
-        # Cantidad previa de tickets antes de la compra
-    
-
-        if total_user_tickets + quantity > 4:
-            messages.error(request, f"No puedes comprar más de 4 entradas por evento.")
+        # Crear ticket: Ticket.new verifica el limite por usuario y reserva los cupos de
+        # forma atomica, asi que dos compras simultaneas no pueden superar la capacidad
+        try:
+            ticket = Ticket.new(
+                buy_date=timezone.now(),
+                quantity=quantity,
+                type=tipo,
+                event=event,
+                user=user
+            )
+        except ValidationError as e:
+            if es_error_de_limite(e):
+                messages.error(request, "No puedes comprar más de 4 entradas por evento.")
+            else:
+                messages.error(request, e.messages[0])
             return redirect('ticket_form', id=eventId)
-
-        # Crear ticket
-        
-        ticket = Ticket.new(
-            buy_date=timezone.now(),
-            quantity=quantity,
-            type=tipo,
-            event=event,
-            user=user
-        )
         messages.success(request, f"¡Compra exitosa! Código del ticket: {ticket.ticket_code}")
        
 
@@ -336,6 +378,119 @@ def ticket_buy(request, eventId):
     return redirect('ticket_form', id=eventId)
         
 
+def es_error_de_limite(error):
+    '''True si la ValidationError de Ticket es por el limite de entradas por usuario.'''
+    errores = error.error_dict.get(NON_FIELD_ERRORS, []) if hasattr(error, "error_dict") else error.error_list
+    return any(e.code == "limite_usuario" for e in errores)
+
+
+def id_de_usuario(valor):
+    '''user_id de ticket_bulk_buy: un entero o un string de digitos; ValueError si es otra cosa.'''
+    # int() aceptaria 3.7 (-> 3) y True (-> 1); bool es subclase de int
+    if isinstance(valor, bool) or not isinstance(valor, (int, str)):
+        raise ValueError(valor)
+    if isinstance(valor, str) and not valor.isdigit():
+        raise ValueError(valor)
+    return int(valor)
+
+
+@login_required
+@require_POST
+def ticket_bulk_buy(request, eventId):
+    '''
+    Compra masiva para boleteria: recibe JSON {"tickets": [{"user_id", "quantity", "type"}, ...]}
+    y devuelve los ticket_code generados. Solo para el organizador del evento o el staff.
+    '''
+    event = get_object_or_404(Event.objects.select_related("venue"), pk=eventId)
+    if not (request.user.is_staff or event.organizer_id == request.user.id):
+        return JsonResponse({"error": "No tienes permiso para emitir entradas de este evento."}, status=403)
+
+    try:
+        compras = [
+            {"user_id": id_de_usuario(t["user_id"]), "quantity": t["quantity"], "type": t.get("type", Ticket.Type.GENERAL)}
+            for t in json.loads(request.body)["tickets"]
+        ]
+    except (ValueError, KeyError, TypeError):
+        return JsonResponse({"error": "El cuerpo debe ser JSON con una lista 'tickets' de {user_id, quantity, type}."}, status=400)
+
+    if not compras or len(compras) > BULK_PURCHASE_MAX_TICKETS:
+        return JsonResponse({"error": f"Se pueden emitir entre 1 y {BULK_PURCHASE_MAX_TICKETS} entradas por pedido."}, status=400)
+
+    try:
+        tickets = Ticket.new_masivo(event, compras)
+    except ValidationError as e:
+        return JsonResponse({"error": e.messages}, status=400)
+
+    return JsonResponse({
+        "count": len(tickets),
+        "ticket_codes": [str(ticket.ticket_code) for ticket in tickets],
+    }, status=201)
+
+
+class EscrituraDirecta:
+    # csv.writer escribe en un archivo; este devuelve la linea para poder enviarla
+    def write(self, value):
+        return value
+
+
+def filas_asistentes(event):
+    '''
+    Entradas activas del evento como listas en el orden de ATTENDEES_EXPORT_COLUMNS.
+    values_list + iterator: se leen de a ATTENDEES_EXPORT_CHUNK_SIZE filas sin crear
+    instancias ni guardar el resultado en la cache del queryset.
+    '''
+    tickets = (
+        Ticket.objects.filter(event=event, bl_baja=False)
+        .order_by("pk")
+        .values_list(
+            "ticket_code", "user__username", "user__email", "type", "quantity", "buy_date",
+            "satisfactionsurvey__rating",
+        )
+    )
+    for ticket_code, username, email, type, quantity, buy_date, rating in tickets.iterator(
+        chunk_size=ATTENDEES_EXPORT_CHUNK_SIZE
+    ):
+        yield [str(ticket_code), username, email, type, quantity, timezone.localtime(buy_date).isoformat(), rating]
+
+
+@login_required
+@require_GET
+def event_attendees_export(request, id):
+    '''
+    Lista de entradas activas para el control de acceso, en CSV o en JSONL (?format=jsonl).
+    La respuesta se envia a medida que se lee la base, asi que la memoria no crece con la
+    cantidad de entradas. Solo para el organizador del evento o el staff.
+    '''
+    event = get_object_or_404(Event.objects.only("id", "organizer_id"), pk=id)
+    if not (request.user.is_staff or event.organizer_id == request.user.id):
+        return HttpResponseForbidden("No tienes permiso para exportar los asistentes de este evento.")
+
+    formato = request.GET.get("format", "csv")
+    if formato == "csv":
+        writer = csv.writer(EscrituraDirecta())
+
+        def contenido():
+            # La cabecera sale antes de consultar, el primer byte no espera a la base
+            yield writer.writerow(ATTENDEES_EXPORT_COLUMNS)
+            for fila in filas_asistentes(event):
+                yield writer.writerow(fila)
+
+        content_type = "text/csv; charset=utf-8"
+    elif formato == "jsonl":
+        def contenido():
+            for fila in filas_asistentes(event):
+                yield json.dumps(dict(zip(ATTENDEES_EXPORT_COLUMNS, fila)), ensure_ascii=False) + "\n"
+
+        content_type = "application/x-ndjson"
+    else:
+        return HttpResponseBadRequest("El formato debe ser csv o jsonl.")
+
+    response = StreamingHttpResponse(contenido(), content_type=content_type)
+    response["Content-Disposition"] = f'attachment; filename="evento-{event.id}-asistentes.{formato}"'
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
 def ticket_form(request, id):
     # Cuando intento acceder al ticket form (formulario de tarjeta de credito para comprar tickets), necesito saber si el evento existe
     event = get_object_or_404(Event, pk=id)
@@ -344,6 +499,48 @@ def ticket_form(request, id):
         "app/ticket_form.html",
         {"event": event} # Pasar el contexto del evento a la parte del formulario de compra para que el usuario pueda ver que evento esta comprando, y para armar la solicitud de compra.
     )
+
+
+def comments_page(event, cursor=None):
+    '''
+    Devuelve una pagina de comentarios del evento, del mas nuevo al mas viejo,
+    paginada por cursor sobre (created_at, id).
+    '''
+    return keyset_paginate(
+        event.comments.select_related("user"),
+        ["created_at", "id"],
+        cursor=cursor,
+        page_size=COMMENTS_PAGE_SIZE,
+        descending=True,
+    )
+
+
+@login_required
+@require_GET
+def event_comments_json(request, id):
+    event = get_object_or_404(Event.objects.only("id", "organizer_id"), pk=id)
+    comments, next_cursor = comments_page(event, request.GET.get("cursor"))
+    user = request.user
+
+    return JsonResponse({
+        "comments": [
+            {
+                "id": comment.id,
+                "title": comment.title,
+                "text": comment.text,
+                "username": comment.user.username,
+                "created_at": date_format(timezone.localtime(comment.created_at), "d M Y, H:i"),
+                "edit_url": reverse("edit_comment", args=[comment.id]) if user.id == comment.user_id else None,
+                "delete_url": (
+                    reverse("delete_comment", args=[comment.id])
+                    if user.id in (comment.user_id, event.organizer_id) else None
+                ),
+            }
+            for comment in comments
+        ],
+        "next_cursor": next_cursor,
+    })
+
 #crear comentario
 @login_required
 def add_comment(request, event_id):
@@ -396,6 +593,7 @@ def delete_comment(request, comment_id):
 
 
 @login_required
+@lectura_en_replica
 def organizer_comments(request):
     if not request.user.is_organizer:
         return redirect('events')
@@ -409,8 +607,42 @@ def organizer_comments(request):
     return render(request, 'comments/organizer_comments.html', {
         'comments': comments
     })
+
+
+@login_required
+@lectura_en_replica
+def organizer_dashboard(request):
+    if not request.user.is_organizer:
+        return redirect('events')
+
+    # Todo sale del resumen diario: dos consultas sin importar cuantas entradas,
+    # reembolsos o calificaciones tengan los eventos
+    events = list(
+        Event.objects.filter(organizer=request.user)
+        .only("id", "title", "scheduled_at", "status")
+        .order_by("-scheduled_at")
+    )
+    resumen = EventDailyStat.resumen_por_evento([event.pk for event in events])
+    motivos = dict(REASON_CHOICES)
+    estados = dict(RefundRequest.Status.choices)
+    filas = []
+    for event in events:
+        datos = resumen[event.pk]
+        filas.append({
+            "event": event,
+            "tickets": datos["tickets"],
+            "tickets_total": sum(datos["tickets"].values()),
+            "reembolsos_por_estado": [(estados.get(k, k), v) for k, v in datos["reembolsos_por_estado"].items()],
+            "reembolsos_por_motivo": [(motivos.get(k, k), v) for k, v in datos["reembolsos_por_motivo"].items() if v],
+            "calificaciones": datos["calificaciones"],
+            "encuesta_promedio": datos["encuesta_promedio"],
+            "ventas_por_dia": list(datos["ventas_por_dia"].items()),
+        })
+
+    return render(request, "app/organizer_dashboard.html", {"filas": filas})
     
     
+@cache_public_page("comment")
 def view_comment(request, comment_id):
     comment = get_object_or_404(Comment, id=comment_id)
     return render(request, 'comments/view_comment.html', {'comment': comment})
@@ -507,16 +739,23 @@ def eliminar_reembolso(request, id):
 def reembolsos_eventos(request):
     if not request.user.is_authenticated or not request.user.is_organizer:
         return render(request, '403.html')
-    eventos_del_organizador = Event.objects.filter(organizer=request.user)
-    tickets = Ticket.objects.filter(event__in=eventos_del_organizador)
-    ticket_map = {str(ticket.ticket_code): ticket for ticket in tickets}
-    refunds = RefundRequest.objects.filter(ticket_code__in=ticket_map.keys())
-
-    for refund in refunds:
-        refund.ticket = ticket_map.get(refund.ticket_code)
-        refund.event = refund.ticket.event if refund.ticket else None
-    
-    return render(request, "reembolsos_eventos.html", {'refunds': refunds})    
+    # Un solo JOIN por la FK al ticket, paginado por cursor sobre (created_at, id)
+    cursor = request.GET.get("cursor")
+    refunds, next_cursor = keyset_paginate(
+        RefundRequest.objects.filter(ticket__event__organizer=request.user)
+        .select_related("ticket__event", "requester"),
+        ["created_at", "id"],
+        cursor=cursor,
+        page_size=REFUNDS_PAGE_SIZE,
+        descending=True,
+    )
+
+    return render(request, "reembolsos_eventos.html", {
+        'refunds': refunds,
+        'next_cursor': next_cursor,
+        'is_first_page': not cursor,
+    })
+
 def aprobar_reembolso(request, refund_id):
     refund = get_object_or_404(RefundRequest, id=refund_id)
     if request.method == 'POST':
@@ -641,6 +880,7 @@ def update_rating(request, event_id, rating_id):
 
 
 @login_required
+@lectura_en_replica
 def list_ratings(request, event_id):
     event = get_object_or_404(Event, pk=event_id)
     ratings = event.rating_set.filter(bl_baja=False).order_by('-created_at')
@@ -672,8 +912,9 @@ def delete_rating(request, event_id, rating_id):
 #####Venue
 
 @login_required
+@lectura_en_replica
 def venue(request):
-    venues = Venue.objects.filter(bl_baja=0)
+    venues = Venue.objects.filter(bl_baja=False).order_by("name")
     return render(request, "app/venue.html", {"venues":venues, "user_is_organizer": request.user.is_organizer },)
 
 @login_required
@@ -809,25 +1050,24 @@ def venue_baja(request,id=None):
     return redirect("venue")
 
 @login_required
+@lectura_en_replica
 def venue_detail(request, id=None):
-    venue = {}
-    try:
-        venue = Venue.objects.get(pk=id)
-        if venue.bl_baja:
-            messages.error(request, f"No se puede acceder a la ubicación.")
-            return redirect("venue")
-        
-    except Venue.DoesNotExist:
+    # La pagina depende del usuario, asi que se cachea la ubicacion y no la respuesta
+    venue = get_or_set_publico(f"venue:{id}", lambda: Venue.objects.filter(pk=id).first(), alcances=("venue",))
+    if venue is None:
         messages.error(request, f"La ubicación solicitada no existe.")
         return redirect("venue")
+    if venue.bl_baja:
+        messages.error(request, f"No se puede acceder a la ubicación.")
+        return redirect("venue")
     
     return render(request,"app/venue_detail.html", {"venue":venue,"user_is_organizer": request.user.is_organizer },)
         
 
 @login_required
 def category_list(request):
-    categories = Category.objects.annotate(event_count=Count("events_categories__id"))
-    return render(request, "app/category_list.html", {"categories": categories})
+    # La cantidad de eventos de cada categoria sale del cache en memoria (ver categorias.py)
+    return render(request, "app/category_list.html", {"categories": categorias()})
                   
 @login_required
 def category_form(request, id=None):
@@ -857,6 +1097,7 @@ def category_form(request, id=None):
             try:
                 category.clean()
                 category.save()
+                category.invalidar_eventos()
                 return redirect("category_list")
             except ValidationError as e:
                 errors= e.message_dict
@@ -884,30 +1125,79 @@ def category_delete(request, id):
         messages.error(request, "No se puede eliminar una categoría activa.")
         return redirect("category_list")
 
+    category.invalidar_eventos()
     category.delete()
     messages.success(request, "Categoría eliminada exitosamente.")
     return redirect("category_list")
 
+@cache_public_page("category", "event")
 def category_events(request, id):
     category = get_object_or_404(Category, id=id)
-    events = category.events_categories.all()
+    events = category.events.all()
     return render(request, "app/category_events.html", {"category": category, "events": events})
 
 @login_required
 @require_GET
-def countdown_json(request, event_id):
-    event = get_object_or_404(Event, id=event_id)
-
-    if request.user.is_organizer:
+async def countdown_json(request, event_id):
+    '''
+    Vista asincrona: la fecha del evento sale de la cache de paginas publicas, asi que
+    normalmente no toca la tabla de eventos. La pagina del evento ya calcula el countdown
+    en el navegador; esto queda para otros clientes.
+    '''
+    user = await request.auser()
+    if user.is_organizer:
         return JsonResponse({'error': 'Los organizadores no pueden ver el countdown.'}, status=403)
 
-    countdown = event.countdown
+    scheduled_at = await sync_to_async(get_or_set_publico)(
+        f"event:{event_id}:scheduled_at",
+        lambda: Event.objects.filter(pk=event_id).values_list("scheduled_at", flat=True).first(),
+        alcances=("event",),
+    )
+    if scheduled_at is None:
+        raise Http404("No existe el evento.")
+
+    countdown = Event.countdown_hasta(scheduled_at)
     return JsonResponse({
         'days': countdown['days'],
         'hours': countdown['hours'],
-        'minutes': countdown['minutes']
+        'minutes': countdown['minutes'],
+        'target': scheduled_at.isoformat(),
     })
 
+@require_GET
+async def event_availability_stream(request, id):
+    '''
+    Server-Sent Events con las entradas disponibles y el estado del evento. No consulta la
+    base (ni la sesion): el estado inicial sale de la cache y los cambios del broker, asi
+    cada conexion abierta solo ocupa una tarea del event loop servido por asgi.py.
+
+    Servida por WSGI (runserver, gunicorn sync) cada conexion abierta ocuparia un worker
+    para siempre: ahi se manda el estado actual y se corta, y el navegador vuelve a
+    conectarse despues de `retry` milisegundos, como un polling.
+    '''
+    async def stream():
+        yield f"retry: {settings.SSE_RETRY_MS}\n\n"
+        estado = await cache.aget(clave_estado(id))
+        if estado is not None:
+            yield f"data: {json.dumps(estado)}\n\n"
+        if not isinstance(request, ASGIRequest):
+            return
+        # Tambien por ASGI se corta cada tanto, para que un cliente colgado no quede suscripto
+        fin = monotonic() + settings.SSE_MAX_SECONDS
+        async with obtener_broker().suscribir(canal_evento(id)) as suscripcion:
+            while (restante := fin - monotonic()) > 0:
+                mensaje = await suscripcion.recibir(timeout=min(settings.SSE_HEARTBEAT, restante))
+                if mensaje is None:
+                    # Comentario para que proxies y navegador no den la conexion por muerta
+                    yield ": ping\n\n"
+                else:
+                    yield f"data: {json.dumps(mensaje)}\n\n"
+
+    response = StreamingHttpResponse(stream(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
 #Encuesta de compra
 @login_required
 def satisfaction_survey(request, ticket_code):
@@ -929,4 +1219,11 @@ def satisfaction_survey(request, ticket_code):
     else:
         form = SatisfactionSurveyForm()
     return render(request, "survey/satisfaction_form.html", {"form": form, "ticket":ticket})
-        
+
+
+@login_required
+@require_GET
+def cache_stats(request):
+    if not request.user.is_staff:
+        return JsonResponse({'error': 'Solo el personal de administracion puede ver las estadisticas.'}, status=403)
+    return JsonResponse(estadisticas())
@@ -4,5 +4,5 @@
 echo "Aplicando migraciones..."
 python manage.py migrate --noinput
 
-# Ejecutar el comando original (Gunicorn)
+# Ejecutar el comando original (uvicorn)
 exec "$@"
\ No newline at end of file
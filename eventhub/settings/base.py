@@ -1,6 +1,8 @@
 """
 Django settings for eventhub project.
 
+Configuracion comun a todos los entornos; dev.py y production.py la extienden.
+
 Generated by 'django-admin startproject' using Django 5.0.4.
 
 For more information on this file, see
@@ -10,12 +12,16 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 
-from pathlib import Path
 import os
+from pathlib import Path
+
 from dotenv import load_dotenv
+
+from .database import bases_de_datos
+
 load_dotenv()
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
-BASE_DIR = Path(__file__).resolve().parent.parent
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
 
 
 # Quick-start development settings - unsuitable for production
@@ -25,7 +31,7 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 SECRET_KEY = os.environ["DJANGO_SECRET_KEY"]
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+DEBUG = False
 
 ALLOWED_HOSTS = os.getenv("DJANGO_ALLOWED_HOSTS", "localhost").split(",")
 
@@ -44,6 +50,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "app.db_router.ReplicaMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -75,14 +82,71 @@ WSGI_APPLICATION = "eventhub.wsgi.application"
 
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
+# Se arma desde las variables DJANGO_DB_* (ver database.py); sin ellas usa SQLite en db.sqlite3.
+
+DATABASES = bases_de_datos(os.environ, BASE_DIR)
+
+# Las vistas de listados marcadas con @lectura_en_replica leen de una replica; el resto
+# del sitio, las escrituras y los REPLICA_STICKY_SECONDS posteriores a una escritura
+# del mismo navegador leen de la primaria
+DATABASE_ROUTERS = ["app.db_router.ReplicaRouter"]
+
+REPLICA_DATABASES = [alias for alias in DATABASES if alias != "default"]
+
+REPLICA_STICKY_SECONDS = int(os.getenv("DJANGO_DB_REPLICA_STICKY_SECONDS", 5))
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+# DJANGO_CACHE_BACKEND elige el backend: "locmem" (por defecto), "file" o "redis".
+# El backend redis necesita el paquete redis (pip install redis).
 
-DATABASES = {
+CACHE_BACKENDS = {
+    "locmem": ("django.core.cache.backends.locmem.LocMemCache", "eventhub"),
+    "file": ("django.core.cache.backends.filebased.FileBasedCache", str(BASE_DIR / ".cache")),
+    "redis": ("django.core.cache.backends.redis.RedisCache", "redis://127.0.0.1:6379/1"),
+}
+
+CACHE_BACKEND, CACHE_DEFAULT_LOCATION = CACHE_BACKENDS[os.getenv("DJANGO_CACHE_BACKEND", "locmem")]
+
+CACHES = {
     "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+        "BACKEND": CACHE_BACKEND,
+        # Con "or": la linea vacia DJANGO_CACHE_LOCATION= de env-example usa el valor por defecto
+        "LOCATION": os.getenv("DJANGO_CACHE_LOCATION") or CACHE_DEFAULT_LOCATION,
     }
 }
 
+# Segundos que se guarda una pagina publica cacheada (igual se invalida al cambiar los datos)
+PUBLIC_PAGE_CACHE_TIMEOUT = int(os.getenv("DJANGO_PUBLIC_PAGE_CACHE_TIMEOUT", "300"))
+
+
+# Disponibilidad en vivo (Server-Sent Events)
+# DJANGO_EVENT_BROKER elige como se reparten los avisos: "memoria" (por defecto, solo
+# dentro de un proceso) o "redis" (entre todos los procesos; necesita el paquete redis).
+# Con "memoria" los cambios que hace otro proceso, como update_event_status corriendo
+# por cron o como worker, no llegan a las paginas abiertas hasta que se reconectan; en
+# produccion con mas de un proceso hay que usar "redis".
+
+EVENT_BROKER_BACKENDS = {
+    "memoria": ("app.disponibilidad.BrokerEnMemoria", ""),
+    "redis": ("app.disponibilidad.BrokerRedis", "redis://127.0.0.1:6379/2"),
+}
+
+EVENT_BROKER_BACKEND, EVENT_BROKER_DEFAULT_LOCATION = EVENT_BROKER_BACKENDS[os.getenv("DJANGO_EVENT_BROKER", "memoria")]
+
+EVENT_BROKER = {
+    "BACKEND": EVENT_BROKER_BACKEND,
+    "LOCATION": os.getenv("DJANGO_EVENT_BROKER_LOCATION") or EVENT_BROKER_DEFAULT_LOCATION,
+}
+
+# Segundos entre comentarios de keep-alive en las conexiones SSE abiertas
+SSE_HEARTBEAT = 15
+# Cada cuanto se corta una conexion SSE (por ASGI); el navegador se reconecta solo
+SSE_MAX_SECONDS = 300
+# Milisegundos que espera el navegador para reconectarse; por WSGI es el intervalo de polling
+SSE_RETRY_MS = 5000
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -0,0 +1,117 @@
+"""
+Configuracion de la base de datos a partir de variables de entorno.
+
+    DJANGO_DB_ENGINE              sqlite (por defecto), postgresql o mysql
+    DJANGO_DB_NAME                nombre de la base (en SQLite, ruta al archivo)
+    DJANGO_DB_USER / _PASSWORD / _HOST / _PORT
+    DJANGO_DB_CONN_MAX_AGE        segundos que se reutiliza una conexion (0 = una por pedido)
+    DJANGO_DB_CONN_HEALTH_CHECKS  "1" para verificar la conexion antes de reutilizarla
+    DJANGO_DB_POOL_SIZE           tamaño del pool de conexiones (solo postgresql y mysql)
+    DJANGO_DB_TEST_NAME           base a usar al correr los tests
+    DJANGO_DB_SQLITE_TUNING       "1" para activar WAL y los pragmas de SQLITE_PRAGMAS
+    DJANGO_DB_SQLITE_BUSY_TIMEOUT segundos que se espera un lock antes de fallar (con el ajuste)
+    DJANGO_DB_REPLICAS            cantidad de replicas de lectura; la replica i se configura
+                                  con las mismas variables bajo el prefijo DJANGO_DB_REPLICA<i>_
+"""
+
+from django.core.exceptions import ImproperlyConfigured
+
+ENGINES = {
+    "sqlite": "django.db.backends.sqlite3",
+    "postgresql": "django.db.backends.postgresql",
+    # Backend de mysql-connector-python, que ya esta en requirements.txt
+    "mysql": "mysql.connector.django",
+}
+
+VERDADERO = ("1", "true", "yes", "si")
+
+# Pragmas que se aplican en cada conexion nueva cuando se activa el ajuste de SQLite.
+# journal_mode=WAL queda guardado en el archivo; el resto vale por conexion.
+SQLITE_PRAGMAS = {
+    # Los lectores no bloquean al escritor ni el escritor a los lectores
+    "journal_mode": "WAL",
+    # En WAL solo se sincroniza al hacer checkpoint; un corte de luz puede perder
+    # las ultimas transacciones pero no corrompe la base
+    "synchronous": "NORMAL",
+    "mmap_size": 128 * 1024 * 1024,
+    # Negativo = tamaño en KiB (64 MiB)
+    "cache_size": -64000,
+}
+SQLITE_BUSY_TIMEOUT = 20
+
+
+def configuracion_base_de_datos(env, base_dir, prefijo="DJANGO_DB_", conn_max_age=0, health_checks=False):
+    '''
+    Devuelve el diccionario de DATABASES para una conexion leyendo las variables
+    `prefijo`*. conn_max_age y health_checks son los valores por defecto del entorno
+    (production.py los sube) cuando las variables no estan definidas.
+    '''
+    def valor(nombre, default=""):
+        return env.get(prefijo + nombre, default)
+
+    motor = valor("ENGINE", "sqlite")
+    if motor not in ENGINES:
+        raise ImproperlyConfigured(
+            f"{prefijo}ENGINE={motor!r} no es valido, usar uno de: {', '.join(ENGINES)}"
+        )
+
+    config = {
+        "ENGINE": ENGINES[motor],
+        "CONN_MAX_AGE": int(valor("CONN_MAX_AGE", conn_max_age)),
+        "CONN_HEALTH_CHECKS": valor("CONN_HEALTH_CHECKS", "1" if health_checks else "0").lower() in VERDADERO,
+        "OPTIONS": {},
+    }
+
+    if motor == "sqlite":
+        config["NAME"] = valor("NAME") or base_dir / "db.sqlite3"
+        if valor("SQLITE_TUNING").lower() in VERDADERO:
+            config["OPTIONS"].update(
+                init_command="; ".join(f"PRAGMA {pragma}={v}" for pragma, v in SQLITE_PRAGMAS.items()),
+                # Toma el lock de escritura al empezar la transaccion: dos transacciones
+                # que leen y despues escriben no pueden trabarse al querer subir el lock
+                transaction_mode="IMMEDIATE",
+                timeout=int(valor("SQLITE_BUSY_TIMEOUT", SQLITE_BUSY_TIMEOUT)),
+            )
+    else:
+        config.update(
+            NAME=valor("NAME", "eventhub"),
+            USER=valor("USER"),
+            PASSWORD=valor("PASSWORD"),
+            HOST=valor("HOST", "127.0.0.1"),
+            PORT=valor("PORT"),
+        )
+
+    pool_size = int(valor("POOL_SIZE", 0))
+    if pool_size:
+        if motor == "sqlite":
+            raise ImproperlyConfigured(f"{prefijo}POOL_SIZE no se puede usar con SQLite")
+        if motor == "postgresql":
+            # Necesita psycopg[pool]
+            config["OPTIONS"]["pool"] = {"min_size": 1, "max_size": pool_size}
+        else:
+            config["OPTIONS"].update(pool_name="eventhub", pool_size=pool_size)
+        # Con pool las conexiones vuelven al pool al terminar cada pedido; Django no
+        # admite combinarlo con conexiones persistentes
+        config["CONN_MAX_AGE"] = 0
+
+    if valor("TEST_NAME"):
+        config["TEST"] = {"NAME": valor("TEST_NAME")}
+
+    return config
+
+
+def bases_de_datos(env, base_dir, **defaults):
+    '''
+    Devuelve DATABASES completo: "default" es la primaria y "replica1".."replicaN" las
+    replicas de lectura (ver app/db_router.py). En los tests las replicas espejan a
+    default, asi que leen lo mismo que se escribe.
+    '''
+    databases = {"default": configuracion_base_de_datos(env, base_dir, **defaults)}
+    for i in range(1, int(env.get("DJANGO_DB_REPLICAS", 0)) + 1):
+        prefijo = f"DJANGO_DB_REPLICA{i}_"
+        if not any(nombre.startswith(prefijo) for nombre in env):
+            raise ImproperlyConfigured(f"Falta configurar la replica {i} ({prefijo}*)")
+        replica = configuracion_base_de_datos(env, base_dir, prefijo=prefijo, **defaults)
+        replica["TEST"] = {"MIRROR": "default"}
+        databases[f"replica{i}"] = replica
+    return databases
@@ -0,0 +1,13 @@
+import os
+
+from .base import *  # noqa: F403
+from .base import BASE_DIR
+from .database import bases_de_datos
+
+DEBUG = False
+
+# Bajo gunicorn cada worker mantiene su conexion abierta entre pedidos y la
+# verifica antes de reutilizarla, en lugar de abrir una nueva en cada pedido
+DATABASES = bases_de_datos(os.environ, BASE_DIR, conn_max_age=60, health_checks=True)
+
+REPLICA_DATABASES = [alias for alias in DATABASES if alias != "default"]
@@ -11,7 +11,7 @@ import os
 import django
 from django.core.wsgi import get_wsgi_application
 
-os.environ.setdefault("DJANGO_SETTINGS_MODULE", "eventhub.settings")
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "eventhub.settings.dev")
 
 # Inicializar Django
 django.setup()